@@ -0,0 +1,50 @@
+"""Holds queue
+
+Revision ID: 0b9e5d2a7c61
+Revises: f6a1d8c3b520
+Create Date: 2026-10-18 23:02:51.337460
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e5d2a7c61'
+down_revision: Union[str, Sequence[str], None] = 'f6a1d8c3b520'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('library_id', sa.Integer(), nullable=True),
+    sa.Column('patron_card', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('copy_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True),
+              server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('ready_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['copy_id'], ['copies.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['library_id'], ['libraries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_holds_book_status_id', 'holds', ['book_id', 'status', 'id'], unique=False)
+    op.create_index('ix_holds_copy_id', 'holds', ['copy_id'], unique=False)
+    op.create_index('ix_holds_patron_book_active', 'holds', ['patron_card', 'book_id'], unique=True,
+                    postgresql_where=sa.text("status IN ('waiting', 'ready')"),
+                    sqlite_where=sa.text("status IN ('waiting', 'ready')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_holds_patron_book_active', table_name='holds')
+    op.drop_index('ix_holds_copy_id', table_name='holds')
+    op.drop_index('ix_holds_book_status_id', table_name='holds')
+    op.drop_table('holds')
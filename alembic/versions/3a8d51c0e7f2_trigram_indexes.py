@@ -0,0 +1,44 @@
+"""Trigram indexes for fuzzy title and author matching
+
+Revision ID: 3a8d51c0e7f2
+Revises: 7c2f4e9a1b3d
+Create Date: 2026-10-18 11:02:17.530911
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8d51c0e7f2'
+down_revision: Union[str, Sequence[str], None] = '7c2f4e9a1b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite scores similarity in-process, no indexes to build
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_books_title_trgm', 'books', [sa.text('lower(title) gin_trgm_ops')],
+        unique=False, postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_authors_name_trgm', 'authors', [sa.text('lower(name) gin_trgm_ops')],
+        unique=False, postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_authors_name_trgm', table_name='authors', postgresql_using='gin')
+    op.drop_index('ix_books_title_trgm', table_name='books', postgresql_using='gin')
@@ -0,0 +1,29 @@
+"""Holds index for queue positions at a pickup library
+
+Revision ID: 5c3e8f1b9d24
+Revises: 0b9e5d2a7c61
+Create Date: 2026-10-18 23:48:12.406251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5c3e8f1b9d24'
+down_revision: Union[str, Sequence[str], None] = '0b9e5d2a7c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_holds_book_status_library_id', 'holds', ['book_id', 'status', 'library_id', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_holds_book_status_library_id', table_name='holds')
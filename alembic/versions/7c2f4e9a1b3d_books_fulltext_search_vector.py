@@ -0,0 +1,93 @@
+"""Books full-text search: tsvector column maintained by triggers
+
+Revision ID: 7c2f4e9a1b3d
+Revises: 1e89a61db3b5
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2f4e9a1b3d'
+down_revision: Union[str, Sequence[str], None] = '1e89a61db3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite (dev) keeps the plain text column, search falls back to LIKE
+        return
+
+    op.drop_index('ix_books_search_vector', table_name='books', postgresql_using='gin')
+    op.alter_column(
+        'books', 'search_vector',
+        type_=postgresql.TSVECTOR(),
+        existing_type=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='NULL::tsvector',
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+        DECLARE
+            author_name text;
+        BEGIN
+            SELECT name INTO author_name FROM authors WHERE id = NEW.author_id;
+            NEW.search_vector :=
+                setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('russian', coalesce(author_name, '')), 'B') ||
+                setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER books_search_vector
+        BEFORE INSERT OR UPDATE OF title, description, author_id ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION authors_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE books SET author_id = author_id WHERE author_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER authors_search_vector
+        AFTER UPDATE OF name ON authors
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION authors_search_vector_update()
+    """)
+    # Backfill existing rows through the trigger
+    op.execute("UPDATE books SET title = title")
+    op.create_index('ix_books_search_vector', 'books', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS authors_search_vector ON authors")
+    op.execute("DROP FUNCTION IF EXISTS authors_search_vector_update()")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector ON books")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_update()")
+    op.drop_index('ix_books_search_vector', table_name='books', postgresql_using='gin')
+    op.alter_column(
+        'books', 'search_vector',
+        type_=sa.Text(),
+        existing_type=postgresql.TSVECTOR(),
+        existing_nullable=True,
+        postgresql_using='search_vector::text',
+    )
+    op.create_index('ix_books_search_vector', 'books', ['search_vector'], unique=False,
+                    postgresql_using='gin')
@@ -0,0 +1,39 @@
+"""Stemmed search terms table for morphological search
+
+Revision ID: a7e4c1f09b36
+Revises: f3c9d2e6a814
+Create Date: 2026-10-18 16:40:27.118530
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e4c1f09b36'
+down_revision: Union[str, Sequence[str], None] = 'f3c9d2e6a814'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('search_terms',
+    sa.Column('term', sa.String(length=100), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('field', sa.String(length=20), nullable=False),
+    sa.Column('tf', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('term', 'book_id', 'field')
+    )
+    op.create_index('ix_search_terms_book_id', 'search_terms', ['book_id'], unique=False)
+    # Stemming runs in the application: existing books are indexed
+    # after the upgrade by `python scripts/seed.py rebuild_search_index`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_search_terms_book_id', table_name='search_terms')
+    op.drop_table('search_terms')
@@ -0,0 +1,28 @@
+"""Composite indexes for keyset pagination
+
+Revision ID: b5e0c92d4a17
+Revises: 3a8d51c0e7f2
+Create Date: 2026-10-18 12:20:05.118374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e0c92d4a17'
+down_revision: Union[str, Sequence[str], None] = '3a8d51c0e7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_books_title_id', 'books', ['title', 'id'], unique=False)
+    op.create_index('ix_books_created_at_id', 'books', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_created_at_id', table_name='books')
+    op.drop_index('ix_books_title_id', table_name='books')
@@ -0,0 +1,41 @@
+"""Transliteration keys in search terms
+
+Revision ID: c5f1a9d3e7b2
+Revises: a7e4c1f09b36
+Create Date: 2026-10-18 18:02:51.730264
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a9d3e7b2'
+down_revision: Union[str, Sequence[str], None] = 'a7e4c1f09b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+search_terms = sa.table(
+    'search_terms',
+    sa.column('term', sa.String),
+    sa.column('book_id', sa.Integer),
+    sa.column('field', sa.String),
+    sa.column('tf', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No schema change: the keys are new rows of search_terms ('title_translit'
+    # and 'author_translit' fields), written by the application. Existing books
+    # get them after the upgrade from `python scripts/seed.py rebuild_search_index`
+    pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        search_terms.delete().where(search_terms.c.field.in_(['title_translit', 'author_translit']))
+    )
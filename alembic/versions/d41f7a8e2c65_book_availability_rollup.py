@@ -0,0 +1,45 @@
+"""Book availability rollup table
+
+Revision ID: d41f7a8e2c65
+Revises: b5e0c92d4a17
+Create Date: 2026-10-18 13:05:48.672210
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7a8e2c65'
+down_revision: Union[str, Sequence[str], None] = 'b5e0c92d4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_availability',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('library_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('available_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['library_id'], ['libraries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id', 'library_id')
+    )
+    # Backfill from existing copies
+    op.execute("""
+        INSERT INTO book_availability (book_id, library_id, total_count, available_count)
+        SELECT book_id, library_id,
+               COUNT(id),
+               SUM(CASE WHEN status = 'available' THEN 1 ELSE 0 END)
+        FROM copies
+        GROUP BY book_id, library_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('book_availability')
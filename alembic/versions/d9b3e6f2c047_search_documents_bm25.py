@@ -0,0 +1,47 @@
+"""Search documents table with BM25 lengths
+
+Revision ID: d9b3e6f2c047
+Revises: c5f1a9d3e7b2
+Create Date: 2026-10-18 19:27:40.215884
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b3e6f2c047'
+down_revision: Union[str, Sequence[str], None] = 'c5f1a9d3e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('search_documents',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    # Backfill: field-weighted word counts (see FIELD_WEIGHTS in app.services.search_index)
+    op.execute("""
+        INSERT INTO search_documents (book_id, length)
+        SELECT books.id,
+               COALESCE(SUM(search_terms.tf * CASE search_terms.field
+                                                  WHEN 'title' THEN 3
+                                                  WHEN 'author' THEN 2
+                                                  ELSE 1 END), 0)
+        FROM books
+        LEFT OUTER JOIN search_terms
+            ON search_terms.book_id = books.id
+           AND search_terms.field IN ('title', 'author', 'description')
+        GROUP BY books.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('search_documents')
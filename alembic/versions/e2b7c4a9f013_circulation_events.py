@@ -0,0 +1,78 @@
+"""Circulation events history, partitioned by month on PostgreSQL
+
+Revision ID: e2b7c4a9f013
+Revises: d9b3e6f2c047
+Create Date: 2026-10-18 21:04:12.518307
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4a9f013'
+down_revision: Union[str, Sequence[str], None] = 'd9b3e6f2c047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # The partition key must be part of the primary key
+        op.execute("""
+            CREATE TABLE circulation_events (
+                id BIGSERIAL NOT NULL,
+                occurred_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+                copy_id INTEGER NOT NULL,
+                book_id INTEGER NOT NULL,
+                library_id INTEGER NOT NULL,
+                previous_status VARCHAR(20) NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                PRIMARY KEY (id, occurred_at)
+            ) PARTITION BY RANGE (occurred_at)
+        """)
+        # Catches rows outside the monthly partitions created so far
+        op.execute(
+            "CREATE TABLE circulation_events_default PARTITION OF circulation_events DEFAULT"
+        )
+        # Monthly partitions of the current and the next 3 months; the app
+        # creates later ones at startup and daily (app.services.circulation)
+        start = date.today().replace(day=1)
+        for _ in range(4):
+            end = (start + timedelta(days=32)).replace(day=1)
+            op.execute(
+                f"CREATE TABLE circulation_events_{start:%Y_%m} "
+                f"PARTITION OF circulation_events FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            start = end
+    else:
+        op.create_table('circulation_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('copy_id', sa.Integer(), nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False),
+        sa.Column('library_id', sa.Integer(), nullable=False),
+        sa.Column('previous_status', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_circulation_events_book_occurred', 'circulation_events',
+                    ['book_id', 'occurred_at'], unique=False)
+    op.create_index('ix_circulation_events_library_occurred', 'circulation_events',
+                    ['library_id', 'occurred_at'], unique=False)
+    op.create_index('ix_circulation_events_copy_occurred', 'circulation_events',
+                    ['copy_id', 'occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_circulation_events_copy_occurred', table_name='circulation_events')
+    op.drop_index('ix_circulation_events_library_occurred', table_name='circulation_events')
+    op.drop_index('ix_circulation_events_book_occurred', table_name='circulation_events')
+    # Drops the partitions as well
+    op.drop_table('circulation_events')
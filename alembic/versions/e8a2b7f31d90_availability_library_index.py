@@ -0,0 +1,29 @@
+"""Index for library and availability filters
+
+Revision ID: e8a2b7f31d90
+Revises: d41f7a8e2c65
+Create Date: 2026-10-18 13:41:12.905337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a2b7f31d90'
+down_revision: Union[str, Sequence[str], None] = 'd41f7a8e2c65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_book_availability_library_book', 'book_availability',
+        ['library_id', 'available_count', 'book_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_availability_library_book', table_name='book_availability')
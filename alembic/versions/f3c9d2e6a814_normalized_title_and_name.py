@@ -0,0 +1,92 @@
+"""Normalized shadow columns for title and author name
+
+Revision ID: f3c9d2e6a814
+Revises: e8a2b7f31d90
+Create Date: 2026-10-18 15:21:09.448102
+
+"""
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9d2e6a814'
+down_revision: Union[str, Sequence[str], None] = 'e8a2b7f31d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text):
+    """app.models.normalize_text as of this revision."""
+    if not text:
+        return ""
+    return " ".join(_NON_WORD_RE.sub(" ", text.casefold().replace("ё", "е")).split())
+
+
+def _backfill(table: str, column: str) -> None:
+    """Fill <column>_normalized with normalize_text(<column>) for existing rows."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f"SELECT id, {column} FROM {table}")).all()
+    if rows:
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {column}_normalized = :value WHERE id = :id"),
+            [{"id": row[0], "value": normalize_text(row[1])} for row in rows],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('title_normalized', sa.String(length=500), nullable=True))
+    op.add_column('authors', sa.Column('name_normalized', sa.String(length=255), nullable=True))
+    _backfill('books', 'title')
+    _backfill('authors', 'name')
+    with op.batch_alter_table('books') as batch_op:
+        batch_op.alter_column('title_normalized', existing_type=sa.String(length=500),
+                              nullable=False)
+    with op.batch_alter_table('authors') as batch_op:
+        batch_op.alter_column('name_normalized', existing_type=sa.String(length=255),
+                              nullable=False)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('ix_books_title_normalized', 'books', ['title_normalized'], unique=False)
+        op.create_index('ix_authors_name_normalized', 'authors', ['name_normalized'], unique=False)
+        return
+
+    # Trigram indexes move from lower(...) to the normalized columns
+    op.drop_index('ix_authors_name_trgm', table_name='authors', postgresql_using='gin')
+    op.drop_index('ix_books_title_trgm', table_name='books', postgresql_using='gin')
+    op.create_index(
+        'ix_books_title_normalized_trgm', 'books', [sa.text('title_normalized gin_trgm_ops')],
+        unique=False, postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_authors_name_normalized_trgm', 'authors', [sa.text('name_normalized gin_trgm_ops')],
+        unique=False, postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('ix_authors_name_normalized', table_name='authors')
+        op.drop_index('ix_books_title_normalized', table_name='books')
+    else:
+        op.drop_index('ix_authors_name_normalized_trgm', table_name='authors',
+                      postgresql_using='gin')
+        op.drop_index('ix_books_title_normalized_trgm', table_name='books', postgresql_using='gin')
+        op.create_index(
+            'ix_books_title_trgm', 'books', [sa.text('lower(title) gin_trgm_ops')],
+            unique=False, postgresql_using='gin',
+        )
+        op.create_index(
+            'ix_authors_name_trgm', 'authors', [sa.text('lower(name) gin_trgm_ops')],
+            unique=False, postgresql_using='gin',
+        )
+
+    op.drop_column('authors', 'name_normalized')
+    op.drop_column('books', 'title_normalized')
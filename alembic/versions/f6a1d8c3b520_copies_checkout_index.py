@@ -0,0 +1,27 @@
+"""Copies index for checkout of an available copy
+
+Revision ID: f6a1d8c3b520
+Revises: e2b7c4a9f013
+Create Date: 2026-10-18 22:16:37.904115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1d8c3b520'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c4a9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_copies_book_library_status', 'copies',
+                    ['book_id', 'library_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_copies_book_library_status', table_name='copies')
@@ -12,6 +12,26 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 20
     refresh_token_expire_days: int = 7
     
+    # Search: minimum trigram word similarity for fuzzy matching (0..1)
+    search_similarity_threshold: float = 0.5
+
+    # Response cache of public read endpoints (0 entries disables it)
+    cache_max_entries: int = 2048
+    cache_ttl_seconds: float = 30.0
+
+    # Batch search: queries per request and how many of them run at once
+    search_batch_max_queries: int = 50
+    search_batch_concurrency: int = 4
+
+    # Bulk copy registration: copies per request
+    copies_bulk_max: int = 1000
+
+    # Circulation desk: scans per batch
+    circulation_scan_max: int = 500
+
+    # Holds: days a reader has to pick up a copy set aside for them
+    hold_pickup_days: int = 7
+
     # App
     debug: bool = False
     
@@ -1,3 +1,9 @@
+import asyncio
+from typing import List, Optional, Sequence
+
+from sqlalchemy import event, literal_column
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import get_settings
@@ -11,6 +17,19 @@ engine = create_async_engine(
     future=True,
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        """Provide pg_trgm-compatible similarity functions on SQLite
+        and enforce foreign keys (and their ON DELETE actions) like PostgreSQL.
+        """
+        from app.services.trigram import register_sqlite_functions
+        register_sqlite_functions(dbapi_connection)
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -29,3 +48,135 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def is_postgresql(db: AsyncSession) -> bool:
+    """Check whether the session is bound to PostgreSQL (SQLite is used in dev)."""
+    return db.bind.dialect.name == "postgresql"
+
+
+FOREIGN_KEY = "foreign_key"
+UNIQUE = "unique"
+NOT_NULL = "not_null"
+
+_PG_VIOLATIONS = {"23503": FOREIGN_KEY, "23505": UNIQUE, "23502": NOT_NULL}
+_SQLITE_VIOLATIONS = {
+    "FOREIGN KEY constraint failed": FOREIGN_KEY,
+    "UNIQUE constraint failed": UNIQUE,
+    "NOT NULL constraint failed": NOT_NULL,
+}
+
+
+async def insert_rows(db: AsyncSession, table, rows: List[dict]) -> None:
+    """Insert many rows of a table (does not commit).
+    
+    On PostgreSQL the rows are streamed with COPY through the session's
+    connection, inside its transaction; elsewhere an executemany INSERT.
+    Every row must have the same keys; omitted columns get their defaults.
+    """
+    if not rows:
+        return
+    if is_postgresql(db):
+        columns = list(rows[0])
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await db.execute(table.insert(), rows)
+
+
+def returning_column(column):
+    """Column of the row being written, for correlated subqueries in RETURNING.
+    
+    SQLAlchemy doesn't correlate subqueries to the target of an
+    INSERT/UPDATE/DELETE, so the column is referenced by its qualified name.
+    """
+    return literal_column(f"{column.table.name}.{column.name}", type_=column.type)
+
+
+def constraint_violation(error: IntegrityError) -> Optional[str]:
+    """Kind of constraint an IntegrityError broke: FOREIGN_KEY, UNIQUE, NOT_NULL or None.
+    
+    Lets writes rely on the database constraints instead of checking
+    referenced and duplicate rows with SELECTs first. SQLite doesn't say
+    which foreign key failed; callers check the candidates on that error path.
+    """
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    if sqlstate:
+        return _PG_VIOLATIONS.get(sqlstate)
+    message = str(error.orig)
+    for prefix, kind in _SQLITE_VIOLATIONS.items():
+        if message.startswith(prefix):
+            return kind
+    return None
+
+
+def violated_column(error: IntegrityError) -> Optional[str]:
+    """Column of a NOT_NULL violation, or None if the driver doesn't say."""
+    # asyncpg raises NotNullViolationError under the DBAPI error, psycopg has diag
+    for source in (error.orig.__cause__, getattr(error.orig, "diag", None)):
+        column = getattr(source, "column_name", None)
+        if column:
+            return column
+    # SQLite: "NOT NULL constraint failed: copies.status"
+    message = str(error.orig)
+    if message.startswith("NOT NULL constraint failed: "):
+        return message.rsplit(".", 1)[-1]
+    return None
+
+
+# Extra pooled connections all requests together may hold for concurrent
+# queries: half of the pool, the rest stays for the requests' own sessions
+_pool_size = getattr(engine.pool, "size", None)
+_parallel_slots = asyncio.Semaphore(max(_pool_size() // 2, 1) if callable(_pool_size) else 0)
+
+
+async def execute_concurrently(db: AsyncSession, *statements, setup: Sequence = ()) -> List[Result]:
+    """Execute independent read-only statements in parallel, results in order.
+    
+    The first statement runs on ``db``, the others on extra sessions of the
+    same engine with their own pooled connections, so the request waits for
+    the slowest query rather than the sum of them. When no extra connection
+    is free the remaining statements run one after another on ``db``.
+    ``setup`` statements (transaction-local settings) run first on every
+    extra session. Statements don't share a snapshot: a count and a page
+    may disagree about rows written meanwhile.
+    """
+    extra = 0
+    while extra < len(statements) - 1 and not _parallel_slots.locked():
+        await _parallel_slots.acquire()
+        extra += 1
+    
+    async def on_request_session(indexes):
+        return [await db.execute(statements[i]) for i in indexes]
+    
+    async def on_extra_session(statement):
+        async with AsyncSession(db.bind, expire_on_commit=False) as session:
+            for setup_statement in setup:
+                await session.execute(setup_statement)
+            return await session.execute(statement)
+    
+    try:
+        own = [0, *range(extra + 1, len(statements))]
+        outcomes = await asyncio.gather(
+            on_request_session(own),
+            *[on_extra_session(statements[i]) for i in range(1, extra + 1)],
+            return_exceptions=True,
+        )
+    finally:
+        for _ in range(extra):
+            _parallel_slots.release()
+    
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    results: List[Result] = [None] * len(statements)
+    for i, result in zip(own, outcomes[0]):
+        results[i] = result
+    for i, result in zip(range(1, extra + 1), outcomes[1:]):
+        results[i] = result
+    return results
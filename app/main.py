@@ -2,13 +2,20 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
+import asyncio
 from contextlib import asynccontextmanager
 
-from app.database import engine, Base
-from app.routers import auth, libraries, books, search, authors
+from app.database import engine, Base, AsyncSessionLocal
+from app.routers import auth, libraries, books, search, authors, circulation, holds
 from app.config import validate_critical_settings
 from app.logging_config import setup_logging, get_logger
 from app.middleware import RequestLoggingMiddleware, ErrorLoggingMiddleware
+from app.services.autocomplete import autocomplete_index
+from app.services.circulation import ensure_partitions, maintain_partitions
+from app.services.similar_books import similar_books
+from app.services.spelling import spelling_dictionary
+from app.services.cache import response_cache
+from app.services.singleflight import request_flights
 
 # Валидация критических настроек при импорте модуля
 # Вызывает ошибку с понятным сообщением если SECRET_KEY или DATABASE_URL не заданы
@@ -30,8 +37,20 @@ async def lifespan(app: FastAPI):
     # Startup: create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
+    # Build in-memory search indexes
+    async with AsyncSessionLocal() as session:
+        await autocomplete_index.load(session)
+        await spelling_dictionary.load(session)
+        await similar_books.load(session)
+    logger.info(f"Autocomplete index loaded: {len(autocomplete_index)} entries")
+    logger.info(f"Spelling dictionary loaded: {len(spelling_dictionary)} words")
+    logger.info(f"Similar books index loaded: {len(similar_books)} books")
+    # Keep creating the partitions of the coming months while running
+    partitions = asyncio.create_task(maintain_partitions(engine))
     yield
     # Shutdown
+    partitions.cancel()
     await engine.dispose()
 
 
@@ -52,6 +71,8 @@ app.include_router(libraries.router)
 app.include_router(books.router)
 app.include_router(search.router)
 app.include_router(authors.router)
+app.include_router(circulation.router)
+app.include_router(holds.router)
 
 # Static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -116,3 +137,14 @@ async def health():
         "version": "0.1.0",
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
+
+
+@app.get("/metrics")
+async def metrics():
+    """In-process counters of this worker: response cache size, hits, misses,
+    evictions, and per endpoint queries executed vs. requests collapsed into them.
+    """
+    return {
+        "cache": response_cache.stats(),
+        "coalescing": request_flights.stats(),
+    }
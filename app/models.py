@@ -1,14 +1,33 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
+import re
+
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text):
+    """Matching form of a title or name: casefolded, ё→е, punctuation and
+    whitespace collapsed to single spaces ("Война  и мир!" -> "война и мир").
+    
+    Stored in the *_normalized shadow columns and applied to search
+    strings, so a single comparison matches on both SQLite and PostgreSQL.
+    """
+    if not text:
+        return ""
+    return " ".join(_NON_WORD_RE.sub(" ", text.casefold().replace("ё", "е")).split())
+
 
 class Author(Base):
     __tablename__ = "authors"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
+    # normalize_text(name), set whenever name is assigned
+    name_normalized = Column(String(255), nullable=False)
     bio = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -32,6 +51,7 @@ class Library(Base):
     # Relationships
     copies = relationship("Copy", back_populates="library")
     staff = relationship("StaffUser", back_populates="library")
+    availability = relationship("BookAvailability", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Library(id={self.id}, name='{self.name}')>"
@@ -42,6 +62,8 @@ class Book(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False, index=True)
+    # normalize_text(title), set whenever title is assigned
+    title_normalized = Column(String(500), nullable=False)
     author_id = Column(Integer, ForeignKey("authors.id", ondelete="SET NULL"), nullable=True)
     isbn = Column(String(13), unique=True, nullable=True, index=True)
     year = Column(Integer, nullable=True)
@@ -50,12 +72,16 @@ class Book(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Full-text search vector (will be populated by trigger or manually)
-    search_vector = Column(Text, nullable=True)
+    # Full-text search vector: weighted title (A), author (B) and description (C).
+    # Maintained by the books_search_vector trigger on PostgreSQL, unused on SQLite.
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
     
     # Relationships
     author = relationship("Author", back_populates="books")
     copies = relationship("Copy", back_populates="book", cascade="all, delete-orphan")
+    availability = relationship("BookAvailability", cascade="all, delete-orphan")
+    search_terms = relationship("SearchTerm", cascade="all, delete-orphan")
+    search_document = relationship("SearchDocument", cascade="all, delete-orphan", uselist=False)
     
     def __repr__(self):
         return f"<Book(id={self.id}, title='{self.title[:30]}...')>"
@@ -79,6 +105,88 @@ class Copy(Base):
         return f"<Copy(id={self.id}, inv='{self.inventory_number}', status='{self.status}')>"
 
 
+class BookAvailability(Base):
+    """Copy counts of a book per library, kept in step with copies by the copy endpoints."""
+    __tablename__ = "book_availability"
+    
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    library_id = Column(Integer, ForeignKey("libraries.id", ondelete="CASCADE"), primary_key=True)
+    total_count = Column(Integer, default=0, nullable=False)
+    available_count = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return (
+            f"<BookAvailability(book_id={self.book_id}, library_id={self.library_id}, "
+            f"available={self.available_count}/{self.total_count})>"
+        )
+
+
+class SearchTerm(Base):
+    """Stemmed term of a book's title, author name or description (see app.services.search_index)."""
+    __tablename__ = "search_terms"
+    
+    term = Column(String(100), primary_key=True)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(20), primary_key=True)  # title, author, description
+    tf = Column(Integer, default=1, nullable=False)  # occurrences of the term in the field
+    
+    def __repr__(self):
+        return f"<SearchTerm(term='{self.term}', book_id={self.book_id}, field='{self.field}')>"
+
+
+class SearchDocument(Base):
+    """Field-weighted length of a book's indexed text, for BM25 length normalization."""
+    __tablename__ = "search_documents"
+    
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    length = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<SearchDocument(book_id={self.book_id}, length={self.length})>"
+
+
+class CirculationEvent(Base):
+    """Status change of a copy, append-only (see app.services.circulation).
+    
+    On PostgreSQL the migration creates the table partitioned by month of
+    occurred_at, with (id, occurred_at) as the primary key. Book and library
+    are copied from the copy, without foreign keys: history outlives
+    deleted copies, and rollups don't join the copies table.
+    """
+    __tablename__ = "circulation_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    copy_id = Column(Integer, nullable=False)
+    book_id = Column(Integer, nullable=False)
+    library_id = Column(Integer, nullable=False)
+    previous_status = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    
+    def __repr__(self):
+        return (
+            f"<CirculationEvent(copy_id={self.copy_id}, "
+            f"'{self.previous_status}' -> '{self.status}', at={self.occurred_at})>"
+        )
+
+
+class Hold(Base):
+    """Reader's hold of a book, queued by id (see app.services.circulation)."""
+    __tablename__ = "holds"
+    
+    id = Column(Integer, primary_key=True)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
+    library_id = Column(Integer, ForeignKey("libraries.id", ondelete="CASCADE"), nullable=True)  # pickup library, any if NULL
+    patron_card = Column(String(50), nullable=False)  # reader's library card number
+    status = Column(String(20), default="waiting", nullable=False)  # waiting, ready, fulfilled, cancelled, expired
+    copy_id = Column(Integer, ForeignKey("copies.id", ondelete="SET NULL"), nullable=True)  # set aside once ready
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    ready_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<Hold(id={self.id}, book_id={self.book_id}, card='{self.patron_card}', status='{self.status}')>"
+
+
 class StaffUser(Base):
     __tablename__ = "staff_users"
     
@@ -98,5 +206,124 @@ class StaffUser(Base):
         return f"<StaffUser(id={self.id}, username='{self.username}')>"
 
 
+# Composite indexes for keyset pagination: search by (title, id), listing by (created_at, id)
+Index('ix_books_title_id', Book.title, Book.id)
+Index('ix_books_created_at_id', Book.created_at, Book.id)
+
+# Library-driven path for availability filters: books held by (available in) a library
+Index(
+    'ix_book_availability_library_book',
+    BookAvailability.library_id,
+    BookAvailability.available_count,
+    BookAvailability.book_id,
+)
+
+# Reindexing and deleting a book's terms (term lookups use the primary key)
+Index('ix_search_terms_book_id', SearchTerm.book_id)
+
+# Copies of a book, and the checkout lookup of an available copy at a library
+Index('ix_copies_book_library_status', Copy.book_id, Copy.library_id, Copy.status)
+
+# Hold queues: head of a book's queue and the entries ahead of a hold, in
+# the whole queue and among the holds for one pickup library (or for any);
+# ready holds by copy; one active hold of a reader per book
+Index('ix_holds_book_status_id', Hold.book_id, Hold.status, Hold.id)
+Index('ix_holds_book_status_library_id', Hold.book_id, Hold.status, Hold.library_id, Hold.id)
+Index('ix_holds_copy_id', Hold.copy_id)
+Index(
+    'ix_holds_patron_book_active',
+    Hold.patron_card,
+    Hold.book_id,
+    unique=True,
+    postgresql_where=Hold.status.in_(["waiting", "ready"]),
+    sqlite_where=Hold.status.in_(["waiting", "ready"]),
+)
+
+# Circulation rollups per book / library over a period, history of a copy
+Index('ix_circulation_events_book_occurred', CirculationEvent.book_id, CirculationEvent.occurred_at)
+Index('ix_circulation_events_library_occurred', CirculationEvent.library_id, CirculationEvent.occurred_at)
+Index('ix_circulation_events_copy_occurred', CirculationEvent.copy_id, CirculationEvent.occurred_at)
+
 # Create index for full-text search
 Index('ix_books_search_vector', Book.search_vector, postgresql_using='gin')
+
+# Trigram indexes on the normalized columns serve both fuzzy matching (<%)
+# and substring LIKE (pg_trgm, PostgreSQL only)
+Index(
+    'ix_books_title_normalized_trgm',
+    Book.title_normalized,
+    postgresql_using='gin',
+    postgresql_ops={'title_normalized': 'gin_trgm_ops'},
+).ddl_if(dialect='postgresql')
+Index(
+    'ix_authors_name_normalized_trgm',
+    Author.name_normalized,
+    postgresql_using='gin',
+    postgresql_ops={'name_normalized': 'gin_trgm_ops'},
+).ddl_if(dialect='postgresql')
+# On SQLite substring LIKE scans the narrow index instead of the table
+Index('ix_books_title_normalized', Book.title_normalized).ddl_if(dialect='sqlite')
+Index('ix_authors_name_normalized', Author.name_normalized).ddl_if(dialect='sqlite')
+
+
+@event.listens_for(Book.title, "set")
+def _set_title_normalized(target, value, oldvalue, initiator):
+    target.title_normalized = normalize_text(value)
+
+
+@event.listens_for(Author.name, "set")
+def _set_name_normalized(target, value, oldvalue, initiator):
+    target.name_normalized = normalize_text(value)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+# Text search configuration used both by the trigger and by search queries
+FTS_CONFIG = "russian"
+
+BOOKS_SEARCH_VECTOR_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+DECLARE
+    author_name text;
+BEGIN
+    SELECT name INTO author_name FROM authors WHERE id = NEW.author_id;
+    NEW.search_vector :=
+        setweight(to_tsvector('{FTS_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('{FTS_CONFIG}', coalesce(author_name, '')), 'B') ||
+        setweight(to_tsvector('{FTS_CONFIG}', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""")
+
+BOOKS_SEARCH_VECTOR_TRIGGER = DDL("""
+CREATE TRIGGER books_search_vector
+BEFORE INSERT OR UPDATE OF title, description, author_id ON books
+FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+""")
+
+# Renaming an author re-fires the books trigger for all of their books
+AUTHORS_SEARCH_VECTOR_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION authors_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE books SET author_id = author_id WHERE author_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+
+AUTHORS_SEARCH_VECTOR_TRIGGER = DDL("""
+CREATE TRIGGER authors_search_vector
+AFTER UPDATE OF name ON authors
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION authors_search_vector_update()
+""")
+
+for _ddl in (BOOKS_SEARCH_VECTOR_FUNCTION, BOOKS_SEARCH_VECTOR_TRIGGER):
+    event.listen(Book.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+for _ddl in (AUTHORS_SEARCH_VECTOR_FUNCTION, AUTHORS_SEARCH_VECTOR_TRIGGER):
+    event.listen(Author.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
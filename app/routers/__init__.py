@@ -1,4 +1,4 @@
 # Routers package
-from app.routers import auth, libraries, books, search
+from app.routers import auth, libraries, books, search, circulation, holds
 
-__all__ = ["auth", "libraries", "books", "search"]
+__all__ = ["auth", "libraries", "books", "search", "circulation", "holds"]
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, insert, update, delete, exists, literal
+from typing import List, Optional
 
 from app.database import get_db
-from app.models import Author
+from app.models import Author, Book, normalize_text
 from app.routers.auth import get_current_active_staff
+from app.services.autocomplete import autocomplete_index
+from app.services.cache import response_cache, author_tag, SEARCH
+from app.services.search_index import index_author_books
+from app.services.similar_books import similar_books
+from app.services.spelling import spelling_dictionary
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/authors", tags=["authors"])
@@ -33,27 +38,45 @@ async def list_authors(
     return [AuthorResponse(id=a.id, name=a.name) for a in authors]
 
 
+def _name_taken(name: str, author_id: Optional[int] = None):
+    """EXISTS: another author already has this name."""
+    stmt = select(Author.id).where(Author.name == name)
+    if author_id is not None:
+        stmt = stmt.where(Author.id != author_id)
+    return exists(stmt)
+
+
 @router.post("", response_model=AuthorResponse, status_code=status.HTTP_201_CREATED)
 async def create_author(
     author_data: AuthorCreate,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Create new author (staff only)."""
-    # Check if author already exists
+    """Create new author (staff only).
+    
+    The duplicate check is part of the INSERT: no row comes back if the name is taken.
+    """
+    name = author_data.name
     result = await db.execute(
-        select(Author).filter(Author.name == author_data.name)
+        insert(Author)
+        .from_select(
+            ["name", "name_normalized"],
+            select(literal(name), literal(normalize_text(name))).where(~_name_taken(name)),
+        )
+        .returning(Author.id, Author.name)
     )
-    if result.scalar_one_or_none():
+    new_author = result.one_or_none()
+    if not new_author:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Author already exists"
         )
     
-    new_author = Author(name=author_data.name)
-    db.add(new_author)
     await db.commit()
-    await db.refresh(new_author)
+    autocomplete_index.add_author(new_author.id, new_author.name)
+    spelling_dictionary.add_author(new_author.id, new_author.name)
+    similar_books.add_author(new_author.id, new_author.name)
+    response_cache.invalidate(SEARCH)
     
     return AuthorResponse(id=new_author.id, name=new_author.name)
 
@@ -66,31 +89,34 @@ async def update_author(
     current_user = Depends(get_current_active_staff)
 ):
     """Update author (staff only)."""
+    name = author_data.name
     result = await db.execute(
-        select(Author).filter(Author.id == author_id)
+        update(Author)
+        .where(Author.id == author_id, ~_name_taken(name, author_id))
+        .values(name=name, name_normalized=normalize_text(name))
+        .returning(Author.id, Author.name)
     )
-    author = result.scalar_one_or_none()
+    author = result.one_or_none()
     
     if not author:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Author not found"
-        )
-    
-    # Check if new name already exists (and it's not the same author)
-    if author_data.name != author.name:
-        existing = await db.execute(
-            select(Author).filter(Author.name == author_data.name)
-        )
-        if existing.scalar_one_or_none():
+        # Nothing updated: tell a missing author from a taken name
+        found = await db.execute(select(Author.id).where(Author.id == author_id))
+        if found.scalar_one_or_none() is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Author with this name already exists"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Author not found"
             )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Author with this name already exists"
+        )
     
-    author.name = author_data.name
+    await index_author_books(db, author.id)
     await db.commit()
-    await db.refresh(author)
+    autocomplete_index.add_author(author.id, author.name)
+    spelling_dictionary.add_author(author.id, author.name)
+    similar_books.add_author(author.id, author.name)
+    response_cache.invalidate(SEARCH, author_tag(author_id))
     
     return AuthorResponse(id=author.id, name=author.name)
 
@@ -101,18 +127,21 @@ async def delete_author(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Delete author (staff only)."""
-    result = await db.execute(
-        select(Author).filter(Author.id == author_id)
-    )
-    author = result.scalar_one_or_none()
+    """Delete author (staff only) together with their books."""
+    # books.author_id is ON DELETE SET NULL, so the books go first
+    await db.execute(delete(Book).where(Book.author_id == author_id))
+    result = await db.execute(delete(Author).where(Author.id == author_id).returning(Author.id))
     
-    if not author:
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Author not found"
         )
     
-    await db.delete(author)
     await db.commit()
+    autocomplete_index.remove_author(author_id)
+    spelling_dictionary.remove_author(author_id)
+    similar_books.remove_author(author_id)
+    response_cache.invalidate(SEARCH, author_tag(author_id))
     return None
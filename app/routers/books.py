@@ -1,19 +1,41 @@
+import csv
 import os
 import shutil
+from collections import Counter
+from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete, case
+from sqlalchemy import select, func, insert, update, delete, exists, literal_column, type_coerce, JSON
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, NoReturn, Optional, Sequence
 
-from app.database import get_db
-from app.models import Book, Author, Copy, Library
+from app.config import get_settings
+from app.database import (
+    get_db, is_postgresql, constraint_violation, returning_column, violated_column,
+    FOREIGN_KEY, NOT_NULL, UNIQUE
+)
+from app.models import Book, Author, BookAvailability, Copy, Hold, Library, normalize_text
 from app.routers.auth import get_current_active_staff
+from app.services.autocomplete import autocomplete_index, BOOK
+from app.services.availability import adjust_availability, availability_counts, copy_delta
+from app.services.catalog_import import CatalogImport, CSV, JSONL
+from app.services.circulation import (
+    StatusChange, apply_holds, hold_new_copies, record_events, requeue_holds, serve_holds,
+    AVAILABLE, WAITING
+)
+from app.services.cache import response_cache, book_tag, author_tag, LIBRARIES, SEARCH
+from app.services.search_index import store_book_terms
+from app.services.similar_books import similar_books
+from app.services.spelling import spelling_dictionary
+from app.services.pagination import decode_cursor, encode_cursor, order_by_keys, seek_condition
 from app.schemas.book import (
-    BookCreate, BookUpdate, BookResponse, BookDetailResponse,
-    CopyCreate, CopyUpdate, CopyResponse
+    BookCreate, BookUpdate, BookResponse, BookDetailResponse, SimilarBookResponse,
+    BookCopyItem, LibraryAvailability, BookImportResult,
+    CopyCreate, CopyBulkCreate, CopyUpdate, CopyResponse
 )
 
 # Constants for cover upload
@@ -22,19 +44,35 @@ ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 UPLOAD_DIR = Path("uploads/covers")
 
+# Catalog import file formats by extension
+IMPORT_FORMATS = {".csv": CSV, ".jsonl": JSONL, ".ndjson": JSONL}
+
 router = APIRouter(prefix="/api/v1/books", tags=["books"])
+settings = get_settings()
 
 
 @router.get("", response_model=List[BookResponse])
 async def list_books(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     author_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List books with pagination and optional author filter."""
+    """List books, newest first, with pagination and optional author filter.
     
-    # Build query with counts
+    The X-Next-Cursor response header holds the cursor of the next page,
+    which seeks by (created_at, id) instead of skipping rows.
+    """
+    created_at = Book.created_at
+    if not is_postgresql(db):
+        # SQLite keeps CURRENT_TIMESTAMP defaults without the fractional part that
+        # bound datetimes carry; compare both through datetime() in the same format
+        created_at = func.datetime(Book.created_at)
+    sort_keys = [(created_at, True), (Book.id, True)]
+    
+    # Build query with counts from the availability rollup
     stmt = (
         select(
             Book.id,
@@ -47,26 +85,39 @@ async def list_books(
             Book.created_at,
             Book.updated_at,
             Author.name.label("author_name"),
-            func.count(Copy.id).label("total_count"),
-            func.sum(case((Copy.status == "available", 1), else_=0)).label("available_count")
+            *availability_counts()
         )
         .join(Author, Book.author_id == Author.id)
-        .outerjoin(Copy, Book.id == Copy.book_id)
     )
     
     if author_id:
         stmt = stmt.filter(Book.author_id == author_id)
     
-    stmt = (
-        stmt.group_by(Book.id, Author.name)
-        .offset(skip)
-        .limit(limit)
-        .order_by(Book.created_at.desc())
-    )
+    if cursor:
+        try:
+            last_created_at, last_id = decode_cursor(cursor, len(sort_keys))
+            last_created_at = datetime.fromisoformat(last_created_at)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        if not is_postgresql(db):
+            last_created_at = func.datetime(last_created_at)
+        stmt = stmt.filter(seek_condition(sort_keys, [last_created_at, last_id]))
+    else:
+        stmt = stmt.offset(skip)
+    
+    # One extra row tells whether there is a next page
+    stmt = stmt.limit(limit + 1).order_by(*order_by_keys(sort_keys))
     
     result = await db.execute(stmt)
     rows = result.all()
     
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([rows[-1].created_at, rows[-1].id])
+    
     return [
         BookResponse(
             id=row.id,
@@ -86,20 +137,92 @@ async def list_books(
     ]
 
 
+def _json_array(db: AsyncSession, rows, order_by: Sequence = ()):
+    """Scalar subquery aggregating the rows of a subquery into a JSON array of
+    objects keyed by column name (json_agg on PostgreSQL, json_group_array on SQLite).
+    """
+    pairs = [item for column in rows.c for item in (literal_column(f"'{column.name}'"), column)]
+    if is_postgresql(db):
+        objects = func.json_build_object(*pairs)
+        if order_by:
+            objects = aggregate_order_by(objects, *order_by)
+        array = func.coalesce(func.json_agg(objects), literal_column("'[]'::json"))
+    else:
+        # SQLite aggregates in the order of the (ordered) subquery
+        array = func.json_group_array(func.json_object(*pairs))
+    return select(type_coerce(array, JSON)).select_from(rows).scalar_subquery()
+
+
 @router.get("/{book_id}", response_model=BookDetailResponse)
 async def get_book(
     book_id: int,
+    copies_limit: int = Query(0, ge=0, le=100, description="Include a page of this many copies"),
+    copies_offset: int = Query(0, ge=0, description="Copies to skip"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get book details with availability by library."""
+    """Get book details with copy counts by library.
     
-    # Get book with author
-    book_result = await db.execute(
-        select(Book, Author.name.label("author_name"))
+    copies_limit > 0 adds a page of the copies themselves, ordered by
+    library and inventory number.
+    """
+    return await response_cache.get_or_load(
+        ("book", book_id, copies_limit, copies_offset),
+        lambda: _get_book(db, book_id, copies_limit, copies_offset),
+        tags=lambda book: (book_tag(book_id), author_tag(book.author_id), LIBRARIES),
+    )
+
+
+async def _get_book(
+    db: AsyncSession, book_id: int, copies_limit: int = 0, copies_offset: int = 0
+) -> BookDetailResponse:
+    """get_book without the response cache."""
+    # One statement: the book, per-library counts from the availability rollup
+    # and optionally a page of copies, both aggregated to JSON arrays
+    libraries = (
+        select(
+            BookAvailability.library_id,
+            Library.name.label("library_name"),
+            BookAvailability.total_count,
+            BookAvailability.available_count,
+        )
+        .join(Library, BookAvailability.library_id == Library.id)
+        .filter(BookAvailability.book_id == book_id, BookAvailability.total_count > 0)
+        .order_by(Library.name, Library.id)
+        .subquery()
+    )
+    columns = [
+        Book,
+        Author.name.label("author_name"),
+        _json_array(db, libraries, [libraries.c.library_name, libraries.c.library_id])
+        .label("libraries"),
+    ]
+    if copies_limit:
+        copies = (
+            select(
+                Copy.id,
+                Copy.library_id,
+                Library.name.label("library_name"),
+                Copy.inventory_number,
+                Copy.status,
+            )
+            .join(Library, Copy.library_id == Library.id)
+            .filter(Copy.book_id == book_id)
+            .order_by(Library.name, Copy.inventory_number)
+            .limit(copies_limit)
+            .offset(copies_offset)
+            .subquery()
+        )
+        columns.append(
+            _json_array(db, copies, [copies.c.library_name, copies.c.inventory_number])
+            .label("copies")
+        )
+    
+    result = await db.execute(
+        select(*columns)
         .join(Author, Book.author_id == Author.id)
         .filter(Book.id == book_id)
     )
-    row = book_result.first()
+    row = result.first()
     
     if not row:
         raise HTTPException(
@@ -107,30 +230,8 @@ async def get_book(
             detail="Book not found"
         )
     
-    book, author_name = row
-    
-    # Get copies with library info
-    copies_result = await db.execute(
-        select(Copy, Library.name.label("library_name"))
-        .join(Library, Copy.library_id == Library.id)
-        .filter(Copy.book_id == book_id)
-    )
-    
-    copies_by_library = []
-    total_count = 0
-    available_count = 0
-    
-    for copy_row in copies_result:
-        copy, library_name = copy_row
-        copies_by_library.append({
-            "library_id": copy.library_id,
-            "library_name": library_name,
-            "inventory_number": copy.inventory_number,
-            "status": copy.status
-        })
-        total_count += 1
-        if copy.status == "available":
-            available_count += 1
+    book = row.Book
+    libraries = [LibraryAvailability(**library) for library in row.libraries]
     
     return BookDetailResponse(
         id=book.id,
@@ -142,72 +243,162 @@ async def get_book(
         cover_url=book.cover_url,
         created_at=book.created_at,
         updated_at=book.updated_at,
-        author_name=author_name,
-        total_count=total_count,
-        available_count=available_count,
-        copies_by_library=copies_by_library
+        author_name=row.author_name,
+        total_count=sum(library.total_count for library in libraries),
+        available_count=sum(library.available_count for library in libraries),
+        libraries=libraries,
+        copies=[BookCopyItem(**copy) for copy in row.copies] if copies_limit else None
     )
 
 
-@router.post("", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
-async def create_book(
-    book_data: BookCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_staff)
+@router.get("/{book_id}/similar", response_model=List[SimilarBookResponse])
+async def get_similar_books(
+    book_id: int,
+    limit: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Create new book (staff only)."""
+    """Books with the most similar title, author and description, most similar first.
     
-    # Check if author exists
-    author_result = await db.execute(
-        select(Author).filter(Author.id == book_data.author_id)
+    Similarities come from the in-memory TF-IDF index (app.services.similar_books),
+    the database is only asked for the details of the books found. Cached per
+    version of the index: a rebuilt matrix is never answered from the old one.
+    """
+    return await response_cache.get_or_load(
+        ("similar", book_id, limit, similar_books.version),
+        lambda: _get_similar_books(db, book_id, limit),
+        tags=(SEARCH,),
     )
-    if not author_result.scalar_one_or_none():
+
+
+async def _get_similar_books(db: AsyncSession, book_id: int, limit: int) -> List[SimilarBookResponse]:
+    """get_similar_books without the response cache."""
+    if book_id not in similar_books:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Author not found"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
         )
     
-    # Create book
-    new_book = Book(
-        title=book_data.title,
-        author_id=book_data.author_id,
-        isbn=book_data.isbn,
-        year=book_data.year,
-        description=book_data.description,
-        search_vector=f"{book_data.title}"  # Will be updated with author name later
-    )
-    
-    db.add(new_book)
-    await db.commit()
-    await db.refresh(new_book)
+    similarities = dict(similar_books.similar(book_id, limit))
+    if not similarities:
+        return []
     
-    # Get author name and counts
     result = await db.execute(
         select(
-            Book,
-            Author.name.label("author_name")
+            Book.id,
+            Book.title,
+            Book.author_id,
+            Book.isbn,
+            Book.year,
+            Book.description,
+            Book.cover_url,
+            Book.created_at,
+            Book.updated_at,
+            Author.name.label("author_name"),
+            *availability_counts()
         )
         .join(Author, Book.author_id == Author.id)
-        .filter(Book.id == new_book.id)
+        .filter(Book.id.in_(list(similarities)))
     )
-    book_row = result.first()
-    
-    return BookResponse(
-        id=book_row.Book.id,
-        title=book_row.Book.title,
-        author_id=book_row.Book.author_id,
-        isbn=book_row.Book.isbn,
-        year=book_row.Book.year,
-        description=book_row.Book.description,
-        cover_url=book_row.Book.cover_url,
-        created_at=book_row.Book.created_at,
-        updated_at=book_row.Book.updated_at,
-        author_name=book_row.author_name,
-        total_count=0,
-        available_count=0
+    rank = {similar_id: i for i, similar_id in enumerate(similarities)}
+    rows = sorted(result.all(), key=lambda row: rank[row.id])
+    
+    return [
+        SimilarBookResponse(
+            id=row.id,
+            title=row.title,
+            author_id=row.author_id,
+            isbn=row.isbn,
+            year=row.year,
+            description=row.description,
+            cover_url=row.cover_url,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            author_name=row.author_name,
+            total_count=row.total_count or 0,
+            available_count=row.available_count or 0,
+            similarity=similarities[row.id]
+        )
+        for row in rows
+    ]
+
+
+def _book_returning():
+    """BookResponse columns of a written book, for RETURNING: the author name
+    and counts come from subqueries correlated to the written row.
+    """
+    return (
+        Book.id,
+        Book.title,
+        Book.author_id,
+        Book.isbn,
+        Book.year,
+        Book.description,
+        Book.cover_url,
+        Book.created_at,
+        Book.updated_at,
+        select(Author.name)
+        .where(Author.id == returning_column(Book.author_id))
+        .scalar_subquery()
+        .label("author_name"),
+        *availability_counts(book_id=returning_column(Book.id)),
     )
 
 
+async def _reject_book_write(db: AsyncSession, error: IntegrityError) -> NoReturn:
+    """Roll back a book insert/update that broke a constraint and report why."""
+    await db.rollback()
+    violation = constraint_violation(error)
+    if violation == FOREIGN_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Author not found"
+        )
+    if violation == UNIQUE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book with this ISBN already exists"
+        )
+    raise error
+
+
+@router.post("", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
+async def create_book(
+    book_data: BookCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Create new book (staff only).
+    
+    A missing author is reported by the foreign key, the response comes
+    from INSERT ... RETURNING.
+    """
+    try:
+        result = await db.execute(
+            insert(Book)
+            .values(
+                title=book_data.title,
+                title_normalized=normalize_text(book_data.title),
+                author_id=book_data.author_id,
+                isbn=book_data.isbn,
+                year=book_data.year,
+                description=book_data.description
+            )
+            .returning(*_book_returning())
+        )
+    except IntegrityError as e:
+        await _reject_book_write(db, e)
+    row = result.one()
+    
+    await store_book_terms(db, [(row.id, row.title, row.author_name, row.description)], replace=False)
+    await db.commit()
+    autocomplete_index.add_book(row.id, row.title, row.author_id)
+    spelling_dictionary.add_book(row.id, row.title, row.author_id)
+    similar_books.add_book(row.id, row.title, row.author_id, row.description)
+    response_cache.invalidate(SEARCH)
+    
+    return BookResponse.model_validate(row._mapping)
+
+
 @router.put("/{book_id}", response_model=BookResponse)
 async def update_book(
     book_id: int,
@@ -216,29 +407,41 @@ async def update_book(
     current_user = Depends(get_current_active_staff)
 ):
     """Update book (staff only)."""
+    update_data = book_data.model_dump(exclude_unset=True)
+    if not update_data:
+        result = await db.execute(select(*_book_returning()).where(Book.id == book_id))
+    else:
+        if "title" in update_data:
+            update_data["title_normalized"] = normalize_text(update_data["title"])
+        try:
+            result = await db.execute(
+                update(Book)
+                .where(Book.id == book_id)
+                .values(**update_data)
+                .returning(*_book_returning())
+            )
+        except IntegrityError as e:
+            await _reject_book_write(db, e)
+    row = result.one_or_none()
     
-    # Get book
-    result = await db.execute(
-        select(Book).filter(Book.id == book_id)
-    )
-    book = result.scalar_one_or_none()
-    
-    if not book:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
-    # Update fields
-    update_data = book_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(book, field, value)
-    
+    reindex = bool(update_data.keys() & {"title", "description", "author_id"})
+    if reindex:
+        await store_book_terms(db, [(row.id, row.title, row.author_name, row.description)])
     await db.commit()
-    await db.refresh(book)
-    
-    # Get full response
-    return await get_book(book_id, db)
+    if "title" in update_data or "author_id" in update_data:
+        autocomplete_index.add_book(row.id, row.title, row.author_id)
+        spelling_dictionary.add_book(row.id, row.title, row.author_id)
+    if reindex:
+        similar_books.add_book(row.id, row.title, row.author_id, row.description)
+    response_cache.invalidate(SEARCH, book_tag(book_id))
+    
+    return BookResponse.model_validate(row._mapping)
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -247,24 +450,81 @@ async def delete_book(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Delete book (staff only)."""
-    
-    result = await db.execute(
-        select(Book).filter(Book.id == book_id)
-    )
-    book = result.scalar_one_or_none()
-    
-    if not book:
+    """Delete book (staff only). Copies, counts and terms go by ON DELETE CASCADE."""
+    result = await db.execute(delete(Book).where(Book.id == book_id).returning(Book.id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
-    await db.delete(book)
     await db.commit()
+    autocomplete_index.remove_book(book_id)
+    spelling_dictionary.remove_book(book_id)
+    similar_books.remove_book(book_id)
+    response_cache.invalidate(SEARCH, book_tag(book_id))
     return None
 
 
+@router.post("/import", response_model=BookImportResult)
+async def import_books(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(
+        None, pattern="^(csv|jsonl)$", description="Defaults to the file extension"
+    ),
+    library_id: Optional[int] = Query(None, description="Library of copies given without library_id"),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Import books and copies from a CSV or JSON Lines file (staff only).
+    
+    Fields: title, author, isbn, year, description, library_id,
+    inventory_number, status. Authors are matched by name and books by
+    ISBN or by title and author, missing ones are created; a row with an
+    inventory number adds a copy. The file is read in batches (see
+    app.services.catalog_import) and committed at once; invalid rows are
+    skipped and reported by line.
+    """
+    if format is None:
+        suffix = Path(file.filename or "").suffix.lower()
+        format = IMPORT_FORMATS.get(suffix)
+        if format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown file format. Allowed extensions: {', '.join(IMPORT_FORMATS)}"
+            )
+    
+    catalog_import = CatalogImport(default_library_id=library_id)
+    try:
+        await catalog_import.run(db, file.file, format)
+    except (UnicodeDecodeError, csv.Error) as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unreadable file, nothing was imported: {e}"
+        )
+    except IntegrityError:
+        # Books or copies added concurrently with the same ISBN / inventory number
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Import conflicts with concurrent changes, nothing was imported"
+        )
+    
+    await db.commit()
+    catalog_import.sync_memory()
+    response_cache.invalidate(SEARCH, *map(book_tag, catalog_import.touched_book_ids))
+    
+    return BookImportResult(
+        rows=catalog_import.rows,
+        authors_created=catalog_import.authors_created,
+        books_created=catalog_import.books_created,
+        copies_created=catalog_import.copies_created,
+        error_count=catalog_import.error_count,
+        errors=catalog_import.errors,
+    )
+
+
 @router.post("/{book_id}/cover", response_model=BookResponse)
 async def upload_book_cover(
     book_id: int,
@@ -277,18 +537,6 @@ async def upload_book_cover(
     Supported formats: jpg, jpeg, png, webp
     Max file size: 5MB
     """
-    # Check if book exists
-    result = await db.execute(
-        select(Book).filter(Book.id == book_id)
-    )
-    book = result.scalar_one_or_none()
-    
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Book not found"
-        )
-    
     # Validate file extension
     file_ext = Path(cover.filename).suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
@@ -312,64 +560,40 @@ async def upload_book_cover(
             detail=f"File size exceeds maximum allowed size of 5MB"
         )
     
+    # Update book record (committed once the file is saved)
+    filename = f"{book_id}{file_ext}"
+    result = await db.execute(
+        update(Book)
+        .where(Book.id == book_id)
+        .values(cover_url=f"/uploads/covers/{filename}")
+        .returning(*_book_returning())
+    )
+    row = result.one_or_none()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    
     # Ensure upload directory exists
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Delete old cover if exists
-    if book.cover_url:
-        old_path = Path(book.cover_url.lstrip('/'))
-        if old_path.exists():
+    # Delete old cover if it has another extension (the same name is overwritten)
+    for old_path in UPLOAD_DIR.glob(f"{book_id}.*"):
+        if old_path.name != filename:
             old_path.unlink()
     
     # Save new cover file
-    filename = f"{book_id}{file_ext}"
     file_path = UPLOAD_DIR / filename
     
     with open(file_path, "wb") as f:
         f.write(content)
     
-    # Update book record
-    book.cover_url = f"/uploads/covers/{filename}"
     await db.commit()
-    await db.refresh(book)
+    response_cache.invalidate(SEARCH, book_tag(book_id))
     
-    # Get full response with counts
-    result = await db.execute(
-        select(
-            Book.id,
-            Book.title,
-            Book.author_id,
-            Book.isbn,
-            Book.year,
-            Book.description,
-            Book.cover_url,
-            Book.created_at,
-            Book.updated_at,
-            Author.name.label("author_name"),
-            func.count(Copy.id).label("total_count"),
-            func.sum(case((Copy.status == "available", 1), else_=0)).label("available_count")
-        )
-        .join(Author, Book.author_id == Author.id)
-        .outerjoin(Copy, Book.id == Copy.book_id)
-        .filter(Book.id == book_id)
-        .group_by(Book.id, Author.name)
-    )
-    row = result.first()
-    
-    return BookResponse(
-        id=row.id,
-        title=row.title,
-        author_id=row.author_id,
-        isbn=row.isbn,
-        year=row.year,
-        description=row.description,
-        cover_url=row.cover_url,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
-        author_name=row.author_name,
-        total_count=row.total_count or 0,
-        available_count=row.available_count or 0
-    )
+    return BookResponse.model_validate(row._mapping)
 
 
 # Copy management endpoints
@@ -407,6 +631,71 @@ async def get_book_copies(
     ]
 
 
+def _copy_returning():
+    """CopyResponse columns of a written copy, for RETURNING (see _book_returning)."""
+    return (
+        Copy.id,
+        Copy.book_id,
+        Copy.library_id,
+        Copy.inventory_number,
+        Copy.status,
+        Copy.created_at,
+        select(Library.name)
+        .where(Library.id == returning_column(Copy.library_id))
+        .scalar_subquery()
+        .label("library_name"),
+        select(Book.title)
+        .where(Book.id == returning_column(Copy.book_id))
+        .scalar_subquery()
+        .label("book_title"),
+    )
+
+
+_COPY_REQUIRED_FIELDS = {
+    "inventory_number": "Inventory number",
+    "library_id": "Library",
+    "status": "Status",
+}
+
+
+async def _reject_copy_write(db: AsyncSession, error: IntegrityError, book_id: Optional[int]) -> NoReturn:
+    """Roll back a copy insert/update that broke a constraint and report why."""
+    await db.rollback()
+    violation = constraint_violation(error)
+    if violation == FOREIGN_KEY:
+        # SQLite doesn't name the foreign key: the book is checked on this path only
+        if book_id is not None:
+            book = await db.execute(select(Book.id).where(Book.id == book_id))
+            if book.scalar_one_or_none() is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Book not found"
+                )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Library not found"
+        )
+    if violation == UNIQUE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Copy with this inventory number already exists"
+        )
+    if violation == NOT_NULL:
+        field = _COPY_REQUIRED_FIELDS.get(violated_column(error), "A required field")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{field} is required"
+        )
+    raise error
+
+
+def _new_copy_change(copy: dict) -> StatusChange:
+    """Change of a copy just inserted as available, for hold_new_copies()."""
+    return StatusChange(
+        copy["id"], copy["inventory_number"], copy["book_id"], copy["library_id"], None, AVAILABLE
+    )
+
+
 @router.post("/{book_id}/copies", response_model=CopyResponse, status_code=status.HTTP_201_CREATED)
 async def create_copy(
     book_id: int,
@@ -414,57 +703,109 @@ async def create_copy(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Add a copy of a book (staff only)."""
+    """Add a copy of a book (staff only).
     
-    # Verify book exists
-    book_result = await db.execute(
-        select(Book).filter(Book.id == book_id)
-    )
-    if not book_result.scalar_one_or_none():
+    Missing book or library is reported by the foreign keys. An available
+    copy of a book readers are waiting for is set aside ("reserved") for
+    the oldest waiting hold it can serve, as a returned copy would be.
+    """
+    try:
+        result = await db.execute(
+            insert(Copy)
+            .values(
+                book_id=book_id,
+                library_id=copy_data.library_id,
+                inventory_number=copy_data.inventory_number,
+                status=copy_data.status
+            )
+            .returning(*_copy_returning())
+        )
+    except IntegrityError as e:
+        await _reject_copy_write(db, e, book_id)
+    copy = dict(result.one()._mapping)
+    
+    await adjust_availability(db, [copy_delta(book_id, copy["library_id"], copy["status"])])
+    if copy["status"] == AVAILABLE:
+        held = await hold_new_copies(db, [_new_copy_change(copy)])
+        if held:
+            copy["status"] = held[0].status
+    await db.commit()
+    autocomplete_index.adjust_weight(BOOK, book_id, 1)
+    response_cache.invalidate(SEARCH, book_tag(book_id))
+    
+    return CopyResponse.model_validate(copy)
+
+
+@router.post(
+    "/{book_id}/copies/bulk",
+    response_model=List[CopyResponse],
+    status_code=status.HTTP_201_CREATED
+)
+async def create_copies_bulk(
+    book_id: int,
+    copies_data: CopyBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Add many copies of a book at once (staff only).
+    
+    Copies are given as a list or as an inventory number range such as
+    "ШК-{0001..0040}". Taken inventory numbers are all reported by one
+    SELECT; the copies are then written by a single multi-row INSERT
+    (missing book or library reported by the foreign keys, as in create_copy).
+    Available copies go to waiting holds first, as in create_copy.
+    """
+    if copies_data.size() > settings.copies_bulk_max:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Book not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.copies_bulk_max} copies per request"
         )
+    items = copies_data.items()
+    numbers = [item.inventory_number for item in items]
     
-    # Verify library exists
-    library_result = await db.execute(
-        select(Library).filter(Library.id == copy_data.library_id)
+    repeated = {number for number, count in Counter(numbers).items() if count > 1}
+    result = await db.execute(
+        select(Copy.inventory_number).where(Copy.inventory_number.in_(numbers))
     )
-    library = library_result.scalar_one_or_none()
-    if not library:
+    taken = sorted(set(result.scalars()) | repeated)
+    if taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Library not found"
+            detail=f"Copies with these inventory numbers already exist or repeat: {', '.join(taken)}"
         )
     
-    # Create copy
-    new_copy = Copy(
-        book_id=book_id,
-        library_id=copy_data.library_id,
-        inventory_number=copy_data.inventory_number,
-        status=copy_data.status
-    )
+    try:
+        result = await db.execute(
+            insert(Copy)
+            .values([
+                {
+                    "book_id": book_id,
+                    "library_id": item.library_id,
+                    "inventory_number": item.inventory_number,
+                    "status": item.status,
+                }
+                for item in items
+            ])
+            .returning(*_copy_returning())
+        )
+    except IntegrityError as e:
+        await _reject_copy_write(db, e, book_id)
+    copies = [dict(row._mapping) for row in result]
     
-    db.add(new_copy)
+    await adjust_availability(
+        db, [copy_delta(book_id, copy["library_id"], copy["status"]) for copy in copies]
+    )
+    held = await hold_new_copies(db, [
+        _new_copy_change(copy) for copy in copies if copy["status"] == AVAILABLE
+    ])
+    held_status = {change.copy_id: change.status for change in held}
+    for copy in copies:
+        copy["status"] = held_status.get(copy["id"], copy["status"])
     await db.commit()
-    await db.refresh(new_copy)
+    autocomplete_index.adjust_weight(BOOK, book_id, len(copies))
+    response_cache.invalidate(SEARCH, book_tag(book_id))
     
-    # Get book title
-    book_result = await db.execute(
-        select(Book.title).filter(Book.id == book_id)
-    )
-    book_title = book_result.scalar()
-    
-    return CopyResponse(
-        id=new_copy.id,
-        book_id=new_copy.book_id,
-        library_id=new_copy.library_id,
-        inventory_number=new_copy.inventory_number,
-        status=new_copy.status,
-        created_at=new_copy.created_at,
-        library_name=library.name,
-        book_title=book_title
-    )
+    return [CopyResponse.model_validate(copy) for copy in copies]
 
 
 @router.put("/copies/{copy_id}", response_model=CopyResponse)
@@ -475,49 +816,69 @@ async def update_copy(
     current_user = Depends(get_current_active_staff)
 ):
     """Update copy (staff only)."""
+    update_data = copy_data.model_dump(exclude_unset=True)
     
-    result = await db.execute(
-        select(Copy).filter(Copy.id == copy_id)
-    )
-    copy = result.scalar_one_or_none()
+    # Moving the copy between availability rollup rows needs its old library
+    # and status, read under a row lock; other changes are a single UPDATE
+    old = None
+    if update_data.keys() & {"library_id", "status"}:
+        waiting = exists().where(Hold.book_id == Copy.book_id, Hold.status == WAITING)
+        result = await db.execute(
+            select(
+                Copy.inventory_number, Copy.book_id, Copy.library_id, Copy.status,
+                waiting.label("has_waiting_holds"),
+            )
+            .where(Copy.id == copy_id)
+            .with_for_update(of=Copy)
+        )
+        old = result.one_or_none()
+        if not old:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Copy not found"
+            )
+    
+    # A returned copy is set aside for a waiting hold instead (see apply_holds),
+    # whether anyone waits for the book was read with the lock
+    if "status" in update_data:
+        change, = await apply_holds(db, [StatusChange(
+            copy_id, old.inventory_number, old.book_id,
+            update_data.get("library_id", old.library_id), old.status, update_data["status"]
+        )], held_books={old.book_id} if old.has_waiting_holds else set())
+        update_data["status"] = change.status
+    
+    if not update_data:
+        result = await db.execute(select(*_copy_returning()).where(Copy.id == copy_id))
+    else:
+        try:
+            result = await db.execute(
+                update(Copy)
+                .where(Copy.id == copy_id)
+                .values(**update_data)
+                .returning(*_copy_returning())
+            )
+        except IntegrityError as e:
+            await _reject_copy_write(db, e, None)
+    row = result.one_or_none()
     
-    if not copy:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Copy not found"
         )
     
-    # Update fields
-    update_data = copy_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(copy, field, value)
-    
+    if old is not None:
+        await adjust_availability(db, [
+            copy_delta(old.book_id, old.library_id, old.status, sign=-1),
+            copy_delta(row.book_id, row.library_id, row.status),
+        ])
+        await record_events(db, [StatusChange(
+            row.id, row.inventory_number, row.book_id, row.library_id, old.status, row.status
+        )])
     await db.commit()
-    await db.refresh(copy)
-    
-    # Get full response
-    result = await db.execute(
-        select(
-            Copy,
-            Library.name.label("library_name"),
-            Book.title.label("book_title")
-        )
-        .join(Library, Copy.library_id == Library.id)
-        .join(Book, Copy.book_id == Book.id)
-        .filter(Copy.id == copy_id)
-    )
-    row = result.first()
+    response_cache.invalidate(SEARCH, book_tag(row.book_id))
     
-    return CopyResponse(
-        id=row.Copy.id,
-        book_id=row.Copy.book_id,
-        library_id=row.Copy.library_id,
-        inventory_number=row.Copy.inventory_number,
-        status=row.Copy.status,
-        created_at=row.Copy.created_at,
-        library_name=row.library_name,
-        book_title=row.book_title
-    )
+    return CopyResponse.model_validate(row._mapping)
 
 
 @router.delete("/copies/{copy_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -526,12 +887,18 @@ async def delete_copy(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Delete copy (staff only)."""
+    """Delete copy (staff only).
     
+    A hold the copy was set aside for goes back to its place in the queue
+    and takes another available copy if there is one.
+    """
+    holds = await requeue_holds(db, [copy_id])
     result = await db.execute(
-        select(Copy).filter(Copy.id == copy_id)
+        delete(Copy)
+        .where(Copy.id == copy_id)
+        .returning(Copy.book_id, Copy.library_id, Copy.status)
     )
-    copy = result.scalar_one_or_none()
+    copy = result.one_or_none()
     
     if not copy:
         raise HTTPException(
@@ -539,6 +906,9 @@ async def delete_copy(
             detail="Copy not found"
         )
     
-    await db.delete(copy)
+    await adjust_availability(db, [copy_delta(copy.book_id, copy.library_id, copy.status, sign=-1)])
+    await serve_holds(db, holds)
     await db.commit()
+    autocomplete_index.adjust_weight(BOOK, copy.book_id, -1)
+    response_cache.invalidate(SEARCH, book_tag(copy.book_id))
     return None
@@ -0,0 +1,166 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import get_db
+from app.models import Book, CirculationEvent, Library
+from app.routers.auth import get_current_active_staff
+from app.schemas.circulation import (
+    CheckoutRequest,
+    CheckoutResult,
+    CirculationStats,
+    ScanBatchRequest,
+    ScanBatchResponse,
+    ScanResult,
+)
+from app.services.cache import SEARCH, book_tag, response_cache
+from app.services.circulation import change_statuses, checkout_copy
+
+router = APIRouter(prefix="/api/v1/circulation", tags=["circulation"])
+settings = get_settings()
+
+
+@router.post("/scan", response_model=ScanBatchResponse)
+async def scan_copies(
+    batch: ScanBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Apply a batch of desk scans: copy inventory number and target status (staff only).
+
+    All scans are applied in one transaction by a fixed number of
+    statements (see app.services.circulation); unknown inventory numbers
+    are reported with found=false and don't stop the others.
+    """
+    if len(batch.scans) > settings.circulation_scan_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.circulation_scan_max} scans per batch"
+        )
+
+    # Later scans of the same copy win
+    targets = {scan.inventory_number: scan.status for scan in batch.scans}
+    changes = await change_statuses(db, targets)
+    await db.commit()
+
+    changed_books = {c.book_id for c in changes if c.status != c.previous_status}
+    if changed_books:
+        response_cache.invalidate(SEARCH, *map(book_tag, changed_books))
+
+    by_number = {change.inventory_number: change for change in changes}
+    results = []
+    for scan in batch.scans:
+        change = by_number.get(scan.inventory_number)
+        if change is None:
+            results.append(ScanResult(inventory_number=scan.inventory_number, found=False))
+            continue
+        results.append(ScanResult(
+            inventory_number=scan.inventory_number,
+            found=True,
+            copy_id=change.copy_id,
+            book_id=change.book_id,
+            library_id=change.library_id,
+            previous_status=change.previous_status,
+            status=change.status,
+            hold_id=change.hold_id,
+        ))
+    return ScanBatchResponse(results=results)
+
+
+@router.post("/checkout", response_model=CheckoutResult)
+async def checkout(
+    request: CheckoutRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Lend any available copy of a book at a library (staff only).
+
+    The copy is claimed atomically (see app.services.circulation.checkout_copy):
+    concurrent checkouts never lend the same copy and don't wait for each other.
+    """
+    change = await checkout_copy(db, request.book_id, request.library_id)
+    if change is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No available copy of this book in this library"
+        )
+    await db.commit()
+    response_cache.invalidate(SEARCH, book_tag(change.book_id))
+
+    return CheckoutResult(
+        copy_id=change.copy_id,
+        inventory_number=change.inventory_number,
+        book_id=change.book_id,
+        library_id=change.library_id,
+        status=change.status,
+    )
+
+
+@router.get("/stats", response_model=List[CirculationStats])
+async def circulation_stats(
+    group_by: Literal["book", "library", "book_library"] = Query("book"),
+    book_id: Optional[int] = Query(None),
+    library_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None, description="Defaults to 30 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Inclusive, defaults to today"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Loans and returns per book and/or library over a period, most loaned first (staff only).
+
+    Counted from the circulation history over (book or library, time)
+    indexes; on PostgreSQL only the partitions of the period are read.
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to"
+        )
+
+    keys = {
+        "book": [CirculationEvent.book_id],
+        "library": [CirculationEvent.library_id],
+        "book_library": [CirculationEvent.book_id, CirculationEvent.library_id],
+    }[group_by]
+    counts = (
+        select(
+            *keys,
+            func.count(case((CirculationEvent.status == "loaned", 1))).label("loans"),
+            func.count(case((CirculationEvent.previous_status == "loaned", 1))).label("returns"),
+        )
+        .where(
+            CirculationEvent.occurred_at >= datetime.combine(date_from, time.min, timezone.utc),
+            CirculationEvent.occurred_at
+            < datetime.combine(date_to + timedelta(days=1), time.min, timezone.utc),
+        )
+        .group_by(*keys)
+    )
+    if book_id is not None:
+        counts = counts.where(CirculationEvent.book_id == book_id)
+    if library_id is not None:
+        counts = counts.where(CirculationEvent.library_id == library_id)
+    counts = counts.subquery()
+
+    # Names are joined to the grouped rows only
+    stmt = select(counts)
+    if "book_id" in counts.c:
+        stmt = stmt.add_columns(Book.title.label("book_title")).outerjoin(
+            Book, Book.id == counts.c.book_id
+        )
+    if "library_id" in counts.c:
+        stmt = stmt.add_columns(Library.name.label("library_name")).outerjoin(
+            Library, Library.id == counts.c.library_id
+        )
+    stmt = stmt.order_by(
+        counts.c.loans.desc(), counts.c.returns.desc(), *(counts.c[key.name] for key in keys)
+    ).limit(limit)
+
+    result = await db.execute(stmt)
+    return [CirculationStats.model_validate(row._mapping) for row in result]
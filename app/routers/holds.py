@@ -0,0 +1,191 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import FOREIGN_KEY, UNIQUE, constraint_violation, get_db
+from app.models import Book, Copy, Hold
+from app.routers.auth import get_current_active_staff
+from app.schemas.hold import HoldCreate, HoldExpiryResult, HoldResponse
+from app.services.cache import SEARCH, book_tag, response_cache
+from app.services.circulation import (
+    AVAILABLE,
+    CANCELLED,
+    READY,
+    RESERVED,
+    WAITING,
+    change_statuses,
+    expire_holds,
+    hold_position,
+    serve_holds,
+)
+
+router = APIRouter(prefix="/api/v1/holds", tags=["holds"])
+settings = get_settings()
+
+HOLD_COLUMNS = (
+    Hold.id, Hold.book_id, Hold.library_id, Hold.patron_card, Hold.status,
+    Hold.copy_id, Hold.created_at, Hold.ready_at,
+)
+
+
+async def _hold_response(db: AsyncSession, row) -> HoldResponse:
+    hold = HoldResponse.model_validate(row._mapping)
+    if hold.status == WAITING:
+        hold.position = (await db.execute(hold_position(hold))).scalar_one()
+    return hold
+
+
+@router.post("", response_model=HoldResponse, status_code=status.HTTP_201_CREATED)
+async def place_hold(
+    hold_data: HoldCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Place a reader's hold on a book (staff only).
+
+    Placing a hold is a single INSERT: holds queue by id, with no per-book
+    counter for concurrent holds to contend on. A hold at the head of its
+    queue takes an available copy right away (status "ready").
+    """
+    try:
+        result = await db.execute(
+            insert(Hold)
+            .values(
+                book_id=hold_data.book_id,
+                library_id=hold_data.library_id,
+                patron_card=hold_data.patron_card,
+                status=WAITING,
+            )
+            .returning(*HOLD_COLUMNS)
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        violation = constraint_violation(e)
+        if violation == UNIQUE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Reader already has an active hold on this book"
+            )
+        if violation == FOREIGN_KEY:
+            book = await db.execute(select(Book.id).where(Book.id == hold_data.book_id))
+            if book.scalar_one_or_none() is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Book not found"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Library not found"
+            )
+        raise
+    hold = await _hold_response(db, result.one())
+
+    # Earlier waiting holds mean there is no copy to spare (returns go to them)
+    served = await serve_holds(db, [hold]) if hold.position == 0 else []
+    if served:
+        result = await db.execute(select(*HOLD_COLUMNS).where(Hold.id == hold.id))
+        hold = HoldResponse.model_validate(result.one()._mapping)
+
+    await db.commit()
+    if served:
+        response_cache.invalidate(SEARCH, book_tag(hold.book_id))
+    return hold
+
+
+@router.post("/expire", response_model=HoldExpiryResult)
+async def expire_ready_holds(
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Expire ready holds not picked up within hold_pickup_days (staff only).
+
+    Meant to be called daily (cron). Each copy set aside for an expired hold
+    goes to the next waiting hold or back on the shelf.
+    """
+    changes = await expire_holds(db, settings.hold_pickup_days)
+    await db.commit()
+    if changes:
+        response_cache.invalidate(SEARCH, *{book_tag(change.book_id) for change in changes})
+    return HoldExpiryResult(
+        expired=len(changes),
+        reassigned=sum(change.status == RESERVED for change in changes),
+    )
+
+
+@router.get("", response_model=List[HoldResponse])
+async def list_holds(
+    book_id: int = Query(...),
+    hold_status: str = Query(WAITING, alias="status"),
+    after_id: Optional[int] = Query(None, description="Id of the last hold of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Holds of a book in queue order (staff only), paged by id over the queue index."""
+    stmt = select(*HOLD_COLUMNS).where(Hold.book_id == book_id, Hold.status == hold_status)
+    if after_id is not None:
+        stmt = stmt.where(Hold.id > after_id)
+    result = await db.execute(stmt.order_by(Hold.id).limit(limit))
+    return [HoldResponse.model_validate(row._mapping) for row in result]
+
+
+@router.get("/{hold_id}", response_model=HoldResponse)
+async def get_hold(
+    hold_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Get a hold with its queue position while waiting (staff only)."""
+    result = await db.execute(select(*HOLD_COLUMNS).where(Hold.id == hold_id))
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found"
+        )
+    return await _hold_response(db, row)
+
+
+@router.delete("/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_hold(
+    hold_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_staff)
+):
+    """Cancel a waiting or ready hold (staff only).
+
+    The copy set aside for a ready hold is released like a return, so it
+    goes to the next waiting hold or back on the shelf.
+    """
+    result = await db.execute(
+        update(Hold)
+        .where(Hold.id == hold_id, Hold.status.in_([WAITING, READY]))
+        .values(status=CANCELLED)
+        .returning(Hold.book_id, Hold.copy_id)
+    )
+    row = result.one_or_none()
+    if not row:
+        exists = await db.execute(select(Hold.id).where(Hold.id == hold_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Hold not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Hold is no longer active"
+        )
+
+    if row.copy_id is not None:
+        copy = await db.execute(select(Copy.inventory_number).where(Copy.id == row.copy_id))
+        inventory_number = copy.scalar_one_or_none()
+        if inventory_number is not None:
+            await change_statuses(db, {inventory_number: AVAILABLE})
+    await db.commit()
+    if row.copy_id is not None:
+        response_cache.invalidate(SEARCH, book_tag(row.book_id))
+    return None
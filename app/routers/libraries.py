@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete
 from typing import List
 
 from app.database import get_db
-from app.models import Library
+from app.models import Copy, Library
 from app.routers.auth import get_current_active_staff
 from app.schemas.library import LibraryCreate, LibraryUpdate, LibraryResponse
+from app.services.autocomplete import autocomplete_index, BOOK
+from app.services.cache import response_cache, LIBRARIES, SEARCH
+from app.services.circulation import requeue_holds, serve_holds
 
 router = APIRouter(prefix="/api/v1/libraries", tags=["libraries"])
 
@@ -14,9 +17,15 @@ router = APIRouter(prefix="/api/v1/libraries", tags=["libraries"])
 @router.get("", response_model=List[LibraryResponse])
 async def list_libraries(db: AsyncSession = Depends(get_db)):
     """List all libraries (public endpoint)."""
+    return await response_cache.get_or_load(
+        ("libraries",), lambda: _list_libraries(db), tags=(LIBRARIES,)
+    )
+
+
+async def _list_libraries(db: AsyncSession) -> List[LibraryResponse]:
     result = await db.execute(select(Library))
     libraries = result.scalars().all()
-    return libraries
+    return [LibraryResponse.model_validate(library) for library in libraries]
 
 
 @router.get("/{library_id}", response_model=LibraryResponse)
@@ -43,10 +52,12 @@ async def create_library(
     current_user = Depends(get_current_active_staff)
 ):
     """Create new library (staff only)."""
-    new_library = Library(**library_data.model_dump())
-    db.add(new_library)
+    result = await db.execute(
+        insert(Library).values(**library_data.model_dump()).returning(Library)
+    )
+    new_library = result.scalar_one()
     await db.commit()
-    await db.refresh(new_library)
+    response_cache.invalidate(LIBRARIES)
     return new_library
 
 
@@ -58,9 +69,12 @@ async def update_library(
     current_user = Depends(get_current_active_staff)
 ):
     """Update library (staff only)."""
-    result = await db.execute(
-        select(Library).where(Library.id == library_id)
-    )
+    update_data = library_data.model_dump(exclude_unset=True)
+    if update_data:
+        stmt = update(Library).where(Library.id == library_id).values(**update_data).returning(Library)
+    else:
+        stmt = select(Library).where(Library.id == library_id)
+    result = await db.execute(stmt)
     library = result.scalar_one_or_none()
     
     if not library:
@@ -69,13 +83,9 @@ async def update_library(
             detail="Library not found"
         )
     
-    # Update fields
-    update_data = library_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(library, field, value)
-    
     await db.commit()
-    await db.refresh(library)
+    # Library names also appear in book details and search facets
+    response_cache.invalidate(LIBRARIES, SEARCH)
     return library
 
 
@@ -85,18 +95,33 @@ async def delete_library(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_active_staff)
 ):
-    """Delete library (staff only)."""
+    """Delete library (staff only) with its copies and their counts.
+    
+    Copies and rollup rows go by ON DELETE CASCADE; the copies deleted are
+    returned so that the popularity weights of their books follow. Holds
+    for any library waiting on its copies go back to their queues and take
+    copies of other libraries if there are any (holds for this library
+    go by cascade).
+    """
+    holds = await requeue_holds(db, select(Copy.id).where(Copy.library_id == library_id))
+    copies = await db.execute(
+        delete(Copy).where(Copy.library_id == library_id).returning(Copy.book_id)
+    )
+    book_ids = copies.scalars().all()
     result = await db.execute(
-        select(Library).where(Library.id == library_id)
+        delete(Library).where(Library.id == library_id).returning(Library.id)
     )
-    library = result.scalar_one_or_none()
     
-    if not library:
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Library not found"
         )
     
-    await db.delete(library)
+    await serve_holds(db, [hold for hold in holds if hold.library_id != library_id])
     await db.commit()
+    for book_id in book_ids:
+        autocomplete_index.adjust_weight(BOOK, book_id, -1)
+    response_cache.invalidate(LIBRARIES, SEARCH)
     return None
@@ -1,31 +1,289 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_, case
-from typing import List, Optional
+from sqlalchemy import select, func, or_, and_, case, false, literal, literal_column, null, union_all, String
+from typing import Dict, List, Optional, Sequence
 
-from app.database import get_db
-from app.models import Book, Author, Copy, Library
-from app.schemas.search import SearchResponse, SearchResult, SearchSuggestions
+from app.config import get_settings
+from app.database import get_db, is_postgresql, execute_concurrently
+from app.models import Book, Author, BookAvailability, Library, FTS_CONFIG, normalize_text
+from app.schemas.search import (
+    FacetBucket, SearchBatchItem, SearchBatchRequest, SearchBatchResponse, SearchResponse,
+    SearchResult, SearchSpec, SearchSuggestions, SEARCH_MODE_PATTERN,
+)
+from app.services.autocomplete import autocomplete_index, BOOK
+from app.services.availability import availability_counts, in_stock
+from app.services.cache import response_cache, normalize_query, SEARCH
+from app.services.search_index import (
+    bm25_match, morph_match, query_terms, TITLE, TITLE_TRANSLIT, AUTHOR, AUTHOR_TRANSLIT
+)
+from app.services.spelling import spelling_dictionary
+from app.services.transliteration import is_latin
+from app.services.pagination import decode_cursor, encode_cursor, order_by_keys, seek_condition
 
 router = APIRouter(prefix="/api/v1/search", tags=["search"])
+settings = get_settings()
+
+FACETS = ("library", "availability", "decade")
+
+
+async def _trigram_match(db: AsyncSession, needle: str, threshold: Optional[float], *columns):
+    """Build a fuzzy match condition and similarity score over normalized columns.
+    
+    On PostgreSQL the ``<%`` operator is served by the GIN trigram indexes;
+    on SQLite ``word_similarity`` is the in-process scorer registered
+    on the connection (see app.services.trigram).
+    """
+    if threshold is None:
+        threshold = settings.search_similarity_threshold
+    needle = normalize_text(needle)
+    scores = [func.word_similarity(needle, column) for column in columns]
+    
+    if is_postgresql(db):
+        for statement in _trigram_setup(db, threshold):
+            await db.execute(statement)
+        condition = or_(*[literal(needle).op("<%")(column) for column in columns])
+        score = func.greatest(*scores) if len(scores) > 1 else scores[0]
+    else:
+        condition = or_(*[score >= threshold for score in scores])
+        score = func.max(*scores) if len(scores) > 1 else scores[0]
+    
+    return condition, score
+
+
+def _contains(needle: str, *columns):
+    """Single substring comparison per normalized column (trigram-indexed on PostgreSQL)."""
+    needle = normalize_text(needle)
+    if not needle:
+        # Only punctuation was given: nothing to match
+        return false()
+    return or_(*[column.like(f"%{needle}%") for column in columns])
+
+
+def _or_transliterated(condition, query: str):
+    """Also match a Latin-typed query ("tolstoy", "ljcnjtdcrbq") through the
+    transliteration and keyboard layout variants in the search terms index.
+    """
+    if not is_latin(query):
+        return condition
+    matched = morph_match(
+        query_terms(query), [TITLE, TITLE_TRANSLIT, AUTHOR, AUTHOR_TRANSLIT]
+    )
+    return or_(condition, Book.id.in_(select(matched.c.book_id)))
+
+
+def _trigram_setup(db: AsyncSession, threshold: Optional[float]) -> List:
+    """Statements a session runs before fuzzy matching: the threshold used
+    by <% for the rest of the transaction (PostgreSQL only).
+    """
+    if not is_postgresql(db):
+        return []
+    if threshold is None:
+        threshold = settings.search_similarity_threshold
+    return [select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))]
+
+
+def _parse_facets(facets: Optional[str]) -> List[str]:
+    """Validate the comma-separated facets parameter."""
+    if not facets:
+        return []
+    names = [name.strip() for name in facets.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facets: {', '.join(unknown)}. Allowed: {', '.join(FACETS)}"
+        )
+    return names
+
+
+async def _compute_facets(
+    db: AsyncSession,
+    base_stmt,
+    names: List[str],
+    library_id: Optional[int],
+) -> Dict[str, List[FacetBucket]]:
+    """Facet buckets over all books matching the search, in a single grouped statement.
+    
+    Library and availability buckets come from the availability rollup;
+    availability is scoped to the selected library, if any.
+    """
+    matched = base_stmt.with_only_columns(
+        Book.id, Book.year, maintain_column_froms=True
+    ).subquery()
+    
+    branches = []
+    if "library" in names:
+        branches.append(
+            select(
+                literal("library", String).label("facet"),
+                BookAvailability.library_id.label("value"),
+                Library.name.label("label"),
+                func.count().label("count"),
+            )
+            .select_from(matched)
+            .join(BookAvailability, BookAvailability.book_id == matched.c.id)
+            .join(Library, Library.id == BookAvailability.library_id)
+            .where(BookAvailability.total_count > 0)
+            .group_by(BookAvailability.library_id, Library.name)
+        )
+    if "availability" in names:
+        available = select(BookAvailability.book_id).where(
+            BookAvailability.book_id == matched.c.id,
+            BookAvailability.available_count > 0,
+        )
+        if library_id:
+            available = available.where(BookAvailability.library_id == library_id)
+        is_available = case((available.exists(), 1), else_=0)
+        branches.append(
+            select(
+                literal("availability", String).label("facet"),
+                is_available.label("value"),
+                null().label("label"),
+                func.count().label("count"),
+            )
+            .select_from(matched)
+            .group_by(is_available)
+        )
+    if "decade" in names:
+        decade = (matched.c.year // 10) * 10
+        branches.append(
+            select(
+                literal("decade", String).label("facet"),
+                decade.label("value"),
+                null().label("label"),
+                func.count().label("count"),
+            )
+            .select_from(matched)
+            .where(matched.c.year.is_not(None))
+            .group_by(decade)
+        )
+    
+    result = await db.execute(union_all(*branches))
+    
+    facets = {name: [] for name in names}
+    for row in result:
+        label = row.label
+        if row.facet == "availability":
+            label = "available" if row.value else "unavailable"
+        elif row.facet == "decade":
+            label = f"{row.value}s"
+        facets[row.facet].append(FacetBucket(value=row.value, label=label, count=row.count))
+    
+    for buckets in facets.values():
+        buckets.sort(key=lambda bucket: (-bucket.count, bucket.value))
+    return facets
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    base_stmt,
+    sort_keys,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    include_total: bool,
+    setup: Sequence = (),
+):
+    """Run the (optional) count and the page query of a search statement.
+    
+    With a cursor the page seeks past the last row of the previous page
+    instead of using OFFSET. Both queries run concurrently; ``setup`` is
+    passed on to execute_concurrently. Returns (rows, total, next_cursor).
+    """
+    # Sort key values are selected so the next cursor can be built from the last row
+    stmt = base_stmt.add_columns(
+        *[expr.label(f"sort_{i}") for i, (expr, _) in enumerate(sort_keys)]
+    ).order_by(*order_by_keys(sort_keys))
+    
+    if cursor:
+        try:
+            values = decode_cursor(cursor, len(sort_keys))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        stmt = stmt.filter(seek_condition(sort_keys, values))
+    else:
+        stmt = stmt.offset((page - 1) * per_page)
+    
+    # One extra row tells whether there is a next page
+    statements = [stmt.limit(per_page + 1)]
+    if include_total:
+        statements.append(
+            base_stmt.with_only_columns(func.count(), maintain_column_froms=True)
+        )
+    results = await execute_concurrently(db, *statements, setup=setup)
+    rows = results[0].all()
+    total = (results[1].scalar() or 0) if include_total else None
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[f"sort_{i}"] for i in range(len(sort_keys))])
+    
+    return rows, total, next_cursor
 
 
 @router.get("", response_model=SearchResponse)
 async def search_books(
     q: str = Query(..., min_length=1, description="Search query"),
     library_id: Optional[int] = Query(None, description="Filter by library ID"),
+    mode: str = Query("fulltext", pattern=SEARCH_MODE_PATTERN, description="Matching mode"),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Fuzzy match threshold"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Count total results"),
+    facets: Optional[str] = Query(None, description="Comma-separated: library, availability, decade"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search books by title or author name.
+    Search books by title, author name or description.
+    On PostgreSQL uses full-text search ranked by relevance,
+    on SQLite falls back to substring matching.
+    mode=fuzzy matches fragments and typos by trigram similarity instead,
+    mode=morph matches other word forms through the stemmed terms index,
+    mode=bm25 ranks those matches by BM25 relevance.
     Supports filtering by library (to show only books available there).
-    Supports pagination.
+    Supports page numbers and keyset pagination via cursor.
+    facets= adds bucket counts by library, availability and decade.
     """
-    query = q.strip()
-    
-    # Build base query with joins
+    query = normalize_query(q)
+    facet_names = _parse_facets(facets)
+    cache_key = (
+        "search", query, library_id, mode, threshold,
+        page, per_page, cursor, include_total, tuple(facet_names),
+    )
+    # The cached response is shared by every spelling of the query: it is
+    # built from the normalized one and echoes back the caller's own
+    response = await response_cache.get_or_load(
+        cache_key,
+        lambda: _search_books(
+            db, query, library_id, mode, threshold, page, per_page, cursor, include_total, facet_names
+        ),
+        tags=(SEARCH,),
+    )
+    return response.model_copy(update={"query": q.strip()})
+
+
+async def _search_books(
+    db: AsyncSession,
+    query: str,
+    library_id: Optional[int],
+    mode: str,
+    threshold: Optional[float],
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    include_total: bool,
+    facet_names: List[str],
+) -> SearchResponse:
+    """search_books without the response cache."""
+    # Build base query, counts come from the availability rollup
     base_stmt = (
         select(
             Book.id,
@@ -33,51 +291,52 @@ async def search_books(
             Author.name.label("author_name"),
             Book.year,
             Book.cover_url,
-            func.count(Copy.id).label("total_count"),
-            func.sum(case((Copy.status == "available", 1), else_=0)).label("available_count")
+            *availability_counts(library_id)
         )
         .join(Author, Book.author_id == Author.id)
-        .outerjoin(Copy, Book.id == Copy.book_id)
     )
     
     # Apply library filter if specified
     if library_id:
-        base_stmt = base_stmt.filter(Copy.library_id == library_id)
-    
-    # Search in title or author name (case-insensitive for both ASCII and Cyrillic)
-    # Using multiple patterns for case variations due to SQLite unicode limitations
-    search_patterns = [
-        f"%{query}%",          # original case
-        f"%{query.lower()}%",  # lowercase
-        f"%{query.upper()}%",  # uppercase
-        f"%{query.capitalize()}%",  # capitalized
-    ]
-    
-    # Build OR conditions for all case variations
-    title_conditions = [Book.title.like(p) for p in search_patterns]
-    author_conditions = [Author.name.like(p) for p in search_patterns]
+        base_stmt = base_stmt.filter(in_stock(library_id))
     
-    base_stmt = base_stmt.filter(
-        or_(
-            or_(*title_conditions),
-            or_(*author_conditions)
+    if mode == "fuzzy":
+        condition, score = await _trigram_match(
+            db, query, threshold, Book.title_normalized, Author.name_normalized
+        )
+        base_stmt = base_stmt.filter(condition)
+        sort_keys = [(score, True), (Book.title, False), (Book.id, False)]
+    elif mode == "morph":
+        # Books having every query term, best weighted term frequency first
+        matched = morph_match(query_terms(query))
+        base_stmt = base_stmt.join(matched, matched.c.book_id == Book.id)
+        sort_keys = [(matched.c.score, True), (Book.title, False), (Book.id, False)]
+    elif mode == "bm25":
+        # Same matching, rarer terms and shorter texts weigh more
+        matched = await bm25_match(db, query_terms(query))
+        base_stmt = base_stmt.join(matched, matched.c.book_id == Book.id)
+        sort_keys = [(matched.c.score, True), (Book.title, False), (Book.id, False)]
+    elif is_postgresql(db):
+        # Full-text search over the weighted tsvector maintained by the books trigger
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{FTS_CONFIG}'"), query)
+        base_stmt = base_stmt.filter(
+            _or_transliterated(Book.search_vector.op("@@")(ts_query), query)
         )
+        rank = func.ts_rank_cd(Book.search_vector, ts_query)
+        sort_keys = [(rank, True), (Book.title, False), (Book.id, False)]
+    else:
+        # Search in title or author name, case- and ё-insensitive via the normalized columns
+        base_stmt = base_stmt.filter(_or_transliterated(
+            _contains(query, Book.title_normalized, Author.name_normalized), query
+        ))
+        sort_keys = [(Book.title, False), (Book.id, False)]
+    
+    # Ordered by relevance where available
+    setup = _trigram_setup(db, threshold) if mode == "fuzzy" else []
+    rows, total, next_cursor = await _fetch_page(
+        db, base_stmt, sort_keys, page, per_page, cursor, include_total, setup
     )
     
-    # Group by book and author
-    base_stmt = base_stmt.group_by(Book.id, Book.title, Author.name, Book.year, Book.cover_url)
-    
-    # Count total results before pagination
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-    
-    # Apply pagination: order, limit, offset
-    stmt = base_stmt.order_by(Book.title).limit(per_page).offset((page - 1) * per_page)
-    
-    result = await db.execute(stmt)
-    rows = result.all()
-    
     # Format results
     results = [
         SearchResult(
@@ -92,8 +351,17 @@ async def search_books(
         for row in rows
     ]
     
+    facet_buckets = None
+    if facet_names:
+        facet_buckets = await _compute_facets(db, base_stmt, facet_names, library_id)
+    
     # Calculate total pages
-    pages = (total + per_page - 1) // per_page
+    pages = (total + per_page - 1) // per_page if total is not None else None
+    
+    # Nothing found: offer the query with misspelled words corrected
+    suggested_query = None
+    if total == 0 or (total is None and not results and page == 1 and not cursor):
+        suggested_query = spelling_dictionary.correct(query)
     
     return SearchResponse(
         query=query,
@@ -101,6 +369,9 @@ async def search_books(
         page=page,
         per_page=per_page,
         pages=pages,
+        next_cursor=next_cursor,
+        facets=facet_buckets,
+        suggested_query=suggested_query,
         results=results
     )
 
@@ -109,45 +380,56 @@ async def search_books(
 async def get_suggestions(
     q: str = Query(..., min_length=1, description="Search query prefix"),
     limit: int = Query(5, ge=1, le=10),
+    mode: str = Query("fulltext", pattern=SEARCH_MODE_PATTERN, description="Matching mode"),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Fuzzy match threshold"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get search suggestions (autocomplete).
-    Returns matching book titles and author names.
+    Returns book titles and author names having a word that starts
+    with the query, most popular first, from the in-memory index.
+    mode=fuzzy queries the database by trigram similarity instead.
     """
-    query = q.strip()
-    search_pattern = f"%{query}%"
-    
-    # Get matching book titles (case-insensitive for Cyrillic)
-    search_patterns = [f"%{query}%", f"%{query.lower()}%", f"%{query.upper()}%", f"%{query.capitalize()}%"]
-    book_conditions = [Book.title.like(p) for p in search_patterns]
-    author_conditions = [Author.name.like(p) for p in search_patterns]
-    
-    book_stmt = (
-        select(Book.title)
-        .filter(or_(*book_conditions))
-        .limit(limit)
+    query = normalize_query(q)
+    cache_key = ("suggestions", query, limit, mode, threshold)
+    response = await response_cache.get_or_load(
+        cache_key,
+        lambda: _get_suggestions(db, query, limit, mode, threshold),
+        tags=(SEARCH,),
     )
-    
-    # Get matching author names
-    author_stmt = (
-        select(Author.name)
-        .filter(or_(*author_conditions))
-        .limit(limit)
-    )
-    
-    book_result = await db.execute(book_stmt)
-    author_result = await db.execute(author_stmt)
-    
+    return response.model_copy(update={"query": q.strip()})
+
+
+async def _get_suggestions(
+    db: AsyncSession, query: str, limit: int, mode: str, threshold: Optional[float]
+) -> SearchSuggestions:
+    """get_suggestions without the response cache."""
     suggestions = []
     
-    # Add book titles
-    for row in book_result:
-        suggestions.append(f"📚 {row.title}")
-    
-    # Add author names
-    for row in author_result:
-        suggestions.append(f"✍️ {row.name}")
+    if mode == "fuzzy":
+        book_condition, book_score = await _trigram_match(db, query, threshold, Book.title_normalized)
+        author_condition, author_score = await _trigram_match(db, query, threshold, Author.name_normalized)
+        # Titles and names are queried concurrently
+        book_result, author_result = await execute_concurrently(
+            db,
+            select(Book.title).filter(book_condition).order_by(book_score.desc()).limit(limit),
+            select(Author.name).filter(author_condition).order_by(author_score.desc()).limit(limit),
+            setup=_trigram_setup(db, threshold),
+        )
+        
+        # Add book titles
+        for row in book_result:
+            suggestions.append(f"📚 {row.title}")
+        
+        # Add author names
+        for row in author_result:
+            suggestions.append(f"✍️ {row.name}")
+    else:
+        for entry in autocomplete_index.suggest(query, limit):
+            if entry.kind == BOOK:
+                suggestions.append(f"📚 {entry.text}")
+            else:
+                suggestions.append(f"✍️ {entry.text}")
     
     # Remove duplicates and limit
     seen = set()
@@ -173,15 +455,59 @@ async def advanced_search(
     year_to: Optional[int] = Query(None, description="Year to"),
     library_id: Optional[int] = Query(None, description="Filter by library"),
     available_only: bool = Query(False, description="Only available books"),
+    mode: str = Query("fulltext", pattern=SEARCH_MODE_PATTERN, description="Matching mode"),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Fuzzy match threshold"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Count total results"),
+    facets: Optional[str] = Query(None, description="Comma-separated: library, availability, decade"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Advanced search with multiple filters.
-    Supports pagination.
+    mode=fuzzy matches title and author by trigram similarity,
+    mode=morph by stemmed terms (other word forms).
+    Supports page numbers and keyset pagination via cursor.
+    facets= adds bucket counts by library, availability and decade.
     """
-    # Build base query
+    facet_names = _parse_facets(facets)
+    title_query = normalize_query(title) if title else None
+    author_query = normalize_query(author) if author else None
+    cache_key = (
+        "advanced", title_query, author_query,
+        year_from, year_to, library_id, available_only, mode, threshold,
+        page, per_page, cursor, include_total, tuple(facet_names),
+    )
+    response = await response_cache.get_or_load(
+        cache_key,
+        lambda: _advanced_search(
+            db, title_query, author_query, year_from, year_to, library_id, available_only, mode,
+            threshold, page, per_page, cursor, include_total, facet_names
+        ),
+        tags=(SEARCH,),
+    )
+    return response.model_copy(update={"query": f"title={title}, author={author}"})
+
+
+async def _advanced_search(
+    db: AsyncSession,
+    title: Optional[str],
+    author: Optional[str],
+    year_from: Optional[int],
+    year_to: Optional[int],
+    library_id: Optional[int],
+    available_only: bool,
+    mode: str,
+    threshold: Optional[float],
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    include_total: bool,
+    facet_names: List[str],
+) -> SearchResponse:
+    """advanced_search without the response cache."""
+    # Build base query, counts come from the availability rollup
     base_stmt = (
         select(
             Book.id,
@@ -189,23 +515,36 @@ async def advanced_search(
             Author.name.label("author_name"),
             Book.year,
             Book.cover_url,
-            func.count(Copy.id).label("total_count"),
-            func.sum(case((Copy.status == "available", 1), else_=0)).label("available_count")
+            *availability_counts(library_id)
         )
         .join(Author, Book.author_id == Author.id)
-        .outerjoin(Copy, Book.id == Copy.book_id)
     )
 
     # Apply filters
     filters = []
+    scores = []
 
-    if title:
-        title_patterns = [f"%{title}%", f"%{title.lower()}%", f"%{title.upper()}%", f"%{title.capitalize()}%"]
-        filters.append(or_(*[Book.title.like(p) for p in title_patterns]))
-    
-    if author:
-        author_patterns = [f"%{author}%", f"%{author.lower()}%", f"%{author.upper()}%", f"%{author.capitalize()}%"]
-        filters.append(or_(*[Author.name.like(p) for p in author_patterns]))
+    if title and mode == "fuzzy":
+        condition, score = await _trigram_match(db, title, threshold, Book.title_normalized)
+        filters.append(condition)
+        scores.append(score)
+    elif title and mode == "morph":
+        matched = morph_match(query_terms(title), [TITLE, TITLE_TRANSLIT])
+        base_stmt = base_stmt.join(matched, matched.c.book_id == Book.id)
+        scores.append(matched.c.score)
+    elif title:
+        filters.append(_contains(title, Book.title_normalized))
+    
+    if author and mode == "fuzzy":
+        condition, score = await _trigram_match(db, author, threshold, Author.name_normalized)
+        filters.append(condition)
+        scores.append(score)
+    elif author and mode == "morph":
+        matched = morph_match(query_terms(author), [AUTHOR, AUTHOR_TRANSLIT])
+        base_stmt = base_stmt.join(matched, matched.c.book_id == Book.id)
+        scores.append(matched.c.score)
+    elif author:
+        filters.append(_contains(author, Author.name_normalized))
     
     if year_from:
         filters.append(Book.year >= year_from)
@@ -213,46 +552,40 @@ async def advanced_search(
     if year_to:
         filters.append(Book.year <= year_to)
     
-    if library_id:
-        filters.append(Copy.library_id == library_id)
+    # Library and availability filters run in SQL so pages and totals are exact
+    if library_id or available_only:
+        filters.append(in_stock(library_id, available_only))
     
     if filters:
         base_stmt = base_stmt.filter(and_(*filters))
     
-    # Group by book and author
-    base_stmt = base_stmt.group_by(Book.id, Book.title, Author.name, Book.year, Book.cover_url)
-    
-    # Count total results before filtering by availability
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-    
-    # Apply pagination
-    stmt = base_stmt.order_by(Book.title).limit(per_page).offset((page - 1) * per_page)
-    
-    result = await db.execute(stmt)
-    rows = result.all()
+    # Most similar (fuzzy) or most relevant (morph) first
+    sort_keys = [(score, True) for score in scores] + [(Book.title, False), (Book.id, False)]
+    setup = _trigram_setup(db, threshold) if mode == "fuzzy" and scores else []
+    rows, total, next_cursor = await _fetch_page(
+        db, base_stmt, sort_keys, page, per_page, cursor, include_total, setup
+    )
     
-    # Filter by availability if requested
-    results = []
-    for row in rows:
-        if available_only and (row.available_count or 0) == 0:
-            continue
-        
-        results.append(
-            SearchResult(
-                id=row.id,
-                title=row.title,
-                author_name=row.author_name,
-                year=row.year,
-                available_count=row.available_count or 0,
-                total_count=row.total_count or 0,
-                cover_url=row.cover_url
-            )
+    # Format results
+    results = [
+        SearchResult(
+            id=row.id,
+            title=row.title,
+            author_name=row.author_name,
+            year=row.year,
+            available_count=row.available_count or 0,
+            total_count=row.total_count or 0,
+            cover_url=row.cover_url
         )
+        for row in rows
+    ]
+    
+    facet_buckets = None
+    if facet_names:
+        facet_buckets = await _compute_facets(db, base_stmt, facet_names, library_id)
     
     # Calculate total pages
-    pages = (total + per_page - 1) // per_page
+    pages = (total + per_page - 1) // per_page if total is not None else None
     
     return SearchResponse(
         query=f"title={title}, author={author}",
@@ -260,5 +593,64 @@ async def advanced_search(
         page=page,
         per_page=per_page,
         pages=pages,
+        next_cursor=next_cursor,
+        facets=facet_buckets,
         results=results
     )
+
+
+@router.post("/batch", response_model=SearchBatchResponse)
+async def search_batch(
+    batch: SearchBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Run several searches in one request, results in the order of the queries.
+    Each query takes the parameters of /search (type=search) or
+    /search/advanced (type=advanced) and goes through the same response cache.
+    At most search_batch_concurrency queries run at once, each on its own
+    session; a query that fails validation (e.g. a bad cursor) gets its
+    status code and detail instead of a response.
+    """
+    specs = batch.queries
+    if len(specs) > settings.search_batch_max_queries:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.search_batch_max_queries} queries per batch"
+        )
+    
+    results: List[Optional[SearchBatchItem]] = [None] * len(specs)
+    pending = iter(range(len(specs)))
+    
+    async def worker(session: AsyncSession):
+        # Workers share the iterator: whoever is free takes the next query
+        for i in pending:
+            try:
+                response = await _run_spec(session, specs[i])
+                results[i] = SearchBatchItem(response=response)
+            except HTTPException as e:
+                results[i] = SearchBatchItem(status_code=e.status_code, detail=str(e.detail))
+    
+    async def worker_on_extra_session():
+        async with AsyncSession(db.bind, expire_on_commit=False) as session:
+            await worker(session)
+    
+    workers = min(max(settings.search_batch_concurrency, 1), len(specs))
+    await asyncio.gather(worker(db), *[worker_on_extra_session() for _ in range(workers - 1)])
+    return SearchBatchResponse(results=results)
+
+
+async def _run_spec(db: AsyncSession, spec: SearchSpec) -> SearchResponse:
+    """Run one batch query through its endpoint (cache and coalescing included)."""
+    if spec.type == "advanced":
+        return await advanced_search(
+            title=spec.title, author=spec.author, year_from=spec.year_from, year_to=spec.year_to,
+            library_id=spec.library_id, available_only=spec.available_only, mode=spec.mode,
+            threshold=spec.threshold, page=spec.page, per_page=spec.per_page, cursor=spec.cursor,
+            include_total=spec.include_total, facets=spec.facets, db=db,
+        )
+    return await search_books(
+        q=spec.q, library_id=spec.library_id, mode=spec.mode, threshold=spec.threshold,
+        page=spec.page, per_page=spec.per_page, cursor=spec.cursor,
+        include_total=spec.include_total, facets=spec.facets, db=db,
+    )
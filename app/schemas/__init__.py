@@ -1,4 +1,4 @@
 # Schemas package
-from app.schemas import auth, library, book, search
+from app.schemas import auth, library, book, search, circulation, hold
 
-__all__ = ["auth", "library", "book", "search"]
+__all__ = ["auth", "library", "book", "search", "circulation", "hold"]
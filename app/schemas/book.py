@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+import re
+
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -39,8 +41,28 @@ class BookResponse(BookInDB):
     cover_url: Optional[str] = None
 
 
+class SimilarBookResponse(BookResponse):
+    similarity: float  # cosine similarity to the requested book, 0..1
+
+
+class LibraryAvailability(BaseModel):
+    library_id: int
+    library_name: str
+    total_count: int
+    available_count: int
+
+
+class BookCopyItem(BaseModel):
+    id: int
+    library_id: int
+    library_name: str
+    inventory_number: str
+    status: str
+
+
 class BookDetailResponse(BookResponse):
-    copies_by_library: List[dict] = []
+    libraries: List[LibraryAvailability] = []  # copy counts per library
+    copies: Optional[List[BookCopyItem]] = None  # a page of copies, only when requested
 
 
 class CopyBase(BaseModel):
@@ -63,6 +85,69 @@ class CopyUpdate(BaseModel):
     status: Optional[str] = None
 
 
+class CopyBulkItem(BaseModel):
+    inventory_number: str = Field(..., min_length=1, max_length=50)
+    library_id: Optional[int] = None  # defaults to the request's library_id
+    status: Optional[str] = None  # defaults to the request's status
+
+
+# "ШК-{0001..0040}": numbers of the range keep the width of its start
+INVENTORY_RANGE_RE = re.compile(r"^(?P<prefix>[^{}]*)\{(?P<start>\d+)\.\.(?P<end>\d+)\}(?P<suffix>[^{}]*)$")
+
+
+class CopyBulkCreate(BaseModel):
+    """Copies given as a list or as an inventory number range, not both."""
+    library_id: Optional[int] = None
+    status: str = "available"
+    copies: Optional[List[CopyBulkItem]] = Field(None, min_length=1)
+    inventory_range: Optional[str] = Field(None, description='e.g. "ШК-{0001..0040}"')
+
+    @model_validator(mode="after")
+    def check_copies(self):
+        if (self.copies is None) == (self.inventory_range is None):
+            raise ValueError("Exactly one of copies and inventory_range is required")
+        if self.inventory_range is not None:
+            match = INVENTORY_RANGE_RE.match(self.inventory_range)
+            if not match or int(match["start"]) > int(match["end"]):
+                raise ValueError('inventory_range must look like "PREFIX{0001..0040}"')
+            if len(match["prefix"]) + len(match["end"]) + len(match["suffix"]) > 50:
+                raise ValueError("Inventory numbers of the range are longer than 50 characters")
+            if self.library_id is None:
+                raise ValueError("library_id is required for inventory_range")
+        elif self.library_id is None and any(c.library_id is None for c in self.copies):
+            raise ValueError("library_id is required for copies without one")
+        return self
+
+    def items(self) -> List[CopyBulkItem]:
+        """The copies to create, with defaults applied and ranges expanded."""
+        if self.copies is not None:
+            return [
+                CopyBulkItem(
+                    inventory_number=c.inventory_number,
+                    library_id=c.library_id if c.library_id is not None else self.library_id,
+                    status=c.status or self.status,
+                )
+                for c in self.copies
+            ]
+        match = INVENTORY_RANGE_RE.match(self.inventory_range)
+        width = len(match["start"])
+        return [
+            CopyBulkItem(
+                inventory_number=f"{match['prefix']}{n:0{width}d}{match['suffix']}",
+                library_id=self.library_id,
+                status=self.status,
+            )
+            for n in range(int(match["start"]), int(match["end"]) + 1)
+        ]
+
+    def size(self) -> int:
+        """Number of copies requested, without expanding a range."""
+        if self.copies is not None:
+            return len(self.copies)
+        match = INVENTORY_RANGE_RE.match(self.inventory_range)
+        return int(match["end"]) - int(match["start"]) + 1
+
+
 class CopyInDB(CopyBase):
     id: int
     created_at: datetime
@@ -74,3 +159,17 @@ class CopyInDB(CopyBase):
 class CopyResponse(CopyInDB):
     library_name: Optional[str] = None
     book_title: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    line: int  # line of the record in the file (CSV header is line 1)
+    error: str
+
+
+class BookImportResult(BaseModel):
+    rows: int
+    authors_created: int
+    books_created: int
+    copies_created: int
+    error_count: int
+    errors: List[ImportRowError] = []  # the first MAX_REPORTED_ERRORS of them
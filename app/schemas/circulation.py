@@ -0,0 +1,50 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Scan(BaseModel):
+    inventory_number: str = Field(..., min_length=1, max_length=50)
+    status: Literal["available", "loaned", "reserved"]
+
+
+class ScanBatchRequest(BaseModel):
+    # Applied in order: a repeated number ends in its last status
+    scans: List[Scan] = Field(..., min_length=1)
+
+
+class ScanResult(BaseModel):
+    inventory_number: str
+    found: bool
+    copy_id: Optional[int] = None
+    book_id: Optional[int] = None
+    library_id: Optional[int] = None
+    previous_status: Optional[str] = None  # before the batch
+    status: Optional[str] = None  # after the batch
+    hold_id: Optional[int] = None  # hold a returned copy was set aside for ("reserved")
+
+
+class ScanBatchResponse(BaseModel):
+    results: List[ScanResult]  # in the order of the scans
+
+
+class CheckoutRequest(BaseModel):
+    book_id: int
+    library_id: int
+
+
+class CheckoutResult(BaseModel):
+    copy_id: int
+    inventory_number: str
+    book_id: int
+    library_id: int
+    status: str
+
+
+class CirculationStats(BaseModel):
+    book_id: Optional[int] = None  # set when grouped by book
+    book_title: Optional[str] = None
+    library_id: Optional[int] = None  # set when grouped by library
+    library_name: Optional[str] = None
+    loans: int  # changes to "loaned"
+    returns: int  # changes from "loaned"
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class HoldCreate(BaseModel):
+    book_id: int
+    library_id: Optional[int] = None  # pickup library, any if not given
+    patron_card: str = Field(..., min_length=1, max_length=50)
+
+
+class HoldResponse(BaseModel):
+    id: int
+    book_id: int
+    library_id: Optional[int] = None
+    patron_card: str
+    status: str  # waiting, ready, fulfilled, cancelled, expired
+    copy_id: Optional[int] = None  # copy set aside once ready
+    created_at: datetime
+    ready_at: Optional[datetime] = None
+    position: Optional[int] = None  # waiting holds ahead, for a waiting hold
+
+    class Config:
+        from_attributes = True
+
+
+class HoldExpiryResult(BaseModel):
+    expired: int  # ready holds past the pickup window
+    reassigned: int  # of their copies, set aside for the next waiting hold
@@ -1,5 +1,10 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional
+
+# "fulltext" - full-text/substring search, "fuzzy" - trigram similarity (typos, fragments),
+# "morph" - stemmed terms, matches other word forms ("толстого" -> "Толстой"),
+# "bm25" - the same terms ranked by BM25 relevance (title, then author, then description)
+SEARCH_MODE_PATTERN = "^(fulltext|fuzzy|morph|bm25)$"
 
 
 class SearchResult(BaseModel):
@@ -12,15 +17,63 @@ class SearchResult(BaseModel):
     cover_url: Optional[str] = None
 
 
+class FacetBucket(BaseModel):
+    value: int  # library id, decade start year, or 1/0 for available/unavailable
+    label: Optional[str] = None
+    count: int
+
+
 class SearchResponse(BaseModel):
     query: str
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass as cursor to get the next page
+    facets: Optional[Dict[str, List[FacetBucket]]] = None  # only when requested
+    suggested_query: Optional[str] = None  # "did you mean", only when nothing was found
     results: List[SearchResult]
 
 
 class SearchSuggestions(BaseModel):
     query: str
     suggestions: List[str]
+
+
+class SearchSpec(BaseModel):
+    """One query of a batch: the parameters of /search ("search") or /search/advanced."""
+    type: Literal["search", "advanced"] = "search"
+    q: Optional[str] = Field(None, min_length=1)  # required for "search"
+    title: Optional[str] = None
+    author: Optional[str] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    library_id: Optional[int] = None
+    available_only: bool = False
+    mode: str = Field("fulltext", pattern=SEARCH_MODE_PATTERN)
+    threshold: Optional[float] = Field(None, ge=0, le=1)
+    page: int = Field(1, ge=1)
+    per_page: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+    include_total: bool = True
+    facets: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_query(self):
+        if self.type == "search" and not self.q:
+            raise ValueError("q is required for type=search")
+        return self
+
+
+class SearchBatchRequest(BaseModel):
+    queries: List[SearchSpec] = Field(..., min_length=1)
+
+
+class SearchBatchItem(BaseModel):
+    status_code: int = 200
+    detail: Optional[str] = None  # error message when status_code is not 200
+    response: Optional[SearchResponse] = None
+
+
+class SearchBatchResponse(BaseModel):
+    results: List[SearchBatchItem]  # in the order of the queries
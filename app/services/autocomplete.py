@@ -0,0 +1,231 @@
+"""In-memory autocomplete index for book titles and author names.
+
+Suggestions are answered from a sorted list of normalized keys with
+range lookups, so the hot autocomplete path never touches the connection
+pool. Every word start of a title or name is indexed,
+so "каренин" suggests "Анна Каренина". Transliteration keys are indexed
+too, and Latin prefixes are also looked up as typed with the wrong
+keyboard layout, so "tolst" and "ljcn" suggest Толстой and Достоевский.
+
+The index is built once at startup (see app.main) and kept up to date by
+the write endpoints in app.routers.books and app.routers.authors. Keys are
+kept in a SortedList, so a write costs O(log n) rather than shifting the
+whole array, and it drops only the cached top suggestions of the prefixes
+of its own keys. Each worker process holds its own copy.
+"""
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Author, Book, BookAvailability, normalize_text
+from app.services.transliteration import is_latin, layout_to_cyrillic, translit_key
+
+BOOK = "book"
+AUTHOR = "author"
+
+# Upper bound of the suggestions endpoint "limit", cached per prefix
+MAX_SUGGESTIONS = 10
+# Number of prefixes whose top suggestions are kept between writes
+MAX_CACHED_PREFIXES = 4096
+
+_WORD_START_RE = re.compile(r"\w+")
+
+
+def _word_starts(text: str) -> List[str]:
+    return [text[match.start():] for match in _WORD_START_RE.finditer(text)]
+
+
+def _translit(normalized: str) -> str:
+    return " ".join(translit_key(word) for word in normalized.split())
+
+
+def _index_keys(text: str) -> List[str]:
+    """Normalized and transliterated text from each word start:
+    "анна каренина", "каренина", "ana karenina", "karenina".
+    """
+    normalized = normalize_text(text)
+    return list(dict.fromkeys(_word_starts(normalized) + _word_starts(_translit(normalized))))
+
+
+def _prefix_keys(prefix: str) -> List[str]:
+    """Keys to look a typed prefix up by: as is, and for Latin input its
+    transliteration key (also without a trailing i, which may be the start
+    of an iotated vowel: "dostoy") and its wrong-layout reading.
+    """
+    normalized = normalize_text(prefix)
+    keys = [normalized]
+    if is_latin(prefix):
+        latin = _translit(normalized)
+        keys += [latin, latin[:-1] if latin.endswith("i") else latin]
+        keys.append(normalize_text(layout_to_cyrillic(prefix)))
+    return [key for key in dict.fromkeys(keys) if key]
+
+
+def _rank(entry: "Entry"):
+    """Suggestion order: most popular first, books before authors, then by text."""
+    return -entry.weight, entry.kind != BOOK, entry.text
+
+
+@dataclass
+class Entry:
+    kind: str
+    entity_id: int
+    text: str
+    weight: int = 0
+    author_id: Optional[int] = None
+    keys: List[str] = field(default_factory=list)
+
+
+class AutocompleteIndex:
+    """Prefix index with popularity weights (copies per book, books per author)."""
+
+    def __init__(self):
+        self._items: SortedList = SortedList()  # (key, kind, entity_id)
+        self._entries: Dict[Tuple[str, int], Entry] = {}
+        self._top_cache: Dict[str, List[Entry]] = {}
+        # Length of the longest cached prefix: longer prefixes of a key need no invalidation
+        self._cached_length = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from the database."""
+        copies = (
+            select(
+                BookAvailability.book_id,
+                func.sum(BookAvailability.total_count).label("copies"),
+            )
+            .group_by(BookAvailability.book_id)
+            .subquery()
+        )
+        books = await db.execute(
+            select(Book.id, Book.title, Book.author_id, copies.c.copies)
+            .outerjoin(copies, copies.c.book_id == Book.id)
+        )
+        book_counts = (
+            select(Book.author_id, func.count(Book.id).label("books"))
+            .group_by(Book.author_id)
+            .subquery()
+        )
+        authors = await db.execute(
+            select(Author.id, Author.name, book_counts.c.books)
+            .outerjoin(book_counts, book_counts.c.author_id == Author.id)
+        )
+
+        self._entries = {}
+        items = []
+        for row in books:
+            entry = self._make_entry(BOOK, row.id, row.title, row.copies or 0, row.author_id)
+            items.extend((key, BOOK, row.id) for key in entry.keys)
+        for row in authors:
+            entry = self._make_entry(AUTHOR, row.id, row.name, row.books or 0)
+            items.extend((key, AUTHOR, row.id) for key in entry.keys)
+        self._items = SortedList(items)
+        self._top_cache = {}
+        self._cached_length = 0
+
+    def _make_entry(
+        self, kind: str, entity_id: int, text: str, weight: int, author_id: Optional[int] = None
+    ) -> Entry:
+        entry = Entry(kind, entity_id, text, weight, author_id, _index_keys(text))
+        self._entries[(kind, entity_id)] = entry
+        return entry
+
+    def add(
+        self, kind: str, entity_id: int, text: str, weight: int = 0, author_id: Optional[int] = None
+    ) -> None:
+        """Add or replace a title/name."""
+        self.remove(kind, entity_id)
+        entry = self._make_entry(kind, entity_id, text, weight, author_id)
+        self._items.update((key, kind, entity_id) for key in entry.keys)
+        self._invalidate(entry)
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        entry = self._entries.pop((kind, entity_id), None)
+        if entry is None:
+            return
+        for key in entry.keys:
+            self._items.discard((key, kind, entity_id))
+        self._invalidate(entry)
+
+    def adjust_weight(self, kind: str, entity_id: Optional[int], delta: int) -> None:
+        entry = self._entries.get((kind, entity_id))
+        if entry is not None:
+            entry.weight = max(entry.weight + delta, 0)
+            self._invalidate(entry)
+
+    def _invalidate(self, entry: Entry) -> None:
+        """Drop the cached top suggestions of the prefixes an entry is found by."""
+        if not self._top_cache:
+            return
+        for key in entry.keys:
+            for length in range(1, min(len(key), self._cached_length) + 1):
+                self._top_cache.pop(key[:length], None)
+
+    def add_book(self, book_id: int, title: str, author_id: Optional[int]) -> None:
+        """Add a new book or apply a rename / author change, keeping its weight."""
+        previous = self._entries.get((BOOK, book_id))
+        weight = 0
+        if previous is not None:
+            weight = previous.weight
+            self.adjust_weight(AUTHOR, previous.author_id, -1)
+        self.add(BOOK, book_id, title, weight, author_id)
+        self.adjust_weight(AUTHOR, author_id, 1)
+
+    def add_author(self, author_id: int, name: str) -> None:
+        """Add a new author or apply a rename, keeping their weight."""
+        previous = self._entries.get((AUTHOR, author_id))
+        self.add(AUTHOR, author_id, name, previous.weight if previous else 0)
+
+    def remove_book(self, book_id: int) -> None:
+        entry = self._entries.get((BOOK, book_id))
+        if entry is not None:
+            self.remove(BOOK, book_id)
+            self.adjust_weight(AUTHOR, entry.author_id, -1)
+
+    def remove_author(self, author_id: int) -> None:
+        """Remove an author together with their books (deleted by cascade)."""
+        book_ids = [
+            entry.entity_id for entry in self._entries.values()
+            if entry.kind == BOOK and entry.author_id == author_id
+        ]
+        for book_id in book_ids:
+            self.remove(BOOK, book_id)
+        self.remove(AUTHOR, author_id)
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[Entry]:
+        """Most popular titles/names having a word that starts with the prefix."""
+        keys = _prefix_keys(prefix)
+        if len(keys) == 1:
+            return self._cached_top(keys[0])[:limit]
+        matched = {}
+        for key in keys:
+            for entry in self._cached_top(key):
+                matched[(entry.kind, entry.entity_id)] = entry
+        return heapq.nsmallest(limit, matched.values(), key=_rank)
+
+    def _cached_top(self, prefix: str) -> List[Entry]:
+        top = self._top_cache.get(prefix)
+        if top is None:
+            top = self._top(prefix)
+            if len(self._top_cache) >= MAX_CACHED_PREFIXES:
+                self._top_cache.clear()
+                self._cached_length = 0
+            self._top_cache[prefix] = top
+            self._cached_length = max(self._cached_length, len(prefix))
+        return top
+
+    def _top(self, prefix: str) -> List[Entry]:
+        items = self._items.irange((prefix,), (prefix + "\uffff",), inclusive=(True, False))
+        matched = {(kind, entity_id) for _, kind, entity_id in items}
+        entries = (self._entries[ref] for ref in matched)
+        return heapq.nsmallest(MAX_SUGGESTIONS, entries, key=_rank)
+
+
+autocomplete_index = AutocompleteIndex()
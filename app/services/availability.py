@@ -0,0 +1,110 @@
+"""Availability rollup: per-library copy counts of each book.
+
+Listing and search endpoints read total/available counts from the
+book_availability table instead of counting copies, so a page costs the
+same no matter how many copies the books have. Every write that adds,
+removes or changes copies must call adjust_availability in the same
+transaction.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import is_postgresql
+from app.models import Book, BookAvailability, Copy
+
+AVAILABLE = "available"
+
+# (book_id, library_id, total delta, available delta)
+AvailabilityDelta = Tuple[int, int, int, int]
+
+
+def copy_delta(book_id: int, library_id: int, status: str, sign: int = 1) -> AvailabilityDelta:
+    """Delta for adding (sign=1) or removing (sign=-1) one copy."""
+    return book_id, library_id, sign, sign if status == AVAILABLE else 0
+
+
+async def adjust_availability(db: AsyncSession, deltas: Iterable[AvailabilityDelta]) -> None:
+    """Apply count deltas with a single multi-row upsert (does not commit)."""
+    merged: Dict[Tuple[int, int], list] = defaultdict(lambda: [0, 0])
+    for book_id, library_id, total_delta, available_delta in deltas:
+        counts = merged[(book_id, library_id)]
+        counts[0] += total_delta
+        counts[1] += available_delta
+
+    rows = [
+        {
+            "book_id": book_id,
+            "library_id": library_id,
+            "total_count": total_delta,
+            "available_count": available_delta,
+        }
+        for (book_id, library_id), (total_delta, available_delta) in merged.items()
+        if total_delta or available_delta
+    ]
+    if not rows:
+        return
+
+    insert = pg_insert if is_postgresql(db) else sqlite_insert
+    stmt = insert(BookAvailability).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BookAvailability.book_id, BookAvailability.library_id],
+        set_={
+            "total_count": BookAvailability.total_count + stmt.excluded.total_count,
+            "available_count": BookAvailability.available_count + stmt.excluded.available_count,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def rebuild_availability(db: AsyncSession) -> None:
+    """Recompute the whole rollup from copies (seeding, repairs; does not commit)."""
+    await db.execute(delete(BookAvailability))
+    counts = select(
+        Copy.book_id,
+        Copy.library_id,
+        func.count(Copy.id),
+        func.count(Copy.id).filter(Copy.status == AVAILABLE),
+    ).group_by(Copy.book_id, Copy.library_id)
+    await db.execute(
+        BookAvailability.__table__.insert().from_select(
+            ["book_id", "library_id", "total_count", "available_count"], counts
+        )
+    )
+
+
+def availability_counts(library_id: Optional[int] = None, book_id=Book.id):
+    """Correlated total/available counts of Book, optionally for one library.
+
+    Returns labeled scalar subqueries to add to a select over Book (or to
+    RETURNING of a book write, with book_id=returning_column(Book.id)); each
+    reads the book's rollup rows through the primary key.
+    """
+    def rollup_sum(column):
+        stmt = select(func.coalesce(func.sum(column), 0)).where(BookAvailability.book_id == book_id)
+        if library_id:
+            stmt = stmt.where(BookAvailability.library_id == library_id)
+        return stmt.scalar_subquery()
+
+    return (
+        rollup_sum(BookAvailability.total_count).label("total_count"),
+        rollup_sum(BookAvailability.available_count).label("available_count"),
+    )
+
+
+def in_stock(library_id: Optional[int] = None, available_only: bool = False):
+    """EXISTS semi-join on the rollup: the book has copies (available ones
+    if available_only), in the given library if library_id is set.
+    """
+    stmt = select(BookAvailability.book_id).where(BookAvailability.book_id == Book.id)
+    if library_id:
+        stmt = stmt.where(BookAvailability.library_id == library_id)
+    if available_only:
+        stmt = stmt.where(BookAvailability.available_count > 0)
+    else:
+        stmt = stmt.where(BookAvailability.total_count > 0)
+    return stmt.exists()
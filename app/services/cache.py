@@ -0,0 +1,155 @@
+"""In-process TTL + LRU cache for public read endpoints.
+
+Responses of search, suggestions, book details and the library list are
+cached by endpoint name and normalized parameters. A hit is answered
+before the request touches the database: the session given by get_db
+checks a connection out of the pool lazily, on the first query, so it
+never does on a hit.
+
+Entries carry tags ("search", "book:42", "author:7", ...). The staff
+write endpoints invalidate the tags they affect after committing; the
+TTL bounds staleness for anything invalidation misses, e.g. writes made
+by another worker process, each of which holds its own cache.
+
+Concurrent misses of the same key are coalesced into one load (see
+app.services.singleflight).
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple, Union
+
+from app.config import get_settings
+from app.services.singleflight import request_flights
+
+# Search results and suggestions: any catalog or availability change
+SEARCH = "search"
+# Library list, and library names shown in book details
+LIBRARIES = "libraries"
+
+
+def book_tag(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+def author_tag(author_id: int) -> str:
+    return f"author:{author_id}"
+
+
+def normalize_query(text: str) -> str:
+    """Cache key form of a search string: case and spacing don't matter."""
+    return " ".join(text.casefold().split())
+
+
+class TTLCache:
+    """Bounded mapping with per-entry expiry, LRU eviction and tag invalidation."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, value, tags), least recently used first
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped by invalidate() and clear(): loads started before don't store their result
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value); expired entries count as misses."""
+        item = self._data.get(key)
+        if item is not None:
+            expires_at, value, _ = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, value
+            self._discard(key)
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        if self.maxsize <= 0:
+            return
+        self._discard(key)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._discard(oldest)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Tuple,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = (),
+    ) -> Any:
+        """Cached value of key, calling loader on a miss (exceptions are not cached).
+
+        Identical concurrent misses share one loader call, unless the cache
+        was invalidated in between: a request arriving after a write never
+        joins a load that may have read the data before it. tags may be a
+        function of the loaded value. The first element of key names the
+        endpoint in the coalescing metrics.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+
+        generation = self._generation
+
+        async def load():
+            value = await loader()
+            if generation == self._generation:
+                self.set(key, value, tags(value) if callable(tags) else tags)
+            return value
+
+        return await request_flights.run((*key, generation), load)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of the tags."""
+        self._generation += 1
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._discard(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _discard(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+_settings = get_settings()
+response_cache = TTLCache(_settings.cache_max_entries, _settings.cache_ttl_seconds)
@@ -0,0 +1,339 @@
+"""Bulk catalog import from CSV or JSON Lines.
+
+Each row is a title with an optional copy:
+
+    title, author, isbn, year, description, library_id, inventory_number, status
+
+Rows are read lazily from the uploaded file and written in batches of
+BATCH_SIZE: authors are resolved by normalized name (missing ones are
+created), books by ISBN or by title and author, so several rows may add
+copies of one book. New books, their search terms and the copies are
+inserted with multi-row statements (COPY on PostgreSQL, see
+app.database.insert_rows), and the availability rollup with one upsert per
+batch. Available copies of books readers are waiting for then go to the
+waiting holds, as returned copies do. Rows that fail validation are
+reported by line and skipped.
+
+The caller owns the transaction and, after committing, applies
+CatalogImport.sync_memory() to the in-memory indexes.
+"""
+import csv
+import io
+import json
+from itertools import islice
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import insert_rows
+from app.models import Author, Book, Copy, Hold, Library, normalize_text
+from app.services.autocomplete import BOOK, autocomplete_index
+from app.services.availability import adjust_availability, copy_delta
+from app.services.circulation import (
+    AVAILABLE,
+    COPY_STATUSES,
+    WAITING,
+    StatusChange,
+    hold_new_copies,
+)
+from app.services.search_index import store_book_terms
+from app.services.similar_books import similar_books
+from app.services.spelling import spelling_dictionary
+
+CSV = "csv"
+JSONL = "jsonl"
+
+BATCH_SIZE = 1000
+# Errors beyond this many are counted but not listed
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportRow(BaseModel):
+    title: str = Field(..., min_length=1, max_length=500)
+    author: str = Field(..., min_length=1, max_length=255)
+    isbn: Optional[str] = Field(None, max_length=13)
+    year: Optional[int] = Field(None, ge=0, le=2100)
+    description: Optional[str] = Field(None, max_length=5000)
+    library_id: Optional[int] = None
+    inventory_number: Optional[str] = Field(None, min_length=1, max_length=50)
+    status: str = "available"
+
+    @field_validator("isbn", mode="before")
+    @classmethod
+    def strip_isbn(cls, value):
+        # "978-5-17-090630-7" is stored as "9785170906307"
+        if isinstance(value, str):
+            value = value.replace("-", "").replace(" ", "")
+        return value or None
+
+    @field_validator("status")
+    @classmethod
+    def check_status(cls, value):
+        if value not in COPY_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(COPY_STATUSES)}")
+        return value
+
+
+def read_rows(file: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(line, fields, error) of each record of an uploaded file, read lazily.
+
+    Empty CSV cells are left out, so optional fields get their defaults.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="strict", newline="")
+    try:
+        if fmt == CSV:
+            reader = csv.DictReader(text)
+            for fields in reader:
+                fields = {k: v for k, v in fields.items() if k and v not in (None, "")}
+                yield reader.line_num, fields, None
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    fields = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(fields, dict):
+                    yield line_number, None, "Expected a JSON object"
+                    continue
+                yield line_number, fields, None
+    finally:
+        text.detach()
+
+
+class CatalogImport:
+    """Counts, errors and written entities of one import."""
+
+    def __init__(self, default_library_id: Optional[int] = None):
+        self.default_library_id = default_library_id
+        self.rows = 0
+        self.authors_created = 0
+        self.books_created = 0
+        self.copies_created = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+        self._library_ids: Optional[set] = None
+        # For sync_memory(): new authors and books, copies added per book
+        self._new_authors: List[Tuple[int, str]] = []
+        self._new_books: List[Tuple[int, str, int, Optional[str]]] = []
+        self._copies_per_book: Dict[int, int] = {}
+
+    def _error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    @property
+    def touched_book_ids(self) -> List[int]:
+        return list(self._copies_per_book)
+
+    async def run(self, db: AsyncSession, file: IO[bytes], fmt: str) -> None:
+        """Import every batch of the file (does not commit)."""
+        self._library_ids = set((await db.execute(select(Library.id))).scalars())
+        records = read_rows(file, fmt)
+        while True:
+            # Reading and parsing the spooled upload is blocking file I/O
+            batch = await run_in_threadpool(lambda: list(islice(records, BATCH_SIZE)))
+            if not batch:
+                break
+            await self._import_batch(db, batch)
+        # Duplicates are found after validation of the whole batch
+        self.errors.sort(key=lambda error: error["line"])
+
+    def _validate(self, batch) -> List[Tuple[int, ImportRow]]:
+        rows = []
+        for line, fields, error in batch:
+            self.rows += 1
+            if error:
+                self._error(line, error)
+                continue
+            try:
+                row = ImportRow.model_validate(fields)
+            except ValidationError as e:
+                self._error(line, "; ".join(
+                    f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            if row.inventory_number:
+                row.library_id = row.library_id or self.default_library_id
+                if row.library_id is None:
+                    self._error(line, "library_id is required for a copy")
+                    continue
+                if row.library_id not in self._library_ids:
+                    self._error(line, "Library not found")
+                    continue
+            rows.append((line, row))
+        return rows
+
+    async def _import_batch(self, db: AsyncSession, batch) -> None:
+        rows = self._validate(batch)
+        if not rows:
+            return
+
+        # Copies whose inventory number is taken (in the database or earlier in the batch)
+        numbers = [row.inventory_number for _, row in rows if row.inventory_number]
+        taken = set()
+        if numbers:
+            result = await db.execute(
+                select(Copy.inventory_number).where(Copy.inventory_number.in_(numbers))
+            )
+            taken = set(result.scalars())
+        valid = []
+        for line, row in rows:
+            if row.inventory_number:
+                if row.inventory_number in taken:
+                    self._error(line, "Copy with this inventory number already exists")
+                    continue
+                taken.add(row.inventory_number)
+            valid.append((line, row))
+
+        author_ids = await self._resolve_authors(db, [row.author for _, row in valid])
+        book_ids = await self._resolve_books(db, valid, author_ids)
+
+        copies = [
+            {
+                "book_id": book_ids[line],
+                "library_id": row.library_id,
+                "inventory_number": row.inventory_number,
+                "status": row.status,
+            }
+            for line, row in valid
+            if row.inventory_number and line in book_ids
+        ]
+        await insert_rows(db, Copy.__table__, copies)
+        await adjust_availability(
+            db, [copy_delta(c["book_id"], c["library_id"], c["status"]) for c in copies]
+        )
+        for copy in copies:
+            book_id = copy["book_id"]
+            self._copies_per_book[book_id] = self._copies_per_book.get(book_id, 0) + 1
+        self.copies_created += len(copies)
+        await self._serve_holds(
+            db, [c["inventory_number"] for c in copies if c["status"] == AVAILABLE]
+        )
+
+    async def _serve_holds(self, db: AsyncSession, numbers: List[str]) -> None:
+        """Give the new available copies of books with waiting holds to the holds."""
+        if not numbers:
+            return
+        waiting = select(Hold.id).where(Hold.book_id == Copy.book_id, Hold.status == WAITING)
+        result = await db.execute(
+            select(Copy.id, Copy.inventory_number, Copy.book_id, Copy.library_id)
+            .where(Copy.inventory_number.in_(numbers), waiting.exists())
+            .order_by(Copy.id)
+        )
+        await hold_new_copies(db, [
+            StatusChange(row.id, row.inventory_number, row.book_id, row.library_id, None, AVAILABLE)
+            for row in result
+        ])
+
+    async def _resolve_authors(self, db: AsyncSession, names: List[str]) -> Dict[str, int]:
+        """Author id by normalized name, creating the missing authors."""
+        first_name = {}
+        for name in names:
+            first_name.setdefault(normalize_text(name), name.strip())
+        result = await db.execute(
+            select(Author.name_normalized, func.min(Author.id))
+            .where(Author.name_normalized.in_(list(first_name)))
+            .group_by(Author.name_normalized)
+        )
+        author_ids = dict(result.all())
+
+        missing = [
+            {"name": name, "name_normalized": normalized}
+            for normalized, name in first_name.items()
+            if normalized not in author_ids
+        ]
+        if missing:
+            result = await db.execute(
+                insert(Author).returning(Author.id, sort_by_parameter_order=True), missing
+            )
+            for row, author_id in zip(missing, result.scalars()):
+                author_ids[row["name_normalized"]] = author_id
+                self._new_authors.append((author_id, row["name"]))
+            self.authors_created += len(missing)
+        return author_ids
+
+    async def _resolve_books(
+        self, db: AsyncSession, rows: List[Tuple[int, ImportRow]], author_ids: Dict[str, int]
+    ) -> Dict[int, int]:
+        """Book id of each row by line: existing books are matched by ISBN,
+        or by normalized title and author; the others are created once per key.
+        """
+        keyed = []
+        for line, row in rows:
+            author_id = author_ids[normalize_text(row.author)]
+            if row.isbn:
+                key = ("isbn", row.isbn)
+            else:
+                key = ("title", normalize_text(row.title), author_id)
+            keyed.append((line, row, author_id, key))
+
+        found: Dict[tuple, int] = {}
+        isbns = [key[1] for *_, key in keyed if key[0] == "isbn"]
+        if isbns:
+            result = await db.execute(select(Book.isbn, Book.id).where(Book.isbn.in_(isbns)))
+            found.update({("isbn", isbn): book_id for isbn, book_id in result})
+        pairs = list({key[1:] for *_, key in keyed if key[0] == "title"})
+        if pairs:
+            result = await db.execute(
+                select(Book.title_normalized, Book.author_id, func.min(Book.id))
+                .where(tuple_(Book.title_normalized, Book.author_id).in_(pairs))
+                .group_by(Book.title_normalized, Book.author_id)
+            )
+            found.update(
+                {("title", title, author_id): book_id for title, author_id, book_id in result}
+            )
+
+        new_books: Dict[tuple, dict] = {}
+        for line, row, author_id, key in keyed:
+            if key not in found and key not in new_books:
+                new_books[key] = {
+                    "title": row.title,
+                    "title_normalized": normalize_text(row.title),
+                    "author_id": author_id,
+                    "isbn": row.isbn,
+                    "year": row.year,
+                    "description": row.description,
+                }
+        if new_books:
+            values = list(new_books.values())
+            result = await db.execute(
+                insert(Book).returning(Book.id, sort_by_parameter_order=True), values
+            )
+            author_names = {author_id: name for name, author_id in (
+                (row.author.strip(), author_ids[normalize_text(row.author)]) for _, row in rows
+            )}
+            terms = []
+            for key, values_row, book_id in zip(new_books, values, result.scalars()):
+                found[key] = book_id
+                self._new_books.append(
+                    (book_id, values_row["title"], values_row["author_id"],
+                     values_row["description"])
+                )
+                terms.append((
+                    book_id, values_row["title"],
+                    author_names[values_row["author_id"]], values_row["description"],
+                ))
+            await store_book_terms(db, terms, replace=False)
+            self.books_created += len(new_books)
+
+        return {line: found[key] for line, _, _, key in keyed}
+
+    def sync_memory(self) -> None:
+        """Apply the committed import to the in-memory indexes."""
+        for author_id, name in self._new_authors:
+            autocomplete_index.add_author(author_id, name)
+            spelling_dictionary.add_author(author_id, name)
+            similar_books.add_author(author_id, name)
+        for book_id, title, author_id, description in self._new_books:
+            autocomplete_index.add_book(book_id, title, author_id)
+            spelling_dictionary.add_book(book_id, title, author_id)
+            similar_books.add_book(book_id, title, author_id, description)
+        for book_id, count in self._copies_per_book.items():
+            autocomplete_index.adjust_weight(BOOK, book_id, count)
@@ -0,0 +1,444 @@
+"""Copy status changes at the circulation desk: check-outs, returns, holds.
+
+Desk scans are keyed by inventory number and applied in batches: the
+copies are locked by one SELECT ... FOR UPDATE (in id order, so that
+concurrent batches can't deadlock), updated by one statement and moved
+between availability rollup rows by one upsert, whatever the batch size.
+
+Holds queue readers for a book, at a library or at any library. A copy
+returned through change_statuses() is set aside ("reserved") for the
+oldest waiting hold it can serve, and leaving "reserved" ends that hold.
+
+Every status change is also appended to circulation_events, the history
+behind the circulation statistics. Nothing reads it for availability (the
+rollup and copies.status answer that), so it only grows at the end; on
+PostgreSQL it is partitioned by month. ensure_partitions() creates the
+partitions of the current and the next PARTITION_MONTHS_AHEAD months at
+startup, and maintain_partitions() repeats it daily while the process
+runs, so a long-running worker never writes into the DEFAULT partition
+(rows there would make creating their month's partition fail later).
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy import Integer, String, case, column, func, or_, select, text, update, values
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.database import insert_rows, is_postgresql
+from app.logging_config import get_logger
+from app.models import CirculationEvent, Copy, Hold
+from app.services.availability import adjust_availability, copy_delta
+
+logger = get_logger(__name__)
+
+AVAILABLE = "available"
+LOANED = "loaned"
+RESERVED = "reserved"
+COPY_STATUSES = (AVAILABLE, LOANED, RESERVED)
+
+# Hold statuses: queued, copy set aside, picked up, withdrawn, not picked up
+WAITING = "waiting"
+READY = "ready"
+FULFILLED = "fulfilled"
+CANCELLED = "cancelled"
+EXPIRED = "expired"
+
+# Statements a claim of a copy or hold may take under contention (PostgreSQL)
+CLAIM_ATTEMPTS = 3
+
+# Partitions of circulation_events are kept this many months ahead
+PARTITION_MONTHS_AHEAD = 3
+# Seconds between two runs of ensure_partitions() in a running process
+PARTITION_CHECK_INTERVAL = 24 * 60 * 60
+
+
+class StatusChange(NamedTuple):
+    copy_id: int
+    inventory_number: str
+    book_id: int
+    library_id: int
+    previous_status: str
+    status: str
+    hold_id: Optional[int] = None  # hold the copy was set aside for
+
+
+def _status_update(statuses: Dict[int, str], postgresql: bool):
+    """UPDATE setting each copy (by id) to its own status."""
+    if postgresql:
+        # UPDATE copies SET status = new.status FROM (VALUES (id, status), ...) AS new ...
+        new = values(
+            column("id", Integer), column("status", String), name="new_status"
+        ).data(list(statuses.items()))
+        return update(Copy).where(Copy.id == new.c.id).values(status=new.c.status)
+    # SQLite can't name the columns of a VALUES list: CASE over the ids instead
+    return (
+        update(Copy)
+        .where(Copy.id.in_(list(statuses)))
+        .values(status=case(statuses, value=Copy.id))
+    )
+
+
+async def change_statuses(db: AsyncSession, targets: Dict[str, str]) -> List[StatusChange]:
+    """Set copies, by inventory number, to the target statuses (does not commit).
+
+    Returns the change of every copy found, including those already in
+    the target status; unknown inventory numbers are left out.
+    """
+    if not targets:
+        return []
+    result = await db.execute(
+        select(Copy.id, Copy.inventory_number, Copy.book_id, Copy.library_id, Copy.status)
+        .where(Copy.inventory_number.in_(list(targets)))
+        .order_by(Copy.id)
+        .with_for_update()
+    )
+    changes = await apply_holds(db, [
+        StatusChange(row.id, row.inventory_number, row.book_id, row.library_id,
+                     row.status, targets[row.inventory_number])
+        for row in result
+    ])
+
+    changed = [change for change in changes if change.status != change.previous_status]
+    if changed:
+        await db.execute(_status_update(
+            {change.copy_id: change.status for change in changed}, is_postgresql(db)
+        ))
+        await adjust_availability(db, [
+            delta
+            for change in changed
+            for delta in (
+                copy_delta(change.book_id, change.library_id, change.previous_status, sign=-1),
+                copy_delta(change.book_id, change.library_id, change.status),
+            )
+        ])
+        await record_events(db, changed)
+    return changes
+
+
+async def checkout_copy(db: AsyncSession, book_id: int, library_id: int) -> Optional[StatusChange]:
+    """Lend any available copy of a book at a library (does not commit);
+    None if there is none.
+    """
+    return await claim_copy(db, book_id, library_id, LOANED)
+
+
+async def claim_copy(
+    db: AsyncSession, book_id: int, library_id: Optional[int], status: str
+) -> Optional[StatusChange]:
+    """Move any available copy of a book, at a library or anywhere, to
+    ``status`` (does not commit); None if there is none.
+
+    The copy is claimed by a single UPDATE whose subquery picks it with
+    FOR UPDATE SKIP LOCKED on PostgreSQL: concurrent checkouts of the same
+    book take different copies instead of waiting for each other's row
+    locks. SQLite runs one write at a time, so the same statement (without
+    the locking clause) is atomic there as it is.
+    """
+    candidate = select(Copy.id).where(Copy.book_id == book_id, Copy.status == AVAILABLE)
+    if library_id is not None:
+        candidate = candidate.where(Copy.library_id == library_id)
+    candidate = candidate.order_by(Copy.id).limit(1).with_for_update(skip_locked=True)
+    claim = (
+        update(Copy)
+        .where(Copy.id == candidate.scalar_subquery(), Copy.status == AVAILABLE)
+        .values(status=status)
+        .returning(Copy.id, Copy.inventory_number, Copy.library_id)
+    )
+    row = await _claim(db, claim)
+    if row is None:
+        return None
+
+    change = StatusChange(row.id, row.inventory_number, book_id, row.library_id, AVAILABLE, status)
+    await adjust_availability(db, [
+        copy_delta(book_id, row.library_id, AVAILABLE, sign=-1),
+        copy_delta(book_id, row.library_id, status),
+    ])
+    await record_events(db, [change])
+    return change
+
+
+async def _claim(db: AsyncSession, statement):
+    """Row of an UPDATE ... WHERE id = (SELECT ... LIMIT 1 FOR UPDATE SKIP LOCKED)
+    RETURNING, or None.
+    """
+    # A row changed and committed by another transaction after this
+    # statement's snapshot fails the recheck under the lock, and LIMIT 1
+    # then yields nothing; the next statement takes a fresh snapshot
+    attempts = CLAIM_ATTEMPTS if is_postgresql(db) else 1
+    for _ in range(attempts):
+        row = (await db.execute(statement)).one_or_none()
+        if row is not None:
+            return row
+    return None
+
+
+async def apply_holds(
+    db: AsyncSession, changes: List[StatusChange], held_books: Optional[Set[int]] = None
+) -> List[StatusChange]:
+    """Settle holds of the copies about to change status (does not commit).
+
+    A copy leaving "reserved" ends its ready hold: fulfilled if the copy
+    is lent, expired otherwise. A copy becoming available is set aside
+    ("reserved") for the oldest waiting hold of its book at its library
+    or at any library, if there is one; the returned changes carry the
+    new status and hold id. Call before writing the statuses. Callers
+    that already know which of the books have waiting holds pass them as
+    held_books, which saves a query.
+    """
+    released = {
+        change.copy_id: FULFILLED if change.status == LOANED else EXPIRED
+        for change in changes
+        if change.previous_status == RESERVED and change.status != RESERVED
+    }
+    if released:
+        await db.execute(
+            update(Hold)
+            .where(Hold.copy_id.in_(list(released)), Hold.status == READY)
+            .values(status=case(released, value=Hold.copy_id))
+        )
+
+    returned = [
+        change for change in changes
+        if change.status == AVAILABLE and change.previous_status != AVAILABLE
+    ]
+    if not returned:
+        return changes
+    # Most returns are of books nobody is waiting for: one query finds the others
+    if held_books is None:
+        result = await db.execute(
+            select(Hold.book_id)
+            .where(
+                Hold.book_id.in_({change.book_id for change in returned}),
+                Hold.status == WAITING,
+            )
+            .distinct()
+        )
+        held_books = set(result.scalars())
+    if not held_books:
+        return changes
+
+    assigned: Dict[int, int] = {}
+    for change in returned:
+        if change.book_id not in held_books:
+            continue
+        hold_id = await assign_hold(db, change.copy_id, change.book_id, change.library_id)
+        if hold_id is not None:
+            assigned[change.copy_id] = hold_id
+    return [
+        change._replace(status=RESERVED, hold_id=assigned[change.copy_id])
+        if change.copy_id in assigned else change
+        for change in changes
+    ]
+
+
+async def assign_hold(
+    db: AsyncSession, copy_id: int, book_id: int, library_id: int
+) -> Optional[int]:
+    """Make the oldest waiting hold a copy can serve ready with it (does not
+    commit; the caller sets the copy "reserved"). Returns the hold id, or None.
+
+    Like claim_copy, concurrent returns of the same book take different
+    holds with SKIP LOCKED rather than queueing on the head of the queue.
+    """
+    candidate = (
+        select(Hold.id)
+        .where(
+            Hold.book_id == book_id,
+            Hold.status == WAITING,
+            or_(Hold.library_id == library_id, Hold.library_id.is_(None)),
+        )
+        .order_by(Hold.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    row = await _claim(db, (
+        update(Hold)
+        .where(Hold.id == candidate.scalar_subquery(), Hold.status == WAITING)
+        .values(status=READY, copy_id=copy_id, ready_at=func.now())
+        .returning(Hold.id)
+    ))
+    return row.id if row is not None else None
+
+
+async def requeue_holds(db: AsyncSession, copy_ids) -> list:
+    """Put the ready holds of copies about to be deleted back in their queues
+    (does not commit). ``copy_ids`` is a list or a subquery of copy ids.
+
+    The holds keep their ids, so they return to their old places at the
+    head of the queue; pass the returned (id, book_id, library_id) rows to
+    serve_holds() once the copies are gone.
+    """
+    result = await db.execute(
+        update(Hold)
+        .where(Hold.copy_id.in_(copy_ids), Hold.status == READY)
+        .values(status=WAITING, copy_id=None, ready_at=None)
+        .returning(Hold.id, Hold.book_id, Hold.library_id)
+    )
+    return sorted(result.all(), key=lambda hold: hold.id)
+
+
+async def serve_holds(db: AsyncSession, holds) -> List[StatusChange]:
+    """Set an available copy aside for each of the given waiting holds that
+    has one at its library (does not commit); holds are served in the given
+    order. Returns the changes of the copies claimed.
+    """
+    changes = []
+    for hold in holds:
+        change = await claim_copy(db, hold.book_id, hold.library_id, RESERVED)
+        if change is None:
+            continue
+        await db.execute(
+            update(Hold)
+            .where(Hold.id == hold.id)
+            .values(status=READY, copy_id=change.copy_id, ready_at=func.now())
+        )
+        changes.append(change._replace(hold_id=hold.id))
+    return changes
+
+
+async def hold_new_copies(db: AsyncSession, copies: List[StatusChange]) -> List[StatusChange]:
+    """Set copies just added as "available" aside for waiting holds, as if
+    they were returned (does not commit). ``copies`` describe the inserted
+    copies with previous_status None; the status, availability rollup and
+    history of those given to a hold are written here. Returns their changes.
+    """
+    reserved = [change for change in await apply_holds(db, copies) if change.status == RESERVED]
+    if not reserved:
+        return []
+    await db.execute(
+        update(Copy)
+        .where(Copy.id.in_([change.copy_id for change in reserved]))
+        .values(status=RESERVED)
+    )
+    await adjust_availability(db, [
+        delta
+        for change in reserved
+        for delta in (
+            copy_delta(change.book_id, change.library_id, AVAILABLE, sign=-1),
+            copy_delta(change.book_id, change.library_id, RESERVED),
+        )
+    ])
+    reserved = [change._replace(previous_status=AVAILABLE) for change in reserved]
+    await record_events(db, reserved)
+    return reserved
+
+
+async def expire_holds(db: AsyncSession, pickup_days: int) -> List[StatusChange]:
+    """Expire the ready holds not picked up within ``pickup_days`` (does not
+    commit). Their copies go through change_statuses() as returns, so each
+    goes to the next waiting hold or back on the shelf.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=pickup_days)
+    result = await db.execute(
+        select(Copy.inventory_number)
+        .join(Hold, Hold.copy_id == Copy.id)
+        .where(Hold.status == READY, Hold.ready_at < cutoff)
+    )
+    changes = await change_statuses(db, {number: AVAILABLE for number in result.scalars()})
+    # Ready holds whose copy is gone have nothing to give back
+    await db.execute(
+        update(Hold)
+        .where(Hold.status == READY, Hold.copy_id.is_(None), Hold.ready_at < cutoff)
+        .values(status=EXPIRED)
+    )
+    return changes
+
+
+def hold_position(hold):
+    """Query of the number of waiting holds ahead of a waiting hold in its queue.
+
+    Holds queue by id; the count reads only the entries ahead of this one
+    in the (book_id, status, id) index, not the whole queue. A hold for a
+    library is behind earlier holds for that library or for any library:
+    two range counts over the (book_id, status, library_id, id) index.
+    """
+    def ahead(*conditions):
+        return select(func.count()).select_from(Hold).where(
+            Hold.book_id == hold.book_id,
+            Hold.status == WAITING,
+            *conditions,
+            Hold.id < hold.id,
+        )
+
+    if hold.library_id is None:
+        return ahead()
+    return select(
+        ahead(Hold.library_id == hold.library_id).scalar_subquery()
+        + ahead(Hold.library_id.is_(None)).scalar_subquery()
+    )
+
+
+async def record_events(db: AsyncSession, changes: Iterable[StatusChange]) -> None:
+    """Append status changes to the circulation history in one batch (does not commit)."""
+    await insert_rows(db, CirculationEvent.__table__, [
+        {
+            "copy_id": change.copy_id,
+            "book_id": change.book_id,
+            "library_id": change.library_id,
+            "previous_status": change.previous_status,
+            "status": change.status,
+        }
+        for change in changes
+        if change.status != change.previous_status
+    ])
+
+
+def month_partition_ddl(month: date) -> str:
+    """CREATE TABLE of the circulation_events partition holding a month."""
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS circulation_events_{start:%Y_%m} "
+        f"PARTITION OF circulation_events FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def partition_months(today: date, ahead: int = PARTITION_MONTHS_AHEAD) -> List[date]:
+    """First days of the current month and of the ``ahead`` following ones."""
+    months = [today.replace(day=1)]
+    for _ in range(ahead):
+        months.append((months[-1] + timedelta(days=32)).replace(day=1))
+    return months
+
+
+async def ensure_partitions(conn: AsyncConnection) -> None:
+    """Create the monthly partitions of circulation_events up to
+    PARTITION_MONTHS_AHEAD months ahead (PostgreSQL with the partitioned
+    table of the migration only; warns if the table is a plain one).
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    table = await conn.execute(text(
+        "SELECT to_regclass('circulation_events') IS NOT NULL, EXISTS ("
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('circulation_events'))"
+    ))
+    exists, partitioned = table.one()
+    if not partitioned:
+        if exists:
+            # Created by create_all at startup before `alembic upgrade head` ran
+            logger.warning(
+                "circulation_events is a plain table, not partitioned by month: "
+                "it was created at startup before the migrations ran"
+            )
+        return
+    for month in partition_months(date.today()):
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(month_partition_ddl(month)))
+        except Exception as e:
+            # E.g. rows of that month already landed in the default partition
+            logger.warning(f"Could not create circulation_events partition for {month:%Y-%m}: {e}")
+
+
+async def maintain_partitions(engine: AsyncEngine) -> None:
+    """Run ensure_partitions() every PARTITION_CHECK_INTERVAL seconds until
+    cancelled (a background task of the app, see app.main).
+    """
+    while True:
+        await asyncio.sleep(PARTITION_CHECK_INTERVAL)
+        try:
+            async with engine.begin() as conn:
+                await ensure_partitions(conn)
+        except Exception:
+            logger.exception("Circulation events partition maintenance failed")
@@ -0,0 +1,67 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, encoded as opaque
+URL-safe base64. The next page seeks straight past it with a WHERE
+condition that a matching composite index can serve, so deep pages cost
+the same as the first one (unlike OFFSET).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+# (expression, descending) pairs, the last one must make the order unique
+SortKeys = Sequence[Tuple[ColumnElement, bool]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values of the last row on a page."""
+    payload = json.dumps(
+        list(values), default=_default, ensure_ascii=False, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor.
+
+    Raises ValueError if the cursor is malformed or has the wrong number of keys.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def order_by_keys(keys: SortKeys) -> List[ColumnElement]:
+    return [expr.desc() if descending else expr for expr, descending in keys]
+
+
+def seek_condition(keys: SortKeys, values: Sequence[Any]) -> ColumnElement:
+    """Condition selecting rows strictly after ``values`` in the ``keys`` order."""
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # Uniform direction: a row-value comparison, served directly by a composite index
+        left = tuple_(*[expr for expr, _ in keys])
+        right = tuple_(*values)
+        return left < right if directions.pop() else left > right
+
+    clauses = []
+    for i, (expr, descending) in enumerate(keys):
+        equal = [k == v for (k, _), v in zip(keys[:i], values[:i])]
+        step = expr < values[i] if descending else expr > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
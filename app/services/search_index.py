@@ -0,0 +1,265 @@
+"""Morphological search index: stemmed terms of books in the search_terms table.
+
+Titles, author names and descriptions are split into words and stemmed
+when a book is written (see app.services.stemmer), and search strings are
+stemmed the same way, so "толстого" finds "Толстой" and "войну и мир" finds
+"Война и мир" through a primary key lookup per term instead of a scan.
+Transliteration keys of title and author words are stored alongside, so
+Latin-typed queries ("tolstoy", "ljcnjtdcrbq") take the same path (see
+app.services.transliteration). The weighted length of each book's text is
+kept in search_documents for BM25 ranking.
+
+Every write that changes a book's title, description or author, or an
+author's name, must reindex the affected books in the same transaction.
+"""
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, distinct, false, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import execute_concurrently, insert_rows
+from app.models import Author, Book, SearchDocument, SearchTerm
+from app.services.stemmer import STOPWORDS, stem, tokenize
+from app.services.transliteration import is_latin, layout_to_cyrillic, translit_key
+
+TITLE = "title"
+AUTHOR = "author"
+DESCRIPTION = "description"
+# Transliteration keys of title and author words
+TITLE_TRANSLIT = "title_translit"
+AUTHOR_TRANSLIT = "author_translit"
+
+# Relevance weight of a term occurrence by field
+FIELD_WEIGHTS = {TITLE: 3, TITLE_TRANSLIT: 3, AUTHOR: 2, AUTHOR_TRANSLIT: 2, DESCRIPTION: 1}
+
+MAX_TERM_LENGTH = 100
+
+# Books read and reindexed per statement batch: keeps the IN lists under
+# the bind parameter limit of asyncpg and the rows of a batch in memory
+REINDEX_BATCH_SIZE = 1000
+
+# BM25 term frequency saturation and length normalization strength
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Russian stopwords typed in Latin ("i", "v", "na"...), skipped in Latin queries
+_STOPWORD_KEYS = frozenset(translit_key(word) for word in STOPWORDS)
+
+
+def text_terms(text: Optional[str]) -> Counter:
+    """Stemmed terms of a text with their frequencies."""
+    return Counter(stem(word)[:MAX_TERM_LENGTH] for word in tokenize(text))
+
+
+def translit_terms(text: Optional[str]) -> Counter:
+    """Transliteration keys of the Cyrillic words of a text with their frequencies."""
+    return Counter(
+        translit_key(word)[:MAX_TERM_LENGTH] for word in tokenize(text) if not word.isascii()
+    )
+
+
+def query_terms(text: str) -> List[List[str]]:
+    """Alternative terms for each word of a search string, in order.
+
+    A word of a Latin-typed query matches by its own stem, by its
+    transliteration key, or as Russian typed with the wrong layout.
+    """
+    if not is_latin(text):
+        return [[term] for term in dict.fromkeys(text_terms(text))]
+
+    groups = []
+    for chunk in text.split():
+        words = tokenize(chunk)
+        # Layout is fixed before normalization: ",.;'[]" are letters there
+        layout_words = tokenize(layout_to_cyrillic(chunk))
+        keys = [translit_key(word) for word in words]
+        if not words or not layout_words or _STOPWORD_KEYS.intersection(keys):
+            continue
+        alternatives = [stem(word) for word in words] + keys + [stem(word) for word in layout_words]
+        groups.append([term[:MAX_TERM_LENGTH] for term in dict.fromkeys(alternatives)])
+    return groups
+
+
+def book_term_rows(
+    book_id: int, title: str, author_name: Optional[str], description: Optional[str]
+) -> List[Dict]:
+    fields = (
+        (TITLE, text_terms(title)),
+        (AUTHOR, text_terms(author_name)),
+        (DESCRIPTION, text_terms(description)),
+        (TITLE_TRANSLIT, translit_terms(title)),
+        (AUTHOR_TRANSLIT, translit_terms(author_name)),
+    )
+    return [
+        {"term": term, "book_id": book_id, "field": field, "tf": tf}
+        for field, terms in fields
+        for term, tf in terms.items()
+    ]
+
+
+def document_length(term_rows: List[Dict]) -> int:
+    """Field-weighted number of words of a book (transliteration keys excluded)."""
+    return sum(
+        FIELD_WEIGHTS[row["field"]] * row["tf"]
+        for row in term_rows
+        if row["field"] in (TITLE, AUTHOR, DESCRIPTION)
+    )
+
+
+def _book_texts():
+    return select(Book.id, Book.title, Author.name, Book.description).outerjoin(
+        Author, Book.author_id == Author.id
+    )
+
+
+async def index_books(db: AsyncSession, book_ids: Iterable[int]) -> None:
+    """(Re)build the terms of the given books (does not commit)."""
+    book_ids = list(book_ids)
+    for start in range(0, len(book_ids), REINDEX_BATCH_SIZE):
+        batch = book_ids[start:start + REINDEX_BATCH_SIZE]
+        books = await db.execute(_book_texts().where(Book.id.in_(batch)))
+        await store_book_terms(db, books.tuples().all())
+
+
+async def store_book_terms(
+    db: AsyncSession,
+    books: Sequence[Tuple[int, str, Optional[str], Optional[str]]],
+    replace: bool = True,
+) -> None:
+    """Write the terms of (id, title, author name, description) tuples whose
+    text the caller already has; replace=False skips deleting old terms of
+    books that were just inserted (does not commit).
+    """
+    if not books:
+        return
+    rows = []
+    documents = []
+    for book_id, title, author_name, description in books:
+        book_rows = book_term_rows(book_id, title, author_name, description)
+        rows.extend(book_rows)
+        documents.append({"book_id": book_id, "length": document_length(book_rows)})
+
+    if replace:
+        book_ids = [book[0] for book in books]
+        await db.execute(delete(SearchTerm).where(SearchTerm.book_id.in_(book_ids)))
+        await db.execute(delete(SearchDocument).where(SearchDocument.book_id.in_(book_ids)))
+    await insert_rows(db, SearchTerm.__table__, rows)
+    await insert_rows(db, SearchDocument.__table__, documents)
+
+
+async def index_author_books(db: AsyncSession, author_id: int) -> None:
+    """Reindex the books of an author after a rename (does not commit)."""
+    result = await db.execute(select(Book.id).where(Book.author_id == author_id))
+    await index_books(db, result.scalars().all())
+
+
+async def rebuild_search_index(db: AsyncSession) -> None:
+    """Reindex every book (seeding, repairs; does not commit).
+
+    Books are paged by id, REINDEX_BATCH_SIZE at a time, so neither the
+    statements nor the memory grow with the catalog.
+    """
+    last_id = 0
+    while True:
+        books = await db.execute(
+            _book_texts().where(Book.id > last_id).order_by(Book.id).limit(REINDEX_BATCH_SIZE)
+        )
+        books = books.tuples().all()
+        if not books:
+            break
+        await store_book_terms(db, books)
+        last_id = books[-1][0]
+
+
+def morph_match(groups: Sequence[Sequence[str]], fields: Optional[Sequence[str]] = None):
+    """Subquery (book_id, score) of books matching every group of query_terms()
+    by one of its alternatives, in any of the fields.
+
+    The score sums term frequencies weighted by field. With no groups
+    (e.g. only stopwords were given) nothing matches.
+    """
+    group_of_term = {}
+    for i, alternatives in enumerate(groups):
+        for term in alternatives:
+            group_of_term.setdefault(term, i)
+    if not group_of_term:
+        return select(SearchTerm.book_id, literal(0).label("score")).where(false()).subquery()
+
+    weight = case(FIELD_WEIGHTS, value=SearchTerm.field, else_=1)
+    stmt = select(
+        SearchTerm.book_id,
+        func.sum(SearchTerm.tf * weight).label("score"),
+    ).where(SearchTerm.term.in_(list(group_of_term)))
+    if fields:
+        stmt = stmt.where(SearchTerm.field.in_(fields))
+    matched_group = case(group_of_term, value=SearchTerm.term)
+    return (
+        stmt.group_by(SearchTerm.book_id)
+        .having(func.count(distinct(matched_group)) == len(groups))
+        .subquery()
+    )
+
+
+async def bm25_match(
+    db: AsyncSession, groups: Sequence[Sequence[str]], fields: Optional[Sequence[str]] = None
+):
+    """Like morph_match, scored by Okapi BM25 over field-weighted term frequencies.
+
+    Collection statistics (number of books, average length, document
+    frequency of each query term) are read first by two small indexed
+    queries; the per-book score is then computed, ordered and paged in SQL.
+    """
+    group_of_term = {}
+    for i, alternatives in enumerate(groups):
+        for term in alternatives:
+            group_of_term.setdefault(term, i)
+    if not group_of_term:
+        return select(SearchTerm.book_id, literal(0.0).label("score")).where(false()).subquery()
+
+    frequency_stmt = (
+        select(SearchTerm.term, func.count(distinct(SearchTerm.book_id)))
+        .where(SearchTerm.term.in_(list(group_of_term)))
+        .group_by(SearchTerm.term)
+    )
+    if fields:
+        frequency_stmt = frequency_stmt.where(SearchTerm.field.in_(fields))
+    totals, frequencies = await execute_concurrently(
+        db,
+        select(func.count(), func.avg(SearchDocument.length)),
+        frequency_stmt,
+    )
+    documents, average_length = totals.one()
+    average_length = float(average_length or 0) or 1.0
+    idf = {
+        term: math.log(1 + (documents - df + 0.5) / (df + 0.5))
+        for term, df in frequencies
+    }
+    if not idf:
+        return select(SearchTerm.book_id, literal(0.0).label("score")).where(false()).subquery()
+
+    weight = case(FIELD_WEIGHTS, value=SearchTerm.field, else_=1)
+    weighted = select(
+        SearchTerm.book_id,
+        SearchTerm.term,
+        func.sum(SearchTerm.tf * weight).label("tf"),
+    ).where(SearchTerm.term.in_(list(idf)))
+    if fields:
+        weighted = weighted.where(SearchTerm.field.in_(fields))
+    weighted = weighted.group_by(SearchTerm.book_id, SearchTerm.term).subquery()
+
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * SearchDocument.length / average_length)
+    term_score = (
+        case(idf, value=weighted.c.term, else_=0.0)
+        * weighted.c.tf * (BM25_K1 + 1)
+        / (weighted.c.tf + length_norm)
+    )
+    matched_group = case(group_of_term, value=weighted.c.term)
+    return (
+        select(weighted.c.book_id, func.sum(term_score).label("score"))
+        .join(SearchDocument, SearchDocument.book_id == weighted.c.book_id)
+        .group_by(weighted.c.book_id)
+        .having(func.count(distinct(matched_group)) == len(groups))
+        .subquery()
+    )
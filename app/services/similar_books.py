@@ -0,0 +1,238 @@
+"""In-memory "similar books" index: cosine similarity of TF-IDF vectors.
+
+Each book is a sparse vector of hashed features (stemmed words of the
+title, author name and description, weighted by field like the search
+index). The vectors are stored as a NumPy column-compressed matrix, so
+the similarities of one book to all the others are a handful of array
+operations over the postings of its own features, without touching the
+database.
+
+Feature counts are kept per book and updated by the write endpoints in
+app.routers.books and app.routers.authors. The matrix is rebuilt from them
+in a worker thread REBUILD_DELAY seconds after a change (later changes of
+the same burst join that rebuild); lookups keep using the previous matrix
+until the new one is swapped in, so a write never makes a request wait
+for the rebuild. Built once at startup (see app.main); each worker process
+holds its own copy.
+"""
+import asyncio
+import zlib
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.logging_config import get_logger
+from app.models import Author, Book
+from app.services.search_index import AUTHOR, DESCRIPTION, FIELD_WEIGHTS, TITLE, text_terms
+
+logger = get_logger(__name__)
+
+# Features are hashed into 2**HASH_BITS columns
+HASH_BITS = 20
+_HASH_MASK = (1 << HASH_BITS) - 1
+
+# Seconds between a change and the rebuild of the matrix
+REBUILD_DELAY = 1.0
+
+
+def _feature(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) & _HASH_MASK
+
+
+def book_features(title: str, author_name: Optional[str], description: Optional[str]) -> Counter:
+    """Field-weighted counts of the hashed terms of a book."""
+    features: Counter = Counter()
+    for field, text in ((TITLE, title), (AUTHOR, author_name), (DESCRIPTION, description)):
+        for term, tf in text_terms(text).items():
+            features[_feature(term)] += FIELD_WEIGHTS[field] * tf
+    return features
+
+
+class Matrix(NamedTuple):
+    """Normalized TF-IDF vectors: book ids by row, CSR and CSC arrays."""
+    ids: np.ndarray
+    row_of: Dict[int, int]
+    row_ptr: np.ndarray
+    row_cols: np.ndarray
+    row_weights: np.ndarray
+    col_ptr: np.ndarray
+    col_rows: np.ndarray
+    col_weights: np.ndarray
+
+
+def build_matrix(book_features: Dict[int, Counter]) -> Matrix:
+    """Assemble the matrix from the feature counts of each book."""
+    ids = np.fromiter(book_features, dtype=np.int64, count=len(book_features))
+    sizes = np.fromiter(
+        (len(features) for features in book_features.values()), dtype=np.int64, count=len(ids)
+    )
+    rows = np.repeat(np.arange(len(ids)), sizes)
+    hashed = np.fromiter(
+        (f for features in book_features.values() for f in features),
+        dtype=np.int64, count=int(sizes.sum()),
+    )
+    counts = np.fromiter(
+        (c for features in book_features.values() for c in features.values()),
+        dtype=np.float64, count=len(hashed),
+    )
+
+    # Compact column numbers of the features in use, with document frequencies
+    features, cols, df = np.unique(hashed, return_inverse=True, return_counts=True)
+    idf = np.log((1 + len(ids)) / (1 + df)) + 1
+    weights = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(ids)))
+    weights = (weights / np.where(norms > 0, norms, 1)[rows]).astype(np.float32)
+
+    # Rows are already grouped (entries were generated book by book)
+    by_col = np.argsort(cols, kind="stable")
+    return Matrix(
+        ids=ids,
+        row_of={int(book_id): i for i, book_id in enumerate(ids)},
+        row_ptr=np.concatenate(([0], np.cumsum(sizes))),
+        row_cols=cols,
+        row_weights=weights,
+        col_ptr=np.concatenate(([0], np.cumsum(np.bincount(cols, minlength=len(features))))),
+        col_rows=rows[by_col],
+        col_weights=weights[by_col],
+    )
+
+
+class SimilarBooksIndex:
+    """TF-IDF vectors of the books with top-k cosine similarity lookups."""
+
+    def __init__(self):
+        self._features: Dict[int, Counter] = {}
+        # Sources, so that an author rename can recompute their books
+        self._books: Dict[int, Tuple[str, Optional[int], Optional[str]]] = {}
+        self._authors: Dict[int, str] = {}
+        self._matrix = build_matrix({})
+        # Bumped whenever a new matrix is swapped in, part of the response cache key
+        self.version = 0
+        self._dirty = False
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self._features
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from the database."""
+        self.__init__()
+        authors = await db.execute(select(Author.id, Author.name))
+        for row in authors:
+            self._authors[row.id] = row.name
+        books = await db.execute(select(Book.id, Book.title, Book.author_id, Book.description))
+        for row in books:
+            self._set_book(row.id, row.title, row.author_id, row.description)
+        features = dict(self._features)
+        self._matrix = await asyncio.get_running_loop().run_in_executor(
+            None, build_matrix, features
+        )
+
+    def add_book(
+        self, book_id: int, title: str, author_id: Optional[int], description: Optional[str]
+    ) -> None:
+        """Add a new book or apply a change of its title, author or description."""
+        self._set_book(book_id, title, author_id, description)
+        self._changed()
+
+    def _set_book(
+        self, book_id: int, title: str, author_id: Optional[int], description: Optional[str]
+    ) -> None:
+        self._books[book_id] = (title, author_id, description)
+        self._features[book_id] = book_features(title, self._authors.get(author_id), description)
+
+    def add_author(self, author_id: int, name: str) -> None:
+        """Add a new author or apply a rename."""
+        if self._authors.get(author_id) == name:
+            return
+        self._authors[author_id] = name
+        for book_id, (title, book_author_id, description) in list(self._books.items()):
+            if book_author_id == author_id:
+                self.add_book(book_id, title, author_id, description)
+
+    def remove_book(self, book_id: int) -> None:
+        if self._features.pop(book_id, None) is not None:
+            del self._books[book_id]
+            self._changed()
+
+    def remove_author(self, author_id: int) -> None:
+        """Remove an author together with their books (deleted by cascade)."""
+        for book_id in [b for b, (_, a, _) in self._books.items() if a == author_id]:
+            self.remove_book(book_id)
+        self._authors.pop(author_id, None)
+
+    def _changed(self) -> None:
+        """Schedule a rebuild of the matrix, unless one is already due."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop (scripts): rebuild() is called explicitly
+        task = self._rebuild_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._rebuild_task = loop.create_task(self._rebuild_later())
+
+    async def _rebuild_later(self) -> None:
+        await asyncio.sleep(REBUILD_DELAY)
+        loop = asyncio.get_running_loop()
+        # Changes made while a matrix is being built are picked up by the next round
+        while self._dirty:
+            self._dirty = False
+            features = dict(self._features)
+            try:
+                matrix = await loop.run_in_executor(None, build_matrix, features)
+            except Exception:
+                logger.exception("Similar books matrix rebuild failed")
+                return
+            self._matrix = matrix
+            self.version += 1
+
+    def rebuild(self) -> None:
+        """Rebuild the matrix now, in the calling thread."""
+        self._dirty = False
+        self._matrix = build_matrix(dict(self._features))
+        self.version += 1
+
+    async def wait_for_rebuild(self) -> None:
+        """Wait until a scheduled rebuild has swapped its matrix in."""
+        task = self._rebuild_task
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.shield(task)
+
+    def similar(self, book_id: int, limit: int = 5) -> List[Tuple[int, float]]:
+        """Up to ``limit`` (book id, cosine similarity) pairs, most similar
+        first; books sharing no feature with the given one are left out.
+        """
+        matrix = self._matrix
+        row = matrix.row_of.get(book_id)
+        if row is None:
+            return []
+
+        start, end = matrix.row_ptr[row], matrix.row_ptr[row + 1]
+        cols = matrix.row_cols[start:end]
+        # Postings of the book's features: ranges of the CSC arrays, gathered at once
+        lengths = matrix.col_ptr[cols + 1] - matrix.col_ptr[cols]
+        offsets = np.repeat(matrix.col_ptr[cols] - np.cumsum(lengths) + lengths, lengths)
+        postings = offsets + np.arange(lengths.sum())
+        contributions = (
+            matrix.col_weights[postings] * np.repeat(matrix.row_weights[start:end], lengths)
+        )
+        scores = np.bincount(
+            matrix.col_rows[postings], weights=contributions, minlength=len(matrix.ids)
+        )
+        scores[row] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.lexsort((matrix.ids[candidates], -scores[candidates]))]
+        return [(int(matrix.ids[i]), float(scores[i])) for i in candidates]
+
+
+similar_books = SimilarBooksIndex()
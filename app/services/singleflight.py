@@ -0,0 +1,67 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+When several requests with the same key arrive while the first one is
+still querying the database, the later ones await the first one's result
+instead of running the same queries again. Keys are the response cache
+keys, whose first element is the endpoint name; counters are kept per
+endpoint.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._executed: Dict[str, int] = defaultdict(int)
+        self._collapsed: Dict[str, int] = defaultdict(int)
+
+    async def run(self, key: Tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with identical calls made while it runs.
+
+        Exceptions are shared too. If the request running fn is cancelled
+        (client gone), a waiting request runs its own fn instead.
+        """
+        endpoint = str(key[0])
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self._collapsed[endpoint] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._executed[endpoint] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: no warning when nobody waited
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            endpoint: {
+                "executed": self._executed[endpoint],
+                "collapsed": self._collapsed[endpoint],
+            }
+            for endpoint in sorted(set(self._executed) | set(self._collapsed))
+        }
+
+
+request_flights = SingleFlight()
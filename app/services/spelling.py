@@ -0,0 +1,152 @@
+"""Spelling corrections ("did you mean") from the catalog vocabulary.
+
+Words of book titles and author names are kept in a symmetric-delete
+dictionary (SymSpell): every word is stored under all strings obtained by
+deleting up to MAX_EDIT_DISTANCE characters from its prefix. A misspelled
+word generates its own deletes, and any shared delete yields a candidate,
+so a lookup touches a few dozen hash buckets however large the vocabulary.
+
+Built at startup (see app.main) and kept up to date by the write endpoints
+in app.routers.books and app.routers.authors, like the autocomplete index.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Author, Book, normalize_text
+
+MAX_EDIT_DISTANCE = 2
+# Deletes are generated from this many leading characters only
+PREFIX_LENGTH = 7
+# Shorter words are never corrected, up to this length only one edit away
+MIN_WORD_LENGTH = 3
+SHORT_WORD_LENGTH = 5
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """The word's prefix with up to ``distance`` characters deleted."""
+    result = {word[:PREFIX_LENGTH]}
+    frontier = set(result)
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions); any value above ``limit`` is returned as limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SpellingDictionary:
+    """Word frequencies of titles and names with a symmetric-delete lookup."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._deletes: Dict[str, Set[str]] = {}
+        # Words contributed by each title / name: (kind, id) -> words
+        self._sources: Dict[Tuple[str, int], List[str]] = {}
+        self._book_authors: Dict[int, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the dictionary from the database."""
+        self.__init__()
+        books = await db.execute(select(Book.id, Book.title, Book.author_id))
+        for row in books:
+            self.add_book(row.id, row.title, row.author_id)
+        authors = await db.execute(select(Author.id, Author.name))
+        for row in authors:
+            self.add_author(row.id, row.name)
+
+    def add_book(self, book_id: int, title: str, author_id: Optional[int]) -> None:
+        """Add a new book or apply a rename."""
+        self._set_source(("book", book_id), title)
+        self._book_authors[book_id] = author_id
+
+    def add_author(self, author_id: int, name: str) -> None:
+        """Add a new author or apply a rename."""
+        self._set_source(("author", author_id), name)
+
+    def remove_book(self, book_id: int) -> None:
+        self._set_source(("book", book_id), None)
+        self._book_authors.pop(book_id, None)
+
+    def remove_author(self, author_id: int) -> None:
+        """Remove an author together with their books (deleted by cascade)."""
+        for book_id in [b for b, a in self._book_authors.items() if a == author_id]:
+            self.remove_book(book_id)
+        self._set_source(("author", author_id), None)
+
+    def _set_source(self, source: Tuple[str, int], text: Optional[str]) -> None:
+        for word in self._sources.pop(source, ()):
+            self._counts[word] -= 1
+            if self._counts[word] <= 0:
+                del self._counts[word]
+                for delete in _deletes(word, MAX_EDIT_DISTANCE):
+                    words = self._deletes.get(delete)
+                    if words is not None:
+                        words.discard(word)
+                        if not words:
+                            del self._deletes[delete]
+        if text is None:
+            return
+        words = normalize_text(text).split()
+        self._sources[source] = words
+        for word in words:
+            if word not in self._counts:
+                for delete in _deletes(word, MAX_EDIT_DISTANCE):
+                    self._deletes.setdefault(delete, set()).add(word)
+            self._counts[word] += 1
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Closest, then most frequent, catalog word; None if there is none."""
+        if word in self._counts:
+            return word
+        if len(word) < MIN_WORD_LENGTH:
+            return None
+        limit = 1 if len(word) <= SHORT_WORD_LENGTH else MAX_EDIT_DISTANCE
+
+        candidates: Set[str] = set()
+        for delete in _deletes(word, limit):
+            candidates |= self._deletes.get(delete, set())
+
+        best = None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit:
+                key = (distance, -self._counts[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        return best[2] if best else None
+
+    def correct(self, query: str) -> Optional[str]:
+        """The query with unknown words replaced by their corrections,
+        or None if nothing was corrected.
+        """
+        words = normalize_text(query).split()
+        corrected = [self.lookup(word) or word for word in words]
+        if corrected == words:
+            return None
+        return " ".join(corrected)
+
+
+spelling_dictionary = SpellingDictionary()
@@ -0,0 +1,259 @@
+"""Pure-Python stemmers for the morphological search index.
+
+Russian words go through the Snowball Russian stemmer, Latin words through
+the Porter stemmer, so "толстого", "войну" and "преступлением" index as
+"толст", "войн" and "преступлен" just like "Толстой", "Война" and
+"Преступление". Words are expected in normalize_text() form (lowercase,
+ё folded to е); numbers and other scripts are kept as they are.
+"""
+import re
+from typing import List, Optional
+
+from app.models import normalize_text
+
+# Function words dropped from both the index and queries
+STOPWORDS = frozenset("""
+    и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по
+    ее мне было вот от меня еще нет о об из ему когда ли если уже или ни быть был до
+    вас ведь там для мы тебя их чем была сам без под будет кто этот того этого
+    a an and are as at be by for from in is it of on or the to with
+""".split())
+
+_CYRILLIC_RE = re.compile(r"[а-я]")
+_LATIN_RE = re.compile(r"^[a-z]+$")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Words of a text in normalized form, stopwords removed."""
+    return [word for word in normalize_text(text).split() if word not in STOPWORDS]
+
+
+def stem(word: str) -> str:
+    """Stem of a normalized word: Russian, English, or the word itself."""
+    if _CYRILLIC_RE.search(word):
+        return russian_stem(word)
+    if _LATIN_RE.match(word):
+        return english_stem(word)
+    return word
+
+
+# --- Russian (Snowball) ---
+
+_RU_VOWELS = "аеиоуыэюя"
+
+# Endings of each class; "after а/я" endings only count when preceded by а or я
+_PERFECTIVE_GERUND = (("в", "вши", "вшись"), ("ив", "ивши", "ившись", "ыв", "ывши", "ывшись"))
+_ADJECTIVE = ((), (
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "его", "ого", "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+))
+_PARTICIPLE = (("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+_REFLEXIVE = ((), ("ся", "сь"))
+_VERB = (
+    ("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть",
+     "ешь", "нно"),
+    ("ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им",
+     "ым", "ен", "ило", "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть",
+     "ишь", "ую", "ю"),
+)
+_NOUN = ((), (
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией", "ей", "ой",
+    "ий", "й", "иям", "ям", "ием", "ем", "ам", "ом", "о", "у", "ах", "иях", "ях", "ы", "ь",
+    "ию", "ью", "ю", "ия", "ья", "я",
+))
+_DERIVATIONAL = ("ость", "ост")
+
+
+def _ru_regions(word: str):
+    """Start indexes of the RV and R2 regions."""
+    rv = r1 = r2 = len(word)
+    for i, ch in enumerate(word):
+        if ch in _RU_VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip_ending(word: str, rv: int, endings) -> Optional[str]:
+    """Remove the longest ending of the class found in RV, or return None.
+
+    As in Snowball, only the longest match is tried: if it is an "after а/я"
+    ending not preceded by а or я the class doesn't match.
+    """
+    after_a, plain = endings
+    best = None
+    for group, requires_a in ((after_a, True), (plain, False)):
+        for ending in group:
+            if word.endswith(ending) and len(word) - len(ending) >= rv:
+                if best is None or len(ending) > len(best[0]):
+                    best = (ending, requires_a)
+    if best is None:
+        return None
+    ending, requires_a = best
+    start = len(word) - len(ending)
+    if requires_a and not (start - 1 >= rv and word[start - 1] in "ая"):
+        return None
+    return word[:start]
+
+
+def russian_stem(word: str) -> str:
+    rv, r2 = _ru_regions(word)
+
+    # Step 1
+    stripped = _strip_ending(word, rv, _PERFECTIVE_GERUND)
+    if stripped is not None:
+        word = stripped
+    else:
+        word = _strip_ending(word, rv, _REFLEXIVE) or word
+        stripped = _strip_ending(word, rv, _ADJECTIVE)
+        if stripped is not None:
+            word = _strip_ending(stripped, rv, _PARTICIPLE) or stripped
+        else:
+            stripped = _strip_ending(word, rv, _VERB)
+            if stripped is None:
+                stripped = _strip_ending(word, rv, _NOUN)
+            if stripped is not None:
+                word = stripped
+
+    # Step 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Step 3
+    for ending in _DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= max(rv, r2):
+            word = word[:-len(ending)]
+            break
+        if word.endswith(ending):
+            break
+
+    # Step 4
+    for ending in ("ейше", "ейш"):
+        if word.endswith(ending) and len(word) - len(ending) >= rv:
+            word = word[:-len(ending)]
+            break
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    elif word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+# --- English (Porter) ---
+
+def _is_consonant(word: str, i: int) -> bool:
+    ch = word[i]
+    if ch in "aeiou":
+        return False
+    if ch == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem: str) -> int:
+    """Number of vowel-consonant sequences (Porter's m)."""
+    pattern = "".join("c" if _is_consonant(stem, i) else "v" for i in range(len(stem)))
+    return len(re.findall(r"v+c+", pattern))
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _cvc(word: str) -> bool:
+    return (
+        len(word) >= 3
+        and _is_consonant(word, len(word) - 3)
+        and not _is_consonant(word, len(word) - 2)
+        and _is_consonant(word, len(word) - 1)
+        and word[-1] not in "wxy"
+    )
+
+
+def _replace(word: str, rules, min_measure: int) -> str:
+    """Apply the rule of the longest matching suffix if its stem has m > min_measure."""
+    for suffix, replacement in sorted(rules, key=lambda rule: -len(rule[0])):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+
+_STEP2 = (
+    ("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"),
+    ("bli", "ble"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"),
+    ("ization", "ize"), ("ation", "ate"), ("ator", "ate"), ("alism", "al"), ("iveness", "ive"),
+    ("fulness", "ful"), ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble"),
+    ("logi", "log"),
+)
+_STEP3 = (
+    ("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"),
+    ("ful", ""), ("ness", ""),
+)
+_STEP4 = tuple((suffix, "") for suffix in (
+    "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent", "ion",
+    "ou", "ism", "ate", "iti", "ous", "ive", "ize",
+))
+
+
+def english_stem(word: str) -> str:
+    if len(word) <= 2:
+        return word
+
+    # Step 1a
+    if word.endswith("sses") or word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+
+    # Step 1b
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _cvc(word):
+                    word += "e"
+                break
+
+    # Step 1c
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+
+    word = _replace(word, _STEP2, 0)
+    word = _replace(word, _STEP3, 0)
+
+    # Step 4 ("ion" only after s or t)
+    for suffix, _ in sorted(_STEP4, key=lambda rule: -len(rule[0])):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            if _measure(stem) > 1 and (suffix != "ion" or stem.endswith(("s", "t"))):
+                word = stem
+            break
+
+    # Step 5
+    if word.endswith("e"):
+        stem = word[:-1]
+        if _measure(stem) > 1 or (_measure(stem) == 1 and not _cvc(stem)):
+            word = stem
+    if _measure(word) > 1 and _double_consonant(word) and word.endswith("l"):
+        word = word[:-1]
+    return word
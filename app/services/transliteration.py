@@ -0,0 +1,65 @@
+"""Latin-typed queries against the Cyrillic catalog.
+
+Two kinds of Latin input are handled:
+
+* transliteration ("tolstoy", "dostoevskij", "chekhov"): Cyrillic words
+  and Latin queries are both reduced to a loose Latin key, in which the
+  usual spelling variants coincide (й/y/j/i, х/kh/h, ц/ts/tz, doubled
+  letters...): "толстой", "tolstoy" and "tolstoj" all give "tolstoi";
+* wrong keyboard layout ("ljcnjtdcrbq"): the keys are mapped back to
+  the ЙЦУКЕН letters at the same positions ("достоевский").
+
+Keys of catalog words are stored in the search index (see
+app.services.search_index) and in the autocomplete index.
+"""
+import re
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "c",
+    "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "iu",
+    "я": "ia",
+}
+
+# Spelling variants of Latin transliterations, applied in order
+_LATIN_REDUCTIONS = (
+    (re.compile(r"shch|sch"), "sh"),
+    (re.compile(r"tch"), "ch"),
+    (re.compile(r"kh"), "h"),
+    (re.compile(r"ts|tz"), "c"),
+    (re.compile(r"ck|q"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"[yj]"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+    # Iotation between vowels: "dostoyevsky" / "dostoevsky"
+    (re.compile(r"(?<=[aeou])i(?=[aeou])"), ""),
+)
+
+_QWERTY = "qwertyuiop[]asdfghjkl;'zxcvbnm,.`"
+_JCUKEN = "йцукенгшщзхъфывапролджэячсмитьбюё"
+_LAYOUT_TO_CYRILLIC = str.maketrans(_QWERTY, _JCUKEN)
+
+_CYRILLIC_RE = re.compile(r"[а-яё]")
+_LATIN_RE = re.compile(r"[a-z]")
+
+
+def is_latin(text: str) -> bool:
+    """Latin letters and no Cyrillic: a candidate for transliteration and layout fixes."""
+    text = text.lower()
+    return bool(_LATIN_RE.search(text)) and not _CYRILLIC_RE.search(text)
+
+
+def translit_key(word: str) -> str:
+    """Loose Latin key of a Cyrillic or Latin word (lowercase input)."""
+    latin = "".join(_CYRILLIC_TO_LATIN.get(ch, ch) for ch in word)
+    for pattern, replacement in _LATIN_REDUCTIONS:
+        latin = pattern.sub(replacement, latin)
+    return latin
+
+
+def layout_to_cyrillic(text: str) -> str:
+    """Text as typed with the Russian layout active (QWERTY key -> ЙЦУКЕН letter)."""
+    return text.lower().translate(_LAYOUT_TO_CYRILLIC)
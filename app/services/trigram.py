@@ -0,0 +1,68 @@
+"""In-process trigram scoring compatible with PostgreSQL pg_trgm.
+
+Used as the SQLite fallback for fuzzy search: the functions are registered
+on every SQLite connection under the same names as their pg_trgm
+counterparts, so the same queries run in dev and in production.
+"""
+import re
+from typing import List, Optional
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def trigram_sequence(text: Optional[str]) -> List[str]:
+    """Return trigrams of every word in order, padded the way pg_trgm pads them."""
+    if not text:
+        return []
+    trigrams = []
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        trigrams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Share of trigrams two strings have in common (pg_trgm ``similarity``)."""
+    first = set(trigram_sequence(a))
+    second = set(trigram_sequence(b))
+    if not first or not second:
+        return 0.0
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+
+def word_similarity(needle: Optional[str], haystack: Optional[str]) -> float:
+    """Greatest similarity between ``needle`` and a continuous extent of ``haystack``.
+
+    Mirrors pg_trgm ``word_similarity``: a fragment such as "достоев" scores
+    high against "Федор Достоевский" because only the matching extent counts.
+    """
+    wanted = set(trigram_sequence(needle))
+    if not wanted:
+        return 0.0
+    sequence = trigram_sequence(haystack)
+
+    best = 0.0
+    for start, trigram in enumerate(sequence):
+        if trigram not in wanted:
+            continue
+        seen = set()
+        common = extra = 0
+        for current in sequence[start:]:
+            if current not in seen:
+                seen.add(current)
+                if current in wanted:
+                    common += 1
+                else:
+                    extra += 1
+            if current in wanted:
+                best = max(best, common / (len(wanted) + extra))
+        if best == 1.0:
+            break
+    return best
+
+
+def register_sqlite_functions(dbapi_connection) -> None:
+    """Expose the scorers to SQL on a SQLite connection."""
+    dbapi_connection.create_function("similarity", 2, similarity, deterministic=True)
+    dbapi_connection.create_function("word_similarity", 2, word_similarity, deterministic=True)
@@ -0,0 +1,108 @@
+"""
+Benchmark of the write endpoints: SQL statements and latency per request.
+Run: python scripts/bench_writes.py [iterations]
+
+Runs the app in-process against DATABASE_URL, a throwaway SQLite database
+by default (never point it at production: it creates and deletes rows).
+Statements are counted with a cursor execute hook, so the numbers are
+database round trips per request, commit not included.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.append('.')
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "bench-" + "x" * 40)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import StaffUser
+from app.routers.auth import get_current_active_staff
+
+statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+async def main(iterations: int):
+    app.dependency_overrides[get_current_active_staff] = lambda: StaffUser(id=1, username="bench")
+    results = defaultdict(list)
+
+    async def measure(name, request):
+        global statements
+        statements = 0
+        started = time.perf_counter()
+        response = await request
+        elapsed = (time.perf_counter() - started) * 1000
+        assert response.status_code < 300, (name, response.status_code, response.text)
+        results[name].append((statements, elapsed))
+        return response
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            run = f"{time.time_ns()}"
+            for i in range(iterations):
+                tag = f"{run}-{i}"
+                library = (await measure(
+                    "create_library", c.post("/api/v1/libraries", json={"name": f"Bench {tag}"})
+                )).json()
+                await measure(
+                    "update_library",
+                    c.put(f"/api/v1/libraries/{library['id']}", json={"phone": "123"}),
+                )
+                author = (await measure(
+                    "create_author", c.post("/api/v1/authors", json={"name": f"Автор {tag}"})
+                )).json()
+                await measure(
+                    "update_author",
+                    c.put(f"/api/v1/authors/{author['id']}", json={"name": f"Автор {tag}!"}),
+                )
+                book = (await measure("create_book", c.post("/api/v1/books", json={
+                    "title": f"Книга {tag}", "author_id": author["id"], "description": "Роман",
+                }))).json()
+                await measure(
+                    "update_book",
+                    c.put(f"/api/v1/books/{book['id']}", json={"title": f"Книга {tag}!"}),
+                )
+                copy = (await measure("create_copy", c.post(
+                    f"/api/v1/books/{book['id']}/copies",
+                    json={"library_id": library["id"], "inventory_number": f"B-{tag}"},
+                ))).json()
+                await measure(
+                    "update_copy",
+                    c.put(f"/api/v1/books/copies/{copy['id']}", json={"status": "loaned"}),
+                )
+                await measure("delete_copy", c.delete(f"/api/v1/books/copies/{copy['id']}"))
+                await measure("delete_book", c.delete(f"/api/v1/books/{book['id']}"))
+                await measure("delete_author", c.delete(f"/api/v1/authors/{author['id']}"))
+                await measure("delete_library", c.delete(f"/api/v1/libraries/{library['id']}"))
+
+    print(f"{'endpoint':<16}{'statements':>12}{'avg ms':>10}{'p95 ms':>10}")
+    for name, samples in results.items():
+        counts = [count for count, _ in samples]
+        times = sorted(elapsed for _, elapsed in samples)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        print(
+            f"{name:<16}{sum(counts) / len(counts):>12.1f}"
+            f"{sum(times) / len(times):>10.2f}{p95:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
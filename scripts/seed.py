@@ -1,6 +1,9 @@
 """
 Seed script to populate database with test data.
 Run: python scripts/seed.py
+
+After migrations that change the search terms, reindex the existing books:
+python scripts/seed.py rebuild_search_index
 """
 import asyncio
 import sys
@@ -9,6 +12,8 @@ sys.path.append('.')
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import AsyncSessionLocal, engine
 from app.models import Author, Library, Book, Copy, StaffUser
+from app.services.availability import rebuild_availability
+from app.services.search_index import rebuild_search_index
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -103,12 +108,13 @@ async def seed_books(session: AsyncSession, authors: list):
             author_id=authors[author_idx].id,
             isbn=isbn,
             year=year,
-            description=description,
-            search_vector=f"{title} {authors[author_idx].name}"  # Simple search vector
+            description=description
         )
         session.add(book)
         books.append(book)
     
+    await session.flush()
+    await rebuild_search_index(session)
     await session.commit()
     print(f"✓ Created {len(books)} books")
     return books
@@ -134,6 +140,8 @@ async def seed_copies(session: AsyncSession, books: list, libraries: list):
             copies.append(copy)
             copy_num += 1
     
+    await session.flush()
+    await rebuild_availability(session)
     await session.commit()
     print(f"✓ Created {len(copies)} book copies")
     return copies
@@ -189,5 +197,18 @@ async def seed_all():
             raise
 
 
+async def reindex():
+    """Rebuild the search terms of every book."""
+    async with AsyncSessionLocal() as session:
+        await rebuild_search_index(session)
+        await session.commit()
+    print("✓ Search index rebuilt")
+
+
+COMMANDS = {"rebuild_search_index": reindex}
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_all())
+    if len(sys.argv) > 1 and sys.argv[1] not in COMMANDS:
+        sys.exit(f"Unknown command: {sys.argv[1]} (available: {', '.join(COMMANDS)})")
+    asyncio.run(COMMANDS[sys.argv[1]]() if len(sys.argv) > 1 else seed_all())
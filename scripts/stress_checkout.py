@@ -0,0 +1,101 @@
+"""
+Concurrency stress test of POST /api/v1/circulation/checkout.
+Run: python scripts/stress_checkout.py [copies] [desks] [rounds]
+
+Runs the app in-process against DATABASE_URL, a throwaway SQLite database
+by default (never point it at production: it creates and lends copies).
+Each round adds a book with ``copies`` available copies at one library and
+fires ``desks`` concurrent checkouts of it. Every copy must be lent exactly
+once, the other checkouts must get 409, and the availability rollup must
+match the copies. Against PostgreSQL this exercises FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.append('.')
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "stress-" + "x" * 40)
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import BookAvailability, Copy, StaffUser
+from app.routers.auth import get_current_active_staff
+
+
+async def main(copies: int, desks: int, rounds: int):
+    app.dependency_overrides[get_current_active_staff] = lambda: StaffUser(id=1, username="stress")
+    failures = 0
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stress") as c:
+            run = f"{time.time_ns()}"
+            library = (await c.post("/api/v1/libraries", json={"name": f"Stress {run}"})).json()
+            author = (await c.post("/api/v1/authors", json={"name": f"Автор {run}"})).json()
+
+            for i in range(rounds):
+                book = (await c.post("/api/v1/books", json={
+                    "title": f"Книга {run}-{i}", "author_id": author["id"],
+                })).json()
+                response = await c.post(f"/api/v1/books/{book['id']}/copies/bulk", json={
+                    "library_id": library["id"], "inventory_range": f"S-{run}-{i}-{{1..{copies}}}",
+                })
+                assert response.status_code == 201, response.text
+
+                started = time.perf_counter()
+                responses = await asyncio.gather(*(
+                    c.post("/api/v1/circulation/checkout", json={
+                        "book_id": book["id"], "library_id": library["id"],
+                    })
+                    for _ in range(desks)
+                ))
+                elapsed = (time.perf_counter() - started) * 1000
+
+                codes = Counter(r.status_code for r in responses)
+                lent = Counter(r.json()["copy_id"] for r in responses if r.status_code == 200)
+                async with AsyncSessionLocal() as db:
+                    statuses = Counter((await db.execute(
+                        select(Copy.status).where(Copy.book_id == book["id"])
+                    )).scalars())
+                    rollup = (await db.execute(
+                        select(func.sum(BookAvailability.available_count))
+                        .where(BookAvailability.book_id == book["id"])
+                    )).scalar_one()
+
+                expected_lent = min(copies, desks)
+                problems = []
+                if codes[200] != expected_lent or codes[409] != desks - expected_lent:
+                    problems.append(f"status codes {dict(codes)}")
+                if any(count > 1 for count in lent.values()):
+                    problems.append(f"copies lent twice: {[c for c, n in lent.items() if n > 1]}")
+                if statuses["loaned"] != expected_lent:
+                    problems.append(f"copy statuses {dict(statuses)}")
+                if rollup != copies - expected_lent:
+                    problems.append(f"rollup available_count {rollup}")
+                failures += bool(problems)
+
+                print(
+                    f"round {i + 1}: {codes[200]} lent, {codes[409]} refused "
+                    f"in {elapsed:.1f} ms"
+                    + (f" - FAILED: {'; '.join(problems)}" if problems else "")
+                )
+
+    print("FAILED" if failures else "OK", f"({rounds - failures}/{rounds} rounds passed)")
+    return failures
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    copies, desks, rounds = args + [10, 50, 5][len(args):]
+    sys.exit(1 if asyncio.run(main(copies, desks, rounds)) else 0)
@@ -0,0 +1,132 @@
+"""Test setup: the app runs in-process against a throwaway SQLite database.
+
+Tests marked ``postgres`` run against TEST_POSTGRES_URL instead and are
+skipped without it. Point it at a throwaway database: its tables are
+dropped and recreated.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKDIR = Path(tempfile.mkdtemp(prefix="library-tests-"))
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR / 'test.db'}"
+os.environ.setdefault("SECRET_KEY", "test-" + "x" * 40)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# The app mounts ./static and ./uploads and renders ./templates from the working directory
+(WORKDIR / "static").mkdir()
+(WORKDIR / "uploads").mkdir()
+(WORKDIR / "templates").symlink_to(ROOT / "templates")
+os.chdir(WORKDIR)
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.models import Base, StaffUser  # noqa: E402
+from app.routers.auth import get_current_active_staff  # noqa: E402
+from app.services.cache import response_cache  # noqa: E402
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_URL is not set")
+    for item in items:
+        if "postgres" in item.keywords and not TEST_POSTGRES_URL:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def staff_user():
+    """Authenticate every request as an active staff member."""
+    from app.main import app
+
+    app.dependency_overrides[get_current_active_staff] = lambda: StaffUser(
+        id=1, username="test", is_active=True
+    )
+    yield
+    app.dependency_overrides.pop(get_current_active_staff, None)
+
+
+@pytest.fixture
+async def client(staff_user):
+    """Client of the app started on an empty SQLite database."""
+    from app.database import engine
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    response_cache.clear()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture
+async def catalog(client):
+    """Two libraries and "Война и мир" with a copy at each: INV-1 and INV-2."""
+    libraries = [
+        (await client.post("/api/v1/libraries", json={"name": name})).json()["id"]
+        for name in ("Центральная", "Панкратова")
+    ]
+    author = (await client.post("/api/v1/authors", json={"name": "Лев Толстой"})).json()
+    book = (await client.post("/api/v1/books", json={
+        "title": "Война и мир", "author_id": author["id"], "year": 1869,
+    })).json()
+    copies = []
+    for number, library_id in enumerate(libraries, start=1):
+        response = await client.post(f"/api/v1/books/{book['id']}/copies", json={
+            "library_id": library_id, "inventory_number": f"INV-{number}",
+        })
+        assert response.status_code == 201, response.text
+        copies.append(response.json()["id"])
+    return {"book_id": book["id"], "library_ids": libraries, "copy_ids": copies}
+
+
+SHELF_BOOKS = [
+    ("Война и мир", "Лев Толстой", 1869, "Эпопея о войне 1812 года"),
+    ("Анна Каренина", "Лев Толстой", 1877, "Роман о любви"),
+    ("Преступление и наказание", "Федор Достоевский", 1866, "Философский роман"),
+    ("Идиот", "Федор Достоевский", 1869, None),
+    ("Евгений Онегин", "Александр Пушкин", 1833, "Роман в стихах"),
+    ("Капитанская дочка", "Александр Пушкин", 1836, None),
+]
+
+
+@pytest.fixture
+async def shelf(client):
+    """Six classics with a copy at each of two libraries; every third copy
+    (Анна Каренина and Евгений Онегин at the first library, Преступление и
+    наказание and Капитанская дочка at the second) is loaned.
+
+    Returns ids: {"libraries": [...], "authors": {name: id}, "books": {title: id}}.
+    """
+    libraries = [
+        (await client.post("/api/v1/libraries", json={"name": name})).json()["id"]
+        for name in ("Центральная", "Панкратова")
+    ]
+    authors = {}
+    books = {}
+    number = 0
+    for title, author, year, description in SHELF_BOOKS:
+        if author not in authors:
+            response = await client.post("/api/v1/authors", json={"name": author})
+            authors[author] = response.json()["id"]
+        book = (await client.post("/api/v1/books", json={
+            "title": title, "author_id": authors[author], "year": year, "description": description,
+        })).json()
+        books[title] = book["id"]
+        for library_id in libraries:
+            number += 1
+            response = await client.post(f"/api/v1/books/{book['id']}/copies", json={
+                "library_id": library_id,
+                "inventory_number": f"INV-{number}",
+                "status": "loaned" if number % 3 == 0 else "available",
+            })
+            assert response.status_code == 201, response.text
+    return {"libraries": libraries, "authors": authors, "books": books}
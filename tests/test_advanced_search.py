@@ -0,0 +1,45 @@
+def titles(response):
+    return sorted(book["title"] for book in response.json()["results"])
+
+
+async def advanced(client, **params):
+    response = await client.get("/api/v1/search/advanced", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+async def test_title_and_author_filters(shelf, client):
+    assert titles(await advanced(client, author="толстой")) == ["Анна Каренина", "Война и мир"]
+    assert titles(await advanced(client, author="толстой", title="анна")) == ["Анна Каренина"]
+
+
+async def test_year_range(shelf, client):
+    response = await advanced(client, year_from=1866, year_to=1869)
+    assert titles(response) == ["Война и мир", "Идиот", "Преступление и наказание"]
+
+
+async def test_available_only_counts_any_library(shelf, client):
+    # Анна Каренина is loaned at the first library only
+    response = await advanced(client, author="толстой", available_only=True)
+    assert titles(response) == ["Анна Каренина", "Война и мир"]
+
+
+async def test_available_only_at_a_library(shelf, client):
+    first, second = shelf["libraries"]
+    response = await advanced(client, author="толстой", available_only=True, library_id=first)
+    assert titles(response) == ["Война и мир"]
+    response = await advanced(client, author="пушкин", available_only=True, library_id=second)
+    assert titles(response) == ["Евгений Онегин"]
+
+
+async def test_library_filter_counts_that_library(shelf, client):
+    first, _ = shelf["libraries"]
+    response = await advanced(client, author="толстой", library_id=first)
+    counts = {book["title"]: (book["available_count"], book["total_count"])
+              for book in response.json()["results"]}
+    assert counts == {"Война и мир": (1, 1), "Анна Каренина": (0, 1)}
+
+
+async def test_library_without_copies(shelf, client):
+    library = (await client.post("/api/v1/libraries", json={"name": "Новая"})).json()
+    assert titles(await advanced(client, author="толстой", library_id=library["id"])) == []
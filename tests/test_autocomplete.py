@@ -0,0 +1,86 @@
+from app.services.autocomplete import BOOK, AutocompleteIndex
+
+
+def make_index():
+    index = AutocompleteIndex()
+    index.add_author(1, "Лев Толстой")
+    index.add_book(1, "Война и мир", 1)
+    index.add_book(2, "Анна Каренина", 1)
+    index.add_author(2, "Федор Достоевский")
+    index.add_book(3, "Идиот", 2)
+    return index
+
+
+def texts(entries):
+    return [entry.text for entry in entries]
+
+
+def test_any_word_start_matches():
+    index = make_index()
+    assert texts(index.suggest("карен")) == ["Анна Каренина"]
+    assert texts(index.suggest("мир")) == ["Война и мир"]
+    assert texts(index.suggest("ЛЕВ")) == ["Лев Толстой"]
+
+
+def test_more_copies_rank_first():
+    index = make_index()
+    index.add_book(4, "Война миров", None)
+    index.adjust_weight(BOOK, 4, 3)
+    assert texts(index.suggest("войн")) == ["Война миров", "Война и мир"]
+    index.adjust_weight(BOOK, 1, 5)
+    assert texts(index.suggest("войн")) == ["Война и мир", "Война миров"]
+
+
+def test_latin_and_wrong_layout_prefixes():
+    index = make_index()
+    assert texts(index.suggest("tolst")) == ["Лев Толстой"]
+    assert texts(index.suggest("ljcn")) == ["Федор Достоевский"]
+
+
+def test_renames_and_removals():
+    index = make_index()
+    index.add_book(3, "Бесы", 2)
+    assert index.suggest("идио") == []
+    assert texts(index.suggest("бес")) == ["Бесы"]
+    index.remove_author(1)
+    assert index.suggest("войн") == []
+    assert index.suggest("толст") == []
+    assert len(index) == 2
+
+
+def test_writes_refresh_cached_prefixes():
+    index = make_index()
+    for prefix in ("в", "во", "войн", "ан", "а", "tolst", "и"):
+        index.suggest(prefix)
+    index.add_book(4, "Война миров", None)
+    index.adjust_weight(BOOK, 4, 3)
+    index.add_book(2, "Анна Аркадьевна", 1)
+    index.remove_book(3)
+    assert texts(index.suggest("во")) == ["Война миров", "Война и мир"]
+    assert texts(index.suggest("а")) == ["Анна Аркадьевна"]
+    assert texts(index.suggest("и")) == ["Война и мир"]
+    assert texts(index.suggest("tolst")) == ["Лев Толстой"]
+
+
+def test_writes_keep_unrelated_cached_prefixes(monkeypatch):
+    index = make_index()
+    lookups = []
+    top = index._top
+    monkeypatch.setattr(index, "_top", lambda prefix: lookups.append(prefix) or top(prefix))
+    index.suggest("ид")
+    index.suggest("войн")
+    index.adjust_weight(BOOK, 3, 1)
+    index.suggest("ид")
+    index.suggest("войн")
+    assert lookups == ["ид", "войн", "ид"]
+
+
+async def test_suggestions_endpoint(shelf, client):
+    response = await client.get("/api/v1/search/suggestions", params={"q": "пу", "limit": 3})
+    assert response.json() == {"query": "пу", "suggestions": ["✍️ Александр Пушкин"]}
+
+    await client.post("/api/v1/books", json={
+        "title": "Пиковая дама", "author_id": shelf["authors"]["Александр Пушкин"],
+    })
+    response = await client.get("/api/v1/search/suggestions", params={"q": "пик"})
+    assert response.json()["suggestions"] == ["📚 Пиковая дама"]
@@ -0,0 +1,55 @@
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import BookAvailability
+from app.services.availability import rebuild_availability
+
+
+async def rollup():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(
+            BookAvailability.book_id, BookAvailability.library_id,
+            BookAvailability.total_count, BookAvailability.available_count,
+        ).order_by(BookAvailability.book_id, BookAvailability.library_id))
+        return result.all()
+
+
+async def test_copy_writes_keep_the_rollup_exact(shelf, client):
+    book_id = shelf["books"]["Идиот"]
+    first, second = shelf["libraries"]
+    copies = (await client.get(f"/api/v1/books/{book_id}/copies")).json()
+
+    await client.post(f"/api/v1/books/{book_id}/copies", json={
+        "library_id": first, "inventory_number": "NEW-1",
+    })
+    await client.put(f"/api/v1/books/copies/{copies[0]['id']}", json={"status": "loaned"})
+    await client.put(f"/api/v1/books/copies/{copies[1]['id']}", json={"library_id": first})
+    await client.delete(f"/api/v1/books/copies/{copies[0]['id']}")
+    await client.post("/api/v1/circulation/scan", json={"scans": [
+        {"inventory_number": "INV-1", "status": "loaned"},
+    ]})
+
+    maintained = await rollup()
+    async with AsyncSessionLocal() as db:
+        await rebuild_availability(db)
+        await db.commit()
+    rebuilt = await rollup()
+    assert [row for row in maintained if row.total_count] == rebuilt
+
+    book = (await client.get(f"/api/v1/books/{book_id}")).json()
+    assert [(lib["library_id"], lib["total_count"], lib["available_count"])
+            for lib in book["libraries"]] == [(first, 2, 2)]
+    assert second not in [lib["library_id"] for lib in book["libraries"]]
+
+
+async def test_listing_reads_counts_from_the_rollup(shelf, client):
+    books = (await client.get("/api/v1/books", params={"limit": 100})).json()
+    counts = {book["title"]: (book["available_count"], book["total_count"]) for book in books}
+    assert counts["Война и мир"] == (2, 2)
+    assert counts["Анна Каренина"] == (1, 2)
+
+
+async def test_deleting_a_library_drops_its_counts(shelf, client):
+    first, second = shelf["libraries"]
+    assert (await client.delete(f"/api/v1/libraries/{second}")).status_code == 204
+    assert {row.library_id for row in await rollup() if row.total_count} == {first}
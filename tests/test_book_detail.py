@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def test_detail_is_one_statement(shelf, client):
+    book_id = shelf["books"]["Анна Каренина"]
+    with count_statements() as statements:
+        response = await client.get(f"/api/v1/books/{book_id}", params={"copies_limit": 10})
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1
+
+
+async def test_counts_by_library(shelf, client):
+    first, second = shelf["libraries"]
+    book = (await client.get(f"/api/v1/books/{shelf['books']['Анна Каренина']}")).json()
+    assert (book["title"], book["author_name"]) == ("Анна Каренина", "Лев Толстой")
+    assert (book["available_count"], book["total_count"]) == (1, 2)
+    # Ordered by library name
+    assert book["libraries"] == [
+        {"library_id": second, "library_name": "Панкратова",
+         "total_count": 1, "available_count": 1},
+        {"library_id": first, "library_name": "Центральная",
+         "total_count": 1, "available_count": 0},
+    ]
+    assert book["copies"] is None
+
+
+async def test_copies_page(shelf, client):
+    book_id = shelf["books"]["Анна Каренина"]
+    response = await client.get(f"/api/v1/books/{book_id}", params={"copies_limit": 1})
+    copies = response.json()["copies"]
+    assert [(c["library_name"], c["inventory_number"], c["status"]) for c in copies] == [
+        ("Панкратова", "INV-4", "available"),
+    ]
+    response = await client.get(
+        f"/api/v1/books/{book_id}", params={"copies_limit": 1, "copies_offset": 1}
+    )
+    assert [c["inventory_number"] for c in response.json()["copies"]] == ["INV-3"]
+
+
+async def test_book_without_copies(shelf, client):
+    created = await client.post("/api/v1/books", json={
+        "title": "Бесы", "author_id": shelf["authors"]["Федор Достоевский"],
+    })
+    response = await client.get(f"/api/v1/books/{created.json()['id']}", params={"copies_limit": 5})
+    book = response.json()
+    assert (book["libraries"], book["copies"], book["total_count"]) == ([], [], 0)
+
+
+async def test_missing_book(client):
+    response = await client.get("/api/v1/books/999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Book not found"
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services.cache import TTLCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  Война   И мир ") == "война и мир"
+
+
+def test_expired_entries_are_misses():
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("key", 1)
+    assert cache.get("key") == (False, None)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.evictions == 1
+
+
+def test_invalidate_drops_tagged_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("book", 1, tags=("book:1",))
+    cache.set("search", 2, tags=("search", "book:1"))
+    cache.set("other", 3, tags=("book:2",))
+    cache.invalidate("book:1")
+    assert cache.get("book") == (False, None)
+    assert cache.get("search") == (False, None)
+    assert cache.get("other") == (True, 3)
+
+
+@pytest.mark.parametrize("reset", [
+    lambda cache: cache.invalidate("search"),
+    lambda cache: cache.clear(),
+])
+async def test_load_started_before_a_reset_is_not_stored(reset):
+    cache = TTLCache(maxsize=10, ttl=60)
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def load():
+        started.set()
+        await finish.wait()
+        return "stale"
+
+    task = asyncio.create_task(cache.get_or_load(("test", 2), load, tags=("search",)))
+    await started.wait()
+    reset(cache)
+    finish.set()
+    assert await task == "stale"
+    assert cache.get(("test", 2)) == (False, None)
+
+
+async def test_exceptions_are_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def fail():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load(("test", 3), fail)
+    assert len(cache) == 0
+
+
+async def test_cached_search_echoes_each_callers_query(catalog, client):
+    first = (await client.get("/api/v1/search", params={"q": "  ВОЙНА  и мир"})).json()
+    second = (await client.get("/api/v1/search", params={"q": "война и мир"})).json()
+    assert first["query"] == "ВОЙНА  и мир"
+    assert second["query"] == "война и мир"
+    assert first["results"] == second["results"]
+    assert first["total"] == 1
+
+
+async def test_writes_invalidate_cached_searches(catalog, client):
+    first = (await client.get("/api/v1/search", params={"q": "война"})).json()
+    assert first["results"][0]["available_count"] == 2
+    await client.put(f"/api/v1/books/copies/{catalog['copy_ids'][0]}", json={"status": "loaned"})
+    second = (await client.get("/api/v1/search", params={"q": "война"})).json()
+    assert second["results"][0]["available_count"] == 1
@@ -0,0 +1,65 @@
+import json
+
+
+async def upload(client, name, content, **params):
+    return await client.post(
+        "/api/v1/books/import", params=params, files={"file": (name, content.encode())}
+    )
+
+
+def titles(response):
+    return sorted(book["title"] for book in response.json()["results"])
+
+
+async def test_csv_import(catalog, client):
+    library_id = catalog["library_ids"][0]
+    content = (
+        "title,author,isbn,year,inventory_number\n"
+        "Анна Каренина,Лев Толстой,978-5-389-06256-6,1877,INV-10\n"
+        "Анна Каренина,Лев Толстой,978-5-389-06256-6,1877,INV-11\n"
+        "Идиот,Федор Достоевский,,1869,INV-12\n"
+        "Война и мир,Лев Толстой,,,\n"
+    )
+    response = await upload(client, "books.csv", content, library_id=library_id)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "rows": 4, "authors_created": 1, "books_created": 2, "copies_created": 3,
+        "error_count": 0, "errors": [],
+    }
+    search = await client.get("/api/v1/search", params={"q": "каренина"})
+    assert [(b["available_count"], b["total_count"]) for b in search.json()["results"]] == [(2, 2)]
+    assert titles(await client.get("/api/v1/search", params={"q": "достоевский"})) == ["Идиот"]
+
+
+async def test_jsonl_import_reports_bad_rows_by_line(catalog, client):
+    library_id = catalog["library_ids"][1]
+    lines = [
+        {"title": "Бесы", "author": "Федор Достоевский", "library_id": library_id,
+         "inventory_number": "B-1"},
+        {"title": "Без автора"},
+        "not json",
+        {"title": "Бесы", "author": "Федор Достоевский", "library_id": 999,
+         "inventory_number": "B-2"},
+        {"title": "Бесы", "author": "Федор Достоевский", "inventory_number": "INV-1",
+         "library_id": library_id},
+        {"title": "Бесы", "author": "Федор Достоевский", "status": "lost"},
+    ]
+    content = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    response = await upload(client, "books.jsonl", content)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["rows"], result["books_created"], result["copies_created"]) == (6, 1, 1)
+    assert [error["line"] for error in result["errors"]] == [2, 3, 4, 5, 6]
+    assert result["error_count"] == 5
+
+
+async def test_format_parameter_overrides_the_extension(catalog, client):
+    content = json.dumps({"title": "Бесы", "author": "Федор Достоевский"})
+    response = await upload(client, "books.txt", content, format="jsonl")
+    assert response.json()["books_created"] == 1
+
+
+async def test_unknown_extension(catalog, client):
+    response = await upload(client, "books.xlsx", "")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown file format")
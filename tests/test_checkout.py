@@ -0,0 +1,7 @@
+async def test_checkout_lends_an_available_copy(catalog, client):
+    body = {"book_id": catalog["book_id"], "library_id": catalog["library_ids"][0]}
+    response = await client.post("/api/v1/circulation/checkout", json=body)
+    assert response.status_code == 200, response.text
+    assert (response.json()["inventory_number"], response.json()["status"]) == ("INV-1", "loaned")
+    response = await client.post("/api/v1/circulation/checkout", json=body)
+    assert response.status_code == 409
@@ -0,0 +1,98 @@
+"""Concurrent checkouts against PostgreSQL (FOR UPDATE SKIP LOCKED).
+
+N desks check out the same book at once while M copies are available:
+exactly min(N, M) checkouts must succeed, each with a different copy.
+"""
+import asyncio
+import os
+from collections import Counter
+
+import httpx
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import get_db
+from app.main import app
+from app.models import Author, Base, Book, BookAvailability, CirculationEvent, Copy, Library
+
+pytestmark = pytest.mark.postgres
+
+DESKS_MAX = 60
+
+
+@pytest.fixture
+async def pg_sessions(staff_user):
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_URL"], pool_size=DESKS_MAX, max_overflow=0
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_pg_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_pg_db
+    yield sessions
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+
+async def add_book(sessions, copies: int):
+    """A library and a book with ``copies`` available copies there."""
+    async with sessions() as db:
+        library = Library(name="Центральная")
+        author = Author(name="Лев Толстой", name_normalized="лев толстой")
+        db.add_all([library, author])
+        await db.flush()
+        book = Book(title="Война и мир", title_normalized="война и мир", author_id=author.id)
+        db.add(book)
+        await db.flush()
+        await db.execute(insert(Copy), [
+            {"book_id": book.id, "library_id": library.id,
+             "inventory_number": f"INV-{i}", "status": "available"}
+            for i in range(copies)
+        ])
+        db.add(BookAvailability(
+            book_id=book.id, library_id=library.id, total_count=copies, available_count=copies,
+        ))
+        await db.commit()
+        return book.id, library.id
+
+
+@pytest.mark.parametrize("copies, desks", [(10, 50), (50, 20), (30, 30), (1, DESKS_MAX)])
+async def test_concurrent_checkouts_lend_each_copy_once(pg_sessions, copies, desks):
+    book_id, library_id = await add_book(pg_sessions, copies)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/circulation/checkout", json={
+                "book_id": book_id, "library_id": library_id,
+            })
+            for _ in range(desks)
+        ))
+
+    lent = min(copies, desks)
+    codes = Counter(r.status_code for r in responses)
+    assert codes[200] == lent and codes[409] == desks - lent, codes
+    copy_ids = [r.json()["copy_id"] for r in responses if r.status_code == 200]
+    assert len(set(copy_ids)) == lent
+
+    async with pg_sessions() as db:
+        statuses = Counter((await db.execute(
+            select(Copy.status).where(Copy.book_id == book_id)
+        )).scalars())
+        available = (await db.execute(
+            select(BookAvailability.available_count).where(BookAvailability.book_id == book_id)
+        )).scalar_one()
+        events = (await db.execute(
+            select(func.count()).select_from(CirculationEvent)
+            .where(CirculationEvent.copy_id.in_(copy_ids))
+        )).scalar_one()
+    assert statuses["loaned"] == lent
+    assert available == copies - lent
+    assert events == lent
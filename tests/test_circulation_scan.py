@@ -0,0 +1,31 @@
+async def scan(client, *scans):
+    response = await client.post("/api/v1/circulation/scan", json={"scans": [
+        {"inventory_number": number, "status": status} for number, status in scans
+    ]})
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+async def test_scan_reports_unknown_copies_and_applies_the_others(catalog, client):
+    results = await scan(client, ("INV-1", "loaned"), ("NOPE", "loaned"), ("INV-2", "loaned"))
+    assert [r["found"] for r in results] == [True, False, True]
+    assert [r["status"] for r in results] == ["loaned", None, "loaned"]
+    assert results[0]["previous_status"] == "available"
+    assert results[1]["copy_id"] is None
+
+    book = (await client.get(f"/api/v1/books/{catalog['book_id']}")).json()
+    assert [library["available_count"] for library in book["libraries"]] == [0, 0]
+
+
+async def test_later_scans_of_a_copy_win(catalog, client):
+    results = await scan(client, ("INV-1", "loaned"), ("INV-1", "reserved"))
+    assert [r["status"] for r in results] == ["reserved", "reserved"]
+    assert [r["previous_status"] for r in results] == ["available", "available"]
+
+
+async def test_scan_batch_size_is_limited(catalog, client):
+    response = await client.post("/api/v1/circulation/scan", json={"scans": [
+        {"inventory_number": "INV-1", "status": "loaned"}
+    ] * 501})
+    assert response.status_code == 400
+
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.database import engine
+from app.services import circulation
+from app.services.circulation import maintain_partitions, month_partition_ddl, partition_months
+
+
+def test_partition_months_cross_the_year():
+    assert partition_months(date(2026, 11, 18), ahead=3) == [
+        date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1), date(2027, 2, 1),
+    ]
+
+
+def test_month_partition_ddl():
+    assert month_partition_ddl(date(2026, 12, 31)) == (
+        "CREATE TABLE IF NOT EXISTS circulation_events_2026_12 PARTITION OF circulation_events "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+async def test_partitions_are_maintained_while_running(monkeypatch):
+    runs = []
+
+    async def ensure_partitions(conn):
+        runs.append(conn)
+        if len(runs) == 1:
+            raise RuntimeError("lock timeout")
+        if len(runs) == 3:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(circulation, "PARTITION_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(circulation, "ensure_partitions", ensure_partitions)
+    # A failed run is logged and retried at the next interval
+    with pytest.raises(asyncio.CancelledError):
+        await maintain_partitions(engine)
+    assert len(runs) == 3
+
+
+async def scan(client, *scans):
+    response = await client.post("/api/v1/circulation/scan", json={"scans": [
+        {"inventory_number": number, "status": status} for number, status in scans
+    ]})
+    assert response.status_code == 200, response.text
+
+
+async def stats(client, **params):
+    response = await client.get("/api/v1/circulation/stats", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_loans_and_returns_by_book(shelf, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"), ("INV-5", "loaned"))
+    await scan(client, ("INV-1", "available"), ("INV-3", "available"))
+    rows = await stats(client)
+    assert [(r["book_title"], r["loans"], r["returns"]) for r in rows] == [
+        ("Война и мир", 2, 1), ("Преступление и наказание", 1, 0), ("Анна Каренина", 0, 1),
+    ]
+
+
+async def test_grouped_by_library_and_filtered(shelf, client):
+    first, second = shelf["libraries"]
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"), ("INV-5", "loaned"))
+    rows = await stats(client, group_by="library")
+    assert [(r["library_name"], r["loans"]) for r in rows] == [
+        ("Центральная", 2), ("Панкратова", 1),
+    ]
+    rows = await stats(client, group_by="book_library", library_id=second)
+    assert [(r["book_title"], r["library_id"], r["loans"]) for r in rows] == [
+        ("Война и мир", second, 1),
+    ]
+
+
+async def test_period(shelf, client):
+    await scan(client, ("INV-1", "loaned"))
+    yesterday = date.today() - timedelta(days=1)
+    assert await stats(client, date_from=yesterday, date_to=yesterday) == []
+    response = await client.get("/api/v1/circulation/stats", params={
+        "date_from": date.today(), "date_to": yesterday,
+    })
+    assert response.status_code == 400
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import literal, select, text
+
+from app import database
+from app.database import AsyncSessionLocal, execute_concurrently
+
+
+def values(results):
+    return [result.scalar_one() for result in results]
+
+
+async def test_results_in_statement_order(client):
+    statements = [select(literal(i)) for i in range(6)]
+    async with AsyncSessionLocal() as db:
+        assert values(await execute_concurrently(db, *statements)) == list(range(6))
+
+
+async def test_single_statement_runs_on_the_session(client):
+    async with AsyncSessionLocal() as db:
+        assert values(await execute_concurrently(db, select(literal("one")))) == ["one"]
+
+
+async def test_error_is_raised_and_slots_released(client):
+    free = database._parallel_slots._value
+    async with AsyncSessionLocal() as db:
+        with pytest.raises(Exception):
+            await execute_concurrently(db, select(literal(1)), text("SELECT * FROM missing_table"))
+    assert database._parallel_slots._value == free
+
+
+async def test_runs_on_the_session_when_no_slot_is_free(client, monkeypatch):
+    monkeypatch.setattr(database, "_parallel_slots", database.asyncio.Semaphore(0))
+    async with AsyncSessionLocal() as db:
+        results = await execute_concurrently(db, select(literal(1)), select(literal(2)))
+    assert values(results) == [1, 2]
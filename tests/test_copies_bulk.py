@@ -0,0 +1,77 @@
+import pytest
+
+from app.schemas.book import CopyBulkCreate
+
+
+def numbers(copies):
+    return [copy.inventory_number for copy in copies]
+
+
+def numbers_of(response):
+    return [copy["inventory_number"] for copy in response.json()]
+
+
+def test_range_keeps_the_width_of_its_start():
+    spec = CopyBulkCreate(library_id=1, inventory_range="ШК-{0008..0011}/А")
+    assert numbers(spec.items()) == ["ШК-0008/А", "ШК-0009/А", "ШК-0010/А", "ШК-0011/А"]
+    assert spec.size() == 4
+
+
+def test_list_items_take_the_request_defaults():
+    spec = CopyBulkCreate(library_id=1, status="reserved", copies=[
+        {"inventory_number": "A"}, {"inventory_number": "B", "library_id": 2, "status": "loaned"},
+    ])
+    assert [(c.library_id, c.status) for c in spec.items()] == [(1, "reserved"), (2, "loaned")]
+
+
+@pytest.mark.parametrize("body", [
+    {"library_id": 1},
+    {"library_id": 1, "inventory_range": "A-{1..2}", "copies": [{"inventory_number": "B"}]},
+    {"library_id": 1, "inventory_range": "A-{5..2}"},
+    {"library_id": 1, "inventory_range": "A-1..2"},
+    {"library_id": 1, "inventory_range": "A" * 49 + "{1..10}"},
+    {"inventory_range": "A-{1..2}"},
+    {"copies": [{"inventory_number": "A"}]},
+])
+def test_invalid_requests(body):
+    with pytest.raises(ValueError):
+        CopyBulkCreate(**body)
+
+
+async def test_range_endpoint(catalog, client):
+    book_id, library_id = catalog["book_id"], catalog["library_ids"][0]
+    response = await client.post(f"/api/v1/books/{book_id}/copies/bulk", json={
+        "library_id": library_id, "inventory_range": "ШК-{01..12}",
+    })
+    assert response.status_code == 201, response.text
+    assert numbers_of(response) == [f"ШК-{n:02d}" for n in range(1, 13)]
+    book = (await client.get(f"/api/v1/books/{book_id}")).json()
+    assert (book["available_count"], book["total_count"]) == (14, 14)
+
+
+async def test_taken_and_repeated_numbers_are_all_reported(catalog, client):
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies/bulk", json={
+        "library_id": catalog["library_ids"][0],
+        "copies": [
+            {"inventory_number": "INV-2"}, {"inventory_number": "X"}, {"inventory_number": "X"},
+        ],
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Copies with these inventory numbers already exist or repeat: INV-2, X"
+    )
+
+
+async def test_bulk_size_is_limited(catalog, client):
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies/bulk", json={
+        "library_id": catalog["library_ids"][0], "inventory_range": "N-{1..1001}",
+    })
+    assert response.status_code == 400
+
+
+async def test_bulk_missing_book_or_library(catalog, client):
+    body = {"library_id": catalog["library_ids"][0], "inventory_range": "N-{1..2}"}
+    assert (await client.post("/api/v1/books/999/copies/bulk", json=body)).status_code == 404
+    body["library_id"] = 999
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies/bulk", json=body)
+    assert (response.status_code, response.json()["detail"]) == (400, "Library not found")
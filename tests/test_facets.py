@@ -0,0 +1,37 @@
+async def facets(client, **params):
+    params = {"facets": "library,availability,decade", **params}
+    response = await client.get("/api/v1/search", params=params)
+    assert response.status_code == 200, response.text
+    return {
+        name: [(bucket["value"], bucket["label"], bucket["count"]) for bucket in buckets]
+        for name, buckets in response.json()["facets"].items()
+    }
+
+
+async def test_buckets_over_all_matches(shelf, client):
+    first, second = shelf["libraries"]
+    result = await facets(client, q="о", per_page=1)
+    assert sorted(result["library"]) == [(first, "Центральная", 6), (second, "Панкратова", 6)]
+    assert result["availability"] == [(1, "available", 6)]
+    assert result["decade"] == [(1860, "1860s", 3), (1830, "1830s", 2), (1870, "1870s", 1)]
+
+
+async def test_availability_is_scoped_to_the_library(shelf, client):
+    first, _ = shelf["libraries"]
+    result = await facets(client, q="толстой", library_id=first)
+    assert result["availability"] == [(0, "unavailable", 1), (1, "available", 1)]
+
+
+async def test_only_requested_facets(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "толстой", "facets": "decade"})
+    assert list(response.json()["facets"]) == ["decade"]
+    response = await client.get("/api/v1/search", params={"q": "толстой"})
+    assert response.json()["facets"] is None
+
+
+async def test_unknown_facet(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "толстой", "facets": "genre"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Unknown facets: genre. Allowed: library, availability, decade"
+    )
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models import Hold
+
+
+async def scan(client, *scans):
+    response = await client.post("/api/v1/circulation/scan", json={"scans": [
+        {"inventory_number": number, "status": status} for number, status in scans
+    ]})
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+async def place_hold(client, book_id, patron_card):
+    response = await client.post(
+        "/api/v1/holds", json={"book_id": book_id, "patron_card": patron_card}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def get_hold(client, hold_id):
+    return (await client.get(f"/api/v1/holds/{hold_id}")).json()
+
+
+async def test_return_sets_the_copy_aside_for_the_next_hold(catalog, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    first = await place_hold(client, catalog["book_id"], "A")
+    second = await place_hold(client, catalog["book_id"], "B")
+    assert (first["status"], first["position"]) == ("waiting", 0)
+    assert second["position"] == 1
+
+    result, = await scan(client, ("INV-1", "available"))
+    assert result["status"] == "reserved"
+    assert result["hold_id"] == first["id"]
+    first = await get_hold(client, first["id"])
+    assert (first["status"], first["copy_id"]) == ("ready", catalog["copy_ids"][0])
+    assert (await get_hold(client, second["id"]))["position"] == 0
+
+    # Picking it up fulfils the hold
+    result, = await scan(client, ("INV-1", "loaned"))
+    assert result["status"] == "loaned"
+    assert (await get_hold(client, first["id"]))["status"] == "fulfilled"
+
+
+async def test_cancelling_a_ready_hold_passes_the_copy_on(catalog, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    first = await place_hold(client, catalog["book_id"], "A")
+    second = await place_hold(client, catalog["book_id"], "B")
+    await scan(client, ("INV-1", "available"))
+
+    response = await client.delete(f"/api/v1/holds/{first['id']}")
+    assert response.status_code == 204
+    assert (await get_hold(client, first["id"]))["status"] == "cancelled"
+    second = await get_hold(client, second["id"])
+    assert (second["status"], second["copy_id"]) == ("ready", catalog["copy_ids"][0])
+
+    # With nobody left waiting, cancelling releases the copy to the shelf
+    await client.delete(f"/api/v1/holds/{second['id']}")
+    copies = (await client.get(f"/api/v1/books/{catalog['book_id']}/copies")).json()
+    assert {c["inventory_number"]: c["status"] for c in copies} == {
+        "INV-1": "available", "INV-2": "loaned",
+    }
+
+
+async def test_hold_takes_an_available_copy_right_away(catalog, client):
+    hold = await place_hold(client, catalog["book_id"], "A")
+    assert (hold["status"], hold["copy_id"]) == ("ready", catalog["copy_ids"][0])
+    response = await client.post(
+        "/api/v1/holds", json={"book_id": catalog["book_id"], "patron_card": "A"}
+    )
+    assert (response.status_code, response.json()["detail"]) == (
+        400, "Reader already has an active hold on this book"
+    )
+
+
+async def test_positions_count_holds_at_the_library_and_anywhere(catalog, client):
+    first_library, second_library = catalog["library_ids"]
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    await place_hold(client, catalog["book_id"], "A")
+    await client.post("/api/v1/holds", json={
+        "book_id": catalog["book_id"], "library_id": second_library, "patron_card": "B",
+    })
+    response = await client.post("/api/v1/holds", json={
+        "book_id": catalog["book_id"], "library_id": first_library, "patron_card": "C",
+    })
+    # Behind A (any library), not behind B (another library)
+    assert response.json()["position"] == 1
+
+
+async def test_deleting_a_set_aside_copy_requeues_its_hold(catalog, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    hold = await place_hold(client, catalog["book_id"], "A")
+    await scan(client, ("INV-1", "available"))
+    await client.delete(f"/api/v1/books/copies/{catalog['copy_ids'][0]}")
+    hold = await get_hold(client, hold["id"])
+    assert (hold["status"], hold["copy_id"], hold["position"]) == ("waiting", None, 0)
+
+    # The next return serves it
+    result, = await scan(client, ("INV-2", "available"))
+    assert result["hold_id"] == hold["id"]
+
+
+async def test_unclaimed_holds_expire(catalog, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    first = await place_hold(client, catalog["book_id"], "A")
+    second = await place_hold(client, catalog["book_id"], "B")
+    await scan(client, ("INV-1", "available"))
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Hold).where(Hold.id == first["id"])
+            .values(ready_at=datetime.now(timezone.utc) - timedelta(days=8))
+        )
+        await db.commit()
+
+    response = await client.post("/api/v1/holds/expire")
+    assert response.json() == {"expired": 1, "reassigned": 1}
+    assert (await get_hold(client, first["id"]))["status"] == "expired"
+    second = await get_hold(client, second["id"])
+    assert (second["status"], second["copy_id"]) == ("ready", catalog["copy_ids"][0])
+    assert (await client.post("/api/v1/holds/expire")).json() == {"expired": 0, "reassigned": 0}
+
+
+async def test_new_copies_go_to_waiting_holds(catalog, client):
+    first_library, second_library = catalog["library_ids"]
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    anywhere = await place_hold(client, catalog["book_id"], "A")
+    response = await client.post("/api/v1/holds", json={
+        "book_id": catalog["book_id"], "library_id": second_library, "patron_card": "B",
+    })
+    at_second = response.json()
+    third = await place_hold(client, catalog["book_id"], "C")
+
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies", json={
+        "library_id": first_library, "inventory_number": "NEW-1",
+    })
+    copy = response.json()
+    assert copy["status"] == "reserved"
+    assert (await get_hold(client, anywhere["id"]))["copy_id"] == copy["id"]
+
+    # B's library gets one, C (any library) the other; a third copy stays on the shelf
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies/bulk", json={
+        "library_id": second_library, "inventory_range": "NEW-{2..4}",
+    })
+    assert [c["status"] for c in response.json()] == ["reserved", "reserved", "available"]
+    assert (await get_hold(client, at_second["id"]))["status"] == "ready"
+    assert (await get_hold(client, third["id"]))["status"] == "ready"
+
+    book = (await client.get(f"/api/v1/books/{catalog['book_id']}")).json()
+    assert (book["available_count"], book["total_count"]) == (1, 6)
+
+
+async def test_imported_copies_go_to_waiting_holds(catalog, client):
+    await scan(client, ("INV-1", "loaned"), ("INV-2", "loaned"))
+    hold = await place_hold(client, catalog["book_id"], "A")
+    content = (
+        "title,author,inventory_number,status\n"
+        "Война и мир,Лев Толстой,IMP-1,loaned\n"
+        "Война и мир,Лев Толстой,IMP-2,available\n"
+        "Война и мир,Лев Толстой,IMP-3,available\n"
+    )
+    response = await client.post(
+        "/api/v1/books/import", params={"library_id": catalog["library_ids"][0]},
+        files={"file": ("books.csv", content.encode())},
+    )
+    assert response.json()["copies_created"] == 3
+    hold = await get_hold(client, hold["id"])
+    copies = (await client.get(f"/api/v1/books/{catalog['book_id']}/copies")).json()
+    statuses = {c["inventory_number"]: c["status"] for c in copies}
+    assert statuses["IMP-2"] == "reserved"
+    assert statuses["IMP-3"] == "available"
+    assert hold["status"] == "ready"
+    assert hold["copy_id"] == next(c["id"] for c in copies if c["inventory_number"] == "IMP-2")
@@ -0,0 +1,39 @@
+import pytest
+
+from app.models import normalize_text
+
+
+@pytest.mark.parametrize("text, normalized", [
+    ("Война  и мир!", "война и мир"),
+    ("Ёлка у Ивановых", "елка у ивановых"),
+    ("  Лев\tТолстой ", "лев толстой"),
+    ("Jean-Paul Sartre", "jean paul sartre"),
+    ("snake_case", "snake case"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_text(text, normalized):
+    assert normalize_text(text) == normalized
+
+
+def titles(response):
+    return sorted(book["title"] for book in response.json()["results"])
+
+
+async def test_search_ignores_yo_and_punctuation(shelf, client):
+    author_id = shelf["authors"]["Лев Толстой"]
+    response = await client.post(
+        "/api/v1/books", json={"title": "Ёлка у Ивановых", "author_id": author_id}
+    )
+    assert response.status_code == 201, response.text
+    assert titles(await client.get("/api/v1/search", params={"q": "елка"})) == ["Ёлка у Ивановых"]
+    response = await client.get("/api/v1/search", params={"q": "ВОЙНА, И  МИР"})
+    assert titles(response) == ["Война и мир"]
+
+
+async def test_renamed_author_is_found_by_the_new_name(shelf, client):
+    author_id = shelf["authors"]["Александр Пушкин"]
+    response = await client.put(f"/api/v1/authors/{author_id}", json={"name": "А. С. Пушкин"})
+    assert response.status_code == 200, response.text
+    response = await client.get("/api/v1/search/advanced", params={"author": "а с пушкин"})
+    assert titles(response) == ["Евгений Онегин", "Капитанская дочка"]
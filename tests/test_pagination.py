@@ -0,0 +1,91 @@
+from datetime import datetime
+from itertools import product
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, select
+
+from app.services.pagination import decode_cursor, encode_cursor, order_by_keys, seek_condition
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([0.5, "Война и мир", datetime(2026, 1, 2, 3, 4, 5), 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 4) == [0.5, "Война и мир", "2026-01-02T03:04:05", 42]
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "", encode_cursor([1, 2])[:-2], "e30"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, 2)
+
+
+def test_cursor_with_other_keys_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, 2, 3]), 2)
+
+
+rows = Table("rows", MetaData(), Column("a", Integer), Column("b", Integer), Column("id", Integer))
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    rows.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(rows.insert(), [
+            {"a": a, "b": b, "id": i} for i, (a, b) in enumerate(product(range(3), range(3)))
+        ])
+    with engine.connect() as conn:
+        yield conn
+
+
+@pytest.mark.parametrize("a_desc, b_desc", list(product([False, True], repeat=2)))
+def test_seek_condition_pages_through_every_row_once(db, a_desc, b_desc):
+    keys = [(rows.c.a, a_desc), (rows.c.b, b_desc), (rows.c.id, False)]
+    ordered = select(rows.c.a, rows.c.b, rows.c.id).order_by(*order_by_keys(keys))
+    expected = db.execute(ordered).all()
+
+    seen = []
+    last = None
+    while True:
+        stmt = ordered if last is None else ordered.where(seek_condition(keys, last))
+        page = db.execute(stmt.limit(2)).all()
+        if not page:
+            break
+        seen.extend(page)
+        last = decode_cursor(encode_cursor(page[-1]), len(keys))
+    assert seen == expected
+
+
+async def test_search_cursor_walks_every_result_once(shelf, client):
+    expected = (await client.get("/api/v1/search", params={"q": "о", "per_page": 100})).json()
+    seen = []
+    params = {"q": "о", "per_page": 2}
+    while True:
+        page = (await client.get("/api/v1/search", params=params)).json()
+        seen += page["results"]
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert len(seen) == expected["total"] > 2
+    assert seen == expected["results"]
+
+
+async def test_book_list_cursor_walks_every_book_once(shelf, client):
+    ids = []
+    params = {"limit": 4}
+    while True:
+        response = await client.get("/api/v1/books", params=params)
+        ids += [book["id"] for book in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    # Newest first
+    assert ids == sorted(shelf["books"].values(), reverse=True)
+
+
+async def test_bad_cursor_is_a_client_error(shelf, client):
+    response = await client.get("/api/v1/books", params={"cursor": "garbage"})
+    assert response.status_code == 400
+    response = await client.get("/api/v1/search", params={"q": "о", "cursor": encode_cursor([1])})
+    assert response.status_code == 400
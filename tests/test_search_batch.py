@@ -0,0 +1,25 @@
+async def test_batch_reports_a_bad_cursor_without_failing_the_others(catalog, client):
+    response = await client.post("/api/v1/search/batch", json={"queries": [
+        {"q": "война"},
+        {"q": "война", "cursor": "garbage"},
+        {"type": "advanced", "author": "толстой"},
+    ]})
+    assert response.status_code == 200
+    first, bad, advanced = response.json()["results"]
+    assert first["status_code"] == 200
+    assert [book["title"] for book in first["response"]["results"]] == ["Война и мир"]
+    assert bad["status_code"] == 400
+    assert bad["detail"] == "Invalid cursor"
+    assert bad["response"] is None
+    assert advanced["status_code"] == 200
+    assert advanced["response"]["total"] == 1
+
+
+async def test_batch_validates_each_query(catalog, client):
+    response = await client.post("/api/v1/search/batch", json={"queries": [{"type": "search"}]})
+    assert response.status_code == 422
+
+
+async def test_batch_size_is_limited(catalog, client):
+    response = await client.post("/api/v1/search/batch", json={"queries": [{"q": "война"}] * 51})
+    assert response.status_code == 400
@@ -0,0 +1,47 @@
+def titles(response):
+    return [book["title"] for book in response.json()["results"]]
+
+
+async def bm25(client, **params):
+    response = await client.get("/api/v1/search", params={"mode": "bm25", **params})
+    assert response.status_code == 200, response.text
+    return response
+
+
+async def test_title_match_ranks_first(shelf, client):
+    author_id = shelf["authors"]["Лев Толстой"]
+    await client.post("/api/v1/books", json={
+        "title": "Дневники", "author_id": author_id,
+        "description": "Записи о войне и мире, о романе Война и мир",
+    })
+    response = await bm25(client, q="война")
+    assert titles(response) == ["Война и мир", "Дневники"]
+    assert response.json()["total"] == 2
+
+
+async def test_all_terms_must_match(shelf, client):
+    assert titles(await bm25(client, q="капитанская дочка")) == ["Капитанская дочка"]
+    assert titles(await bm25(client, q="капитанская идиот")) == []
+
+
+async def test_matches_other_word_forms(shelf, client):
+    assert titles(await bm25(client, q="преступлением")) == ["Преступление и наказание"]
+
+
+async def test_unknown_terms_find_nothing(shelf, client):
+    body = (await bm25(client, q="квантовая")).json()
+    assert (body["total"], body["results"]) == (0, [])
+
+
+async def test_cursor_walks_the_ranking(shelf, client):
+    seen, cursor = [], None
+    while True:
+        params = {"q": "толстой", "per_page": 1}
+        if cursor:
+            params["cursor"] = cursor
+        body = (await bm25(client, **params)).json()
+        seen += [book["title"] for book in body["results"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == ["Анна Каренина", "Война и мир"]
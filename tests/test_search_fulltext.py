@@ -0,0 +1,35 @@
+def titles(response):
+    return [book["title"] for book in response.json()["results"]]
+
+
+async def test_search_by_title_and_author(shelf, client):
+    assert titles(await client.get("/api/v1/search", params={"q": "война"})) == ["Война и мир"]
+    response = await client.get("/api/v1/search", params={"q": "толстой"})
+    assert set(titles(response)) == {"Война и мир", "Анна Каренина"}
+    assert response.json()["total"] == 2
+
+
+async def test_search_ignores_case(shelf, client):
+    assert titles(await client.get("/api/v1/search", params={"q": "ИДИОТ"})) == ["Идиот"]
+
+
+async def test_results_carry_copy_counts(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "толстой"})
+    counts = {book["title"]: (book["available_count"], book["total_count"])
+              for book in response.json()["results"]}
+    assert counts == {"Война и мир": (2, 2), "Анна Каренина": (1, 2)}
+
+
+async def test_nothing_found(shelf, client):
+    body = (await client.get("/api/v1/search", params={"q": "гарри поттер"})).json()
+    assert (body["total"], body["pages"], body["results"]) == (0, 0, [])
+
+
+async def test_page_numbers(shelf, client):
+    first = (await client.get("/api/v1/search", params={"q": "толстой", "per_page": 1})).json()
+    second = (await client.get(
+        "/api/v1/search", params={"q": "толстой", "per_page": 1, "page": 2}
+    )).json()
+    assert (first["total"], first["pages"]) == (2, 2)
+    assert len(first["results"]) == len(second["results"]) == 1
+    assert first["results"][0]["id"] != second["results"][0]["id"]
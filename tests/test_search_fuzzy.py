@@ -0,0 +1,40 @@
+from app.services.trigram import similarity, trigram_sequence, word_similarity
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigram_sequence("Кот") == ["  к", " ко", "кот", "от "]
+    assert trigram_sequence(None) == []
+
+
+def test_similarity():
+    assert similarity("толстой", "толстой") == 1.0
+    assert 0 < similarity("толстый", "толстой") < 1
+    assert similarity("", "толстой") == 0.0
+
+
+def test_word_similarity_scores_the_best_extent():
+    name = "федор достоевский"
+    assert word_similarity("достоев", name) > similarity("достоев", name)
+    assert word_similarity("достоевский", "федор достоевский") == 1.0
+
+
+async def test_fuzzy_search_tolerates_typos(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "каренена", "mode": "fuzzy"})
+    assert [book["title"] for book in response.json()["results"]] == ["Анна Каренина"]
+    response = await client.get("/api/v1/search", params={"q": "толстый", "mode": "fuzzy"})
+    titles = {book["title"] for book in response.json()["results"]}
+    assert titles == {"Война и мир", "Анна Каренина"}
+
+
+async def test_fuzzy_threshold(shelf, client):
+    response = await client.get(
+        "/api/v1/search", params={"q": "каренена", "mode": "fuzzy", "threshold": 1}
+    )
+    assert response.json()["total"] == 0
+
+
+async def test_fuzzy_suggestions(shelf, client):
+    response = await client.get(
+        "/api/v1/search/suggestions", params={"q": "пушкн", "mode": "fuzzy"}
+    )
+    assert "✍️ Александр Пушкин" in response.json()["suggestions"]
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.services import similar_books as similar_books_module
+from app.services.similar_books import SimilarBooksIndex, similar_books
+
+
+def make_index():
+    index = SimilarBooksIndex()
+    index.add_author(1, "Лев Толстой")
+    index.add_author(2, "Александр Пушкин")
+    index.add_book(1, "Война и мир", 1, "Роман о войне 1812 года")
+    index.add_book(2, "Севастопольские рассказы", 1, "Рассказы о войне")
+    index.add_book(3, "Анна Каренина", 1, "Роман о любви")
+    index.add_book(4, "Сказка о рыбаке и рыбке", 2, "Сказка в стихах")
+    index.rebuild()
+    return index
+
+
+def test_most_similar_first():
+    similar = make_index().similar(1)
+    assert [book_id for book_id, _ in similar] == [2, 3]
+    assert similar[0][1] > similar[1][1] > 0
+
+
+def test_books_sharing_nothing_are_left_out():
+    assert make_index().similar(4) == []
+
+
+def test_limit():
+    assert len(make_index().similar(1, limit=1)) == 1
+
+
+def test_unknown_and_removed_books():
+    index = make_index()
+    assert index.similar(99) == []
+    index.remove_book(2)
+    index.rebuild()
+    assert [book_id for book_id, _ in index.similar(1)] == [3]
+    assert index.similar(2) == []
+
+
+def test_author_rename_updates_their_books():
+    index = make_index()
+    index.add_author(2, "Лев Толстой")
+    index.rebuild()
+    assert 4 in [book_id for book_id, _ in index.similar(1)]
+
+
+async def test_similar_endpoint(shelf, client):
+    book_id = shelf["books"]["Война и мир"]
+    await similar_books.wait_for_rebuild()
+    response = await client.get(f"/api/v1/books/{book_id}/similar", params={"limit": 1})
+    assert response.status_code == 200, response.text
+    (similar,) = response.json()
+    assert similar["title"] == "Анна Каренина"
+    assert 0 < similar["similarity"] <= 1
+
+
+async def test_similar_endpoint_sees_writes(shelf, client):
+    book_id = shelf["books"]["Евгений Онегин"]
+    created = await client.post("/api/v1/books", json={
+        "title": "Евгений Онегин. Комментарий",
+        "author_id": shelf["authors"]["Александр Пушкин"],
+    })
+    await similar_books.wait_for_rebuild()
+    response = await client.get(f"/api/v1/books/{book_id}/similar", params={"limit": 1})
+    assert response.json()[0]["id"] == created.json()["id"]
+    assert (await client.get("/api/v1/books/999999/similar")).status_code == 404
+
+
+async def test_lookups_use_the_previous_matrix_until_the_rebuild(monkeypatch):
+    monkeypatch.setattr(similar_books_module, "REBUILD_DELAY", 0.01)
+    index = make_index()
+    index.add_book(5, "Война и мир. Том второй", 1, "Роман о войне 1812 года")
+    index.remove_book(2)
+    # Changes are not visible yet, and asking doesn't rebuild
+    assert [book_id for book_id, _ in index.similar(1)] == [2, 3]
+    version = index.version
+    await asyncio.sleep(0)
+    assert index.version == version
+
+    await index.wait_for_rebuild()
+    assert [book_id for book_id, _ in index.similar(1)][:1] == [5]
+    assert index.version == version + 1
+
+
+async def test_changes_during_a_rebuild_are_picked_up(monkeypatch):
+    monkeypatch.setattr(similar_books_module, "REBUILD_DELAY", 0)
+    index = make_index()
+    index.remove_book(3)
+    await asyncio.sleep(0)  # the rebuild is running
+    index.remove_book(2)
+    await index.wait_for_rebuild()
+    assert index.similar(1) == []
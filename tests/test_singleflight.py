@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.services.cache import TTLCache
+from app.services.singleflight import SingleFlight
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load(("test", 1), load) for _ in range(5)))
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert await cache.get_or_load(("test", 1), load) == "value"
+    assert calls == 1
+
+
+async def test_exceptions_are_shared():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    results = await asyncio.gather(
+        *(flights.run(("test", 1), fail) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == 1
+    assert flights.stats() == {"test": {"executed": 1, "collapsed": 2}}
+
+
+async def test_waiters_run_their_own_load_when_the_leader_is_cancelled():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    async def load():
+        return "value"
+
+    leader = asyncio.create_task(flights.run(("test", 2), hang))
+    await started.wait()
+    follower = asyncio.create_task(flights.run(("test", 2), load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_requests_after_an_invalidation_run_their_own_load():
+    cache = TTLCache(maxsize=10, ttl=60)
+    started = asyncio.Event()
+    finish = asyncio.Event()
+    loads = []
+
+    async def slow_load():
+        loads.append("before")
+        started.set()
+        await finish.wait()
+        return "before the write"
+
+    async def load():
+        loads.append("after")
+        return "after the write"
+
+    first = asyncio.create_task(cache.get_or_load(("test", 4), slow_load, tags=("search",)))
+    await started.wait()
+    cache.invalidate("search")
+    second = asyncio.create_task(cache.get_or_load(("test", 4), load, tags=("search",)))
+    try:
+        assert await asyncio.wait_for(second, 1) == "after the write"
+    finally:
+        finish.set()
+    assert await first == "before the write"
+    assert loads == ["before", "after"]
+    assert cache.get(("test", 4)) == (True, "after the write")
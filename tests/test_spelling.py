@@ -0,0 +1,69 @@
+from app.services.spelling import SpellingDictionary, edit_distance
+
+
+def test_edit_distance():
+    assert edit_distance("мир", "мир", 2) == 0
+    assert edit_distance("роман", "ромнн", 2) == 1
+    # Adjacent transposition is one edit
+    assert edit_distance("кот", "кто", 2) == 1
+
+
+def test_edit_distance_is_capped_at_limit_plus_one():
+    assert edit_distance("короткий", "длинный", 1) == 2
+    assert edit_distance("а", "абвгд", 2) == 3
+
+
+def make_dictionary():
+    dictionary = SpellingDictionary()
+    dictionary.add_author(1, "Федор Достоевский")
+    dictionary.add_book(1, "Преступление и наказание", 1)
+    dictionary.add_book(2, "Идиот", 1)
+    return dictionary
+
+
+def test_lookup():
+    dictionary = make_dictionary()
+    assert dictionary.lookup("идиот") == "идиот"
+    assert dictionary.lookup("преступлние") == "преступление"
+    assert dictionary.lookup("достоевкий") == "достоевский"
+    assert dictionary.lookup("zzzzzz") is None
+
+
+def test_short_words_get_at_most_one_edit():
+    dictionary = make_dictionary()
+    assert dictionary.lookup("ид") is None
+    assert dictionary.lookup("идот") == "идиот"
+    assert dictionary.lookup("ита") is None
+
+
+def test_lookup_prefers_the_more_frequent_word():
+    dictionary = SpellingDictionary()
+    dictionary.add_book(1, "Мир", None)
+    dictionary.add_book(2, "Мор", None)
+    dictionary.add_book(3, "Мор и чума", None)
+    assert dictionary.lookup("мкр") == "мор"
+
+
+def test_correct():
+    dictionary = make_dictionary()
+    assert dictionary.correct("Преступлние и наказане") == "преступление и наказание"
+    assert dictionary.correct("идиот") is None
+
+
+def test_removing_an_author_removes_their_books():
+    dictionary = make_dictionary()
+    dictionary.remove_author(1)
+    assert dictionary.lookup("идот") is None
+    assert len(dictionary) == 0
+
+
+async def test_search_suggests_a_corrected_query(shelf, client):
+    body = (await client.get("/api/v1/search", params={"q": "преступлние"})).json()
+    assert body["total"] == 0
+    assert body["suggested_query"] == "преступление"
+
+
+async def test_no_suggestion_when_something_is_found(shelf, client):
+    body = (await client.get("/api/v1/search", params={"q": "преступление"})).json()
+    assert body["total"] == 1
+    assert body["suggested_query"] is None
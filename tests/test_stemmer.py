@@ -0,0 +1,59 @@
+from sqlalchemy import delete, func, select
+
+from app.database import AsyncSessionLocal
+from app.models import SearchDocument, SearchTerm
+from app.services import search_index
+from app.services.stemmer import stem, tokenize
+
+
+def test_russian_word_forms_share_a_stem():
+    assert stem("толстого") == stem("толстой") == "толст"
+    assert stem("войну") == stem("война") == "войн"
+    assert stem("преступлением") == stem("преступление") == "преступлен"
+
+
+def test_english_words_use_porter():
+    assert stem("running") == "run"
+    assert stem("connection") == "connect"
+
+
+def test_other_tokens_are_kept():
+    assert stem("1812") == "1812"
+
+
+def test_tokenize_normalizes_and_drops_stopwords():
+    assert tokenize("Война и  мир!") == ["война", "мир"]
+    assert tokenize("Ёлка в лесу") == ["елка", "лесу"]
+    assert tokenize(None) == []
+
+
+def titles(response):
+    return sorted(book["title"] for book in response.json()["results"])
+
+
+async def test_morph_search_matches_other_word_forms(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "толстого", "mode": "morph"})
+    assert titles(response) == ["Анна Каренина", "Война и мир"]
+    response = await client.get("/api/v1/search", params={"q": "войну и мир", "mode": "morph"})
+    assert titles(response) == ["Война и мир"]
+
+
+async def test_morph_search_sees_new_books(shelf, client):
+    author_id = shelf["authors"]["Федор Достоевский"]
+    await client.post("/api/v1/books", json={"title": "Бесы", "author_id": author_id})
+    response = await client.get("/api/v1/search", params={"q": "бесов", "mode": "morph"})
+    assert titles(response) == ["Бесы"]
+
+
+async def test_rebuild_pages_through_the_books(shelf, client, monkeypatch):
+    async with AsyncSessionLocal() as db:
+        before = (await db.execute(select(SearchTerm.term, SearchTerm.book_id))).all()
+        monkeypatch.setattr(search_index, "REINDEX_BATCH_SIZE", 4)
+        await db.execute(delete(SearchTerm))
+        await db.execute(delete(SearchDocument))
+        await search_index.rebuild_search_index(db)
+        await db.commit()
+        after = (await db.execute(select(SearchTerm.term, SearchTerm.book_id))).all()
+        documents = (await db.execute(select(func.count()).select_from(SearchDocument))).scalar()
+    assert sorted(after) == sorted(before)
+    assert documents == len(shelf["books"])
@@ -0,0 +1,39 @@
+from app.services.transliteration import is_latin, layout_to_cyrillic, translit_key
+
+
+def test_spelling_variants_share_a_key():
+    assert translit_key("толстой") == translit_key("tolstoy") == "tolstoi"
+    assert translit_key("tolstoj") == "tolstoi"
+    assert translit_key("достоевский") == translit_key("dostoyevsky") == "dostoevski"
+    assert translit_key("чехов") == translit_key("chekhov") == "chehov"
+
+
+def test_layout_to_cyrillic():
+    assert layout_to_cyrillic("ljcnjtdcrbq") == "достоевский"
+    assert layout_to_cyrillic("Djqyf") == "война"
+
+
+def test_is_latin():
+    assert is_latin("Tolstoy")
+    assert not is_latin("Толстой")
+    assert not is_latin("Толстой tolstoy")
+    assert not is_latin("1812")
+
+
+def titles(response):
+    return sorted(book["title"] for book in response.json()["results"])
+
+
+async def test_latin_spelling_finds_cyrillic_names(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "tolstoy"})
+    assert titles(response) == ["Анна Каренина", "Война и мир"]
+
+
+async def test_wrong_keyboard_layout(shelf, client):
+    response = await client.get("/api/v1/search", params={"q": "ljcnjtdcrbq"})
+    assert titles(response) == ["Идиот", "Преступление и наказание"]
+
+
+async def test_latin_prefix_suggestions(shelf, client):
+    response = await client.get("/api/v1/search/suggestions", params={"q": "pushk"})
+    assert response.json()["suggestions"] == ["✍️ Александр Пушкин"]
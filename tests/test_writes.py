@@ -0,0 +1,79 @@
+async def test_create_book_returns_the_stored_row(catalog, client):
+    response = await client.post("/api/v1/books", json={
+        "title": "Анна Каренина", "author_id": 1, "isbn": "978-5-389-06256-6", "year": 1877,
+    })
+    assert response.status_code == 201, response.text
+    book = response.json()
+    assert (book["title"], book["author_name"], book["year"]) == (
+        "Анна Каренина", "Лев Толстой", 1877
+    )
+    assert (book["available_count"], book["total_count"]) == (0, 0)
+
+
+async def test_book_constraint_errors(catalog, client):
+    response = await client.post("/api/v1/books", json={"title": "Без автора", "author_id": 999})
+    assert (response.status_code, response.json()["detail"]) == (400, "Author not found")
+    book = {"title": "Дубль", "author_id": 1, "isbn": "123"}
+    assert (await client.post("/api/v1/books", json=book)).status_code == 201
+    response = await client.post("/api/v1/books", json=book)
+    assert (response.status_code, response.json()["detail"]) == (
+        400, "Book with this ISBN already exists"
+    )
+
+
+async def test_create_copy_returns_names(catalog, client):
+    library_id = catalog["library_ids"][1]
+    response = await client.post(f"/api/v1/books/{catalog['book_id']}/copies", json={
+        "library_id": library_id, "inventory_number": "INV-3",
+    })
+    assert response.status_code == 201, response.text
+    copy = response.json()
+    assert (copy["book_title"], copy["library_id"], copy["status"]) == (
+        "Война и мир", library_id, "available"
+    )
+    assert copy["library_name"]
+
+
+async def test_copy_constraint_errors(catalog, client):
+    book_id, library_id = catalog["book_id"], catalog["library_ids"][0]
+
+    async def create(book_id, **copy):
+        response = await client.post(f"/api/v1/books/{book_id}/copies", json=copy)
+        return response.status_code, response.json()["detail"]
+
+    assert await create(book_id, library_id=library_id, inventory_number="INV-1") == (
+        400, "Copy with this inventory number already exists"
+    )
+    assert await create(book_id, library_id=999, inventory_number="INV-9") == (
+        400, "Library not found"
+    )
+    assert await create(999, library_id=library_id, inventory_number="INV-9") == (
+        404, "Book not found"
+    )
+    assert await create(book_id, library_id=library_id) == (400, "Inventory number is required")
+
+
+async def test_update_and_delete_missing_copy(catalog, client):
+    response = await client.put("/api/v1/books/copies/999", json={"status": "loaned"})
+    assert response.status_code == 404
+    response = await client.delete("/api/v1/books/copies/999")
+    assert response.status_code == 404
+
+
+async def test_move_copy_to_a_missing_library(catalog, client):
+    copy_id = catalog["copy_ids"][0]
+    response = await client.put(f"/api/v1/books/copies/{copy_id}", json={"library_id": 999})
+    assert (response.status_code, response.json()["detail"]) == (400, "Library not found")
+
+
+async def test_duplicate_author(catalog, client):
+    response = await client.post("/api/v1/authors", json={"name": "Лев Толстой"})
+    assert (response.status_code, response.json()["detail"]) == (400, "Author already exists")
+
+
+async def test_deleting_a_library_removes_its_copies(catalog, client):
+    library_id = catalog["library_ids"][0]
+    assert (await client.delete(f"/api/v1/libraries/{library_id}")).status_code == 204
+    response = await client.get(f"/api/v1/books/{catalog['book_id']}/copies")
+    assert [copy["inventory_number"] for copy in response.json()] == ["INV-2"]
+    assert (await client.get(f"/api/v1/libraries/{library_id}")).status_code == 404